@@ -7,6 +7,10 @@ provider "aws" {
   skip_metadata_api_check     = var.aws_bucket_name == ""
 }
 
+data "aws_caller_identity" "current" {
+  count = var.aws_bucket_name != "" ? 1 : 0
+}
+
 resource "aws_s3_bucket" "dashboard" {
   count         = var.aws_bucket_name != "" ? 1 : 0
   bucket        = var.aws_bucket_name
@@ -55,6 +59,19 @@ resource "aws_s3_bucket_policy" "dashboard_public_read" {
         Principal = "*"
         Action    = ["s3:GetObject"]
         Resource  = ["${aws_s3_bucket.dashboard[0].arn}/*"]
+      },
+      {
+        # Refresh state (HTTP cache, snapshots) may contain private repository data.
+        Sid       = "DenyPublicReadState"
+        Effect    = "Deny"
+        Principal = "*"
+        Action    = ["s3:GetObject"]
+        Resource  = ["${aws_s3_bucket.dashboard[0].arn}/_state/*"]
+        Condition = {
+          StringNotEquals = {
+            "aws:PrincipalAccount" = data.aws_caller_identity.current[0].account_id
+          }
+        }
       }
     ]
   })
@@ -63,10 +80,11 @@ resource "aws_s3_bucket_policy" "dashboard_public_read" {
 resource "aws_s3_object" "dashboard_index" {
   count        = var.aws_bucket_name != "" ? 1 : 0
   bucket       = aws_s3_bucket.dashboard[0].id
-  key          = "index.html"
-  content      = local.rendered_dashboard
-  content_type = "text/html; charset=utf-8"
-  etag         = md5(local.rendered_dashboard)
+  key              = "index.html"
+  content_base64   = base64gzip(local.rendered_dashboard)
+  content_type     = "text/html; charset=utf-8"
+  content_encoding = "gzip"
+  cache_control    = "public, max-age=300"
 
   depends_on = [
     aws_s3_bucket_website_configuration.dashboard,
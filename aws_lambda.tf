@@ -1,12 +1,71 @@
 locals {
-  lambda_enabled = var.enable_lambda_auto_refresh && var.aws_bucket_name != ""
+  lambda_enabled  = var.enable_lambda_auto_refresh && var.aws_bucket_name != ""
+  # Only whether a secret is set decides what is created; nonsensitive() keeps
+  # the counts, the schedule and the webhook URL output from being marked
+  # sensitive along with the secret itself.
+  webhook_enabled = local.lambda_enabled && nonsensitive(var.github_webhook_secret != "")
+
+  lambda_environment = {
+    GITHUB_TOKEN             = var.github_token
+    TARGET_GITHUB_PROFILE    = var.github_profile
+    TARGET_GITHUB_USERNAME   = var.github_username
+    ORGANIZATIONS_CSV        = join(",", var.organizations)
+    INCLUDE_PRIVATE          = tostring(var.include_private_repos)
+    MAX_REPOSITORIES         = tostring(var.max_repositories)
+    MAX_ITEMS_PER_SECTION    = tostring(var.max_items_per_section)
+    MAX_CONCURRENCY          = tostring(var.max_concurrency)
+    OUTPUT_BUCKET            = var.aws_bucket_name
+    OUTPUT_KEY               = "index.html"
+    HTTP_CACHE_BACKEND       = var.lambda_http_cache_backend
+    HTTP_CACHE_TTL_PROFILE   = tostring(var.http_cache_ttl_seconds.profile)
+    HTTP_CACHE_TTL_REPOS     = tostring(var.http_cache_ttl_seconds.repos)
+    HTTP_CACHE_TTL_SEARCH    = tostring(var.http_cache_ttl_seconds.search)
+    HTTP_CACHE_MAX_MB        = tostring(var.http_cache_max_mb)
+    SEARCH_SYNC              = var.lambda_search_sync
+    SEARCH_VERIFY_SECONDS    = tostring(var.lambda_search_verify_seconds)
+    SECTION_TIMEOUT_SECONDS  = tostring(var.lambda_section_timeout_seconds)
+    REPOSITORY_ENRICHMENT    = var.lambda_repository_enrichment
+    TREND_HISTORY            = var.lambda_trend_history
+    CRAWL_WORKERS            = tostring(var.lambda_crawl_workers)
+    FETCH_BACKEND            = var.fetch_backend
+    PAYLOAD_ENCODING         = var.payload_encoding
+    TARGET_GITHUB_USERS      = join(",", var.lambda_batch_users)
+    METRICS_MODE             = var.lambda_metrics_mode
+    S3_CLIENT_BACKEND        = var.lambda_s3_client
+    OUTPUT_LAYOUT            = var.lambda_output_layout
+    OUTPUT_COMPRESSION       = var.lambda_output_compression
+    OUTPUT_MAX_AGE           = tostring(var.lambda_output_max_age)
+    WEBHOOK_SECRET           = var.github_webhook_secret
+    WEBHOOK_DEBOUNCE_SECONDS = tostring(var.lambda_webhook_debounce_seconds)
+  }
 }
 
 data "archive_file" "dashboard_lambda_zip" {
   count       = local.lambda_enabled ? 1 : 0
   type        = "zip"
-  source_file = "${path.module}/lambda/dashboard_refresher.py"
   output_path = "${path.module}/dashboard_refresher.zip"
+
+  source {
+    content  = file("${path.module}/lambda/dashboard_refresher.py")
+    filename = "dashboard_refresher.py"
+  }
+
+  source {
+    content  = file("${path.module}/lambda/dashboard_template.py")
+    filename = "dashboard_template.py"
+  }
+
+  source {
+    content  = file("${path.module}/lambda/dashboard_prerender.py")
+    filename = "dashboard_prerender.py"
+  }
+
+  # Same template Terraform renders with templatefile(), packaged for the
+  # Lambda's compiled renderer.
+  source {
+    content  = file("${path.module}/templates/dashboard.html.tftpl")
+    filename = "dashboard.html.tftpl"
+  }
 }
 
 resource "aws_iam_role" "dashboard_lambda" {
@@ -49,6 +108,7 @@ resource "aws_iam_role_policy" "dashboard_lambda_inline" {
         Action = [
           "s3:PutObject",
           "s3:GetObject",
+          "s3:DeleteObject",
           "s3:ListBucket",
         ]
         Resource = [
@@ -79,17 +139,7 @@ resource "aws_lambda_function" "dashboard_refresh" {
   memory_size      = 256
 
   environment {
-    variables = {
-      GITHUB_TOKEN           = var.github_token
-      TARGET_GITHUB_PROFILE  = var.github_profile
-      TARGET_GITHUB_USERNAME = var.github_username
-      ORGANIZATIONS_CSV      = join(",", var.organizations)
-      INCLUDE_PRIVATE        = tostring(var.include_private_repos)
-      MAX_REPOSITORIES       = tostring(var.max_repositories)
-      MAX_ITEMS_PER_SECTION  = tostring(var.max_items_per_section)
-      OUTPUT_BUCKET          = var.aws_bucket_name
-      OUTPUT_KEY             = "index.html"
-    }
+    variables = local.lambda_environment
   }
 
   depends_on = [
@@ -98,10 +148,31 @@ resource "aws_lambda_function" "dashboard_refresh" {
   ]
 }
 
+# Org crawl shards run as asynchronous invocations of the refresh function
+# itself.
+resource "aws_iam_role_policy" "dashboard_crawl_invoke" {
+  count = local.lambda_enabled && var.lambda_crawl_workers > 0 ? 1 : 0
+  name  = "dashboard-crawl-invoke-policy"
+  role  = aws_iam_role.dashboard_lambda[0].id
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect   = "Allow"
+        Action   = "lambda:InvokeFunction"
+        Resource = aws_lambda_function.dashboard_refresh[0].arn
+      }
+    ]
+  })
+}
+
 resource "aws_cloudwatch_event_rule" "dashboard_refresh" {
-  count               = local.lambda_enabled ? 1 : 0
-  name                = "${replace(var.aws_bucket_name, ".", "-")}-dashboard-refresh-schedule"
-  schedule_expression = var.lambda_schedule_expression
+  count = local.lambda_enabled ? 1 : 0
+  name  = "${replace(var.aws_bucket_name, ".", "-")}-dashboard-refresh-schedule"
+  # With webhooks delivering changes, the full refresh only reconciles
+  # anything a missed or failed delivery left behind.
+  schedule_expression = local.webhook_enabled ? var.lambda_reconcile_schedule_expression : var.lambda_schedule_expression
 }
 
 resource "aws_cloudwatch_event_target" "dashboard_refresh" {
@@ -119,3 +190,80 @@ resource "aws_lambda_permission" "allow_events_invoke_dashboard_refresh" {
   principal     = "events.amazonaws.com"
   source_arn    = aws_cloudwatch_event_rule.dashboard_refresh[0].arn
 }
+
+resource "aws_cloudwatch_log_group" "dashboard_webhook" {
+  count             = local.webhook_enabled ? 1 : 0
+  name              = "/aws/lambda/${replace(var.aws_bucket_name, ".", "-")}-dashboard-webhook"
+  retention_in_days = var.lambda_log_retention_days
+}
+
+resource "aws_lambda_function" "dashboard_webhook" {
+  count = local.webhook_enabled ? 1 : 0
+
+  function_name    = "${replace(var.aws_bucket_name, ".", "-")}-dashboard-webhook"
+  role             = aws_iam_role.dashboard_lambda[0].arn
+  runtime          = "python3.12"
+  handler          = "dashboard_refresher.webhook_handler"
+  filename         = data.archive_file.dashboard_lambda_zip[0].output_path
+  source_code_hash = data.archive_file.dashboard_lambda_zip[0].output_base64sha256
+  # Covers the debounce wait plus a partial refresh.
+  timeout     = 150
+  memory_size = 256
+
+  environment {
+    variables = local.lambda_environment
+  }
+
+  depends_on = [
+    aws_iam_role_policy.dashboard_lambda_inline,
+    aws_cloudwatch_log_group.dashboard_webhook,
+  ]
+}
+
+resource "aws_lambda_function_url" "dashboard_webhook" {
+  count = local.webhook_enabled ? 1 : 0
+  # Requests are authenticated by the X-Hub-Signature-256 HMAC instead.
+  function_name      = aws_lambda_function.dashboard_webhook[0].function_name
+  authorization_type = "NONE"
+}
+
+# A function URL with authorization_type NONE still needs a resource policy
+# allowing public calls: InvokeFunctionUrl, plus InvokeFunction, which Lambda
+# now also checks for function URL requests. Without both, every delivery is
+# rejected with 403 before the handler runs. InvokeFunction is limited to
+# calls through the URL, so nobody can invoke the function directly and
+# skip the signature check.
+resource "aws_lambda_permission" "allow_webhook_function_url" {
+  count                  = local.webhook_enabled ? 1 : 0
+  statement_id           = "AllowPublicFunctionUrlInvoke"
+  action                 = "lambda:InvokeFunctionUrl"
+  function_name          = aws_lambda_function.dashboard_webhook[0].function_name
+  principal              = "*"
+  function_url_auth_type = "NONE"
+}
+
+resource "aws_lambda_permission" "allow_webhook_function_url_invoke" {
+  count                    = local.webhook_enabled ? 1 : 0
+  statement_id             = "AllowPublicFunctionUrlInvokeFunction"
+  action                   = "lambda:InvokeFunction"
+  function_name            = aws_lambda_function.dashboard_webhook[0].function_name
+  principal                = "*"
+  invoked_via_function_url = true
+}
+
+resource "aws_iam_role_policy" "dashboard_webhook_invoke" {
+  count = local.webhook_enabled ? 1 : 0
+  name  = "dashboard-webhook-invoke-policy"
+  role  = aws_iam_role.dashboard_lambda[0].id
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect   = "Allow"
+        Action   = "lambda:InvokeFunction"
+        Resource = aws_lambda_function.dashboard_webhook[0].arn
+      }
+    ]
+  })
+}
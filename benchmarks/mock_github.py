@@ -0,0 +1,299 @@
+import gzip
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = (
+  "api cache build deploy docs fix lambda merge page query render repo review search "
+  "server stream sync table template terraform test token update upload"
+).split()
+
+
+class MockGitHub:
+  def __init__(
+    self,
+    repositories=150,
+    org_repositories=None,
+    search_items=40,
+    padding=2000,
+    latency_ms=0,
+    core_limit=5000,
+    search_limit=30,
+    require_search_kind=False,
+  ):
+    self.repositories = repositories
+    self.org_repositories = dict(org_repositories or {})
+    self.search_items = search_items
+    self.padding = padding
+    self.latency_ms = latency_ms
+    self.limits = {"core": core_limit, "search": search_limit}
+    # Answers searches without is:issue / is:pr with a 422, as GitHub can.
+    self.require_search_kind = require_search_kind
+    self._bodies = {}
+    self._lock = threading.Lock()
+    self._server = None
+    self.reset()
+
+  @property
+  def url(self):
+    return f"http://127.0.0.1:{self._server.server_port}"
+
+  def start(self):
+    owner = self
+
+    class Handler(RequestHandler):
+      mock = owner
+
+    self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    self._server.daemon_threads = True
+    threading.Thread(target=self._server.serve_forever, daemon=True).start()
+    return self
+
+  def stop(self):
+    if self._server is not None:
+      self._server.shutdown()
+      self._server.server_close()
+      self._server = None
+
+  def reset(self):
+    with self._lock:
+      self.remaining = dict(self.limits)
+      self.reset_at = int(time.time()) + 3600
+      self._stats = {"requests": 0, "not_modified": 0, "bytes": 0}
+
+  def stats(self):
+    with self._lock:
+      return dict(self._stats)
+
+  def record(self, sent, not_modified=False):
+    with self._lock:
+      self._stats["requests"] += 1
+      self._stats["bytes"] += sent
+      if not_modified:
+        self._stats["not_modified"] += 1
+
+  def consume(self, resource):
+    with self._lock:
+      if self.remaining[resource] <= 0:
+        return False
+      self.remaining[resource] -= 1
+      return True
+
+  def rejects(self, path):
+    parts = urllib.parse.urlsplit(path)
+    if not self.require_search_kind or parts.path != "/search/issues":
+      return False
+    terms = dict(urllib.parse.parse_qsl(parts.query)).get("q", "").split()
+    return "is:pr" not in terms and "is:issue" not in terms
+
+  def rate_limit_headers(self, resource):
+    with self._lock:
+      remaining = self.remaining[resource]
+    return {
+      "X-RateLimit-Limit": str(self.limits[resource]),
+      "X-RateLimit-Remaining": str(remaining),
+      "X-RateLimit-Reset": str(self.reset_at),
+      "X-RateLimit-Resource": resource,
+    }
+
+  def text(self, seed, size):
+    rng = random.Random(seed)
+    words = []
+    length = 0
+    while length < size:
+      word = rng.choice(WORDS)
+      words.append(word)
+      length += len(word) + 1
+    return " ".join(words)[:size]
+
+  def repositories_for(self, owner):
+    count = self.org_repositories.get(owner, self.repositories)
+    repos = [
+      {
+        "full_name": f"{owner}/repository-{index}",
+        "html_url": f"https://github.com/{owner}/repository-{index}",
+        "description": self.text(f"{owner}/{index}", self.padding),
+        "updated_at": f"2024-{index % 12 + 1:02d}-{index % 28 + 1:02d}T{index % 24:02d}:00:00Z",
+        "pushed_at": f"2024-{index % 12 + 1:02d}-{index % 28 + 1:02d}T{index % 24:02d}:00:00Z",
+        "stargazers_count": (index * 37) % 500,
+        "open_issues_count": index % 9,
+        "language": ["Python", "Go", "TypeScript", "Rust", "HCL", None][index % 6],
+        "private": index % 5 == 0,
+        "owner": {"login": owner},
+      }
+      for index in range(count)
+    ]
+    repos.sort(key=lambda repo: repo["updated_at"], reverse=True)
+    return repos
+
+  def repository_details(self, owner, index, detail):
+    # Per-repository endpoints read by the enrichment stage.
+    updated_at = f"2024-{index % 12 + 1:02d}-{index % 28 + 1:02d}T{index % 24:02d}:00:00Z"
+    if detail == "languages":
+      languages = ["Python", "Go", "TypeScript", "Rust", "HCL", "Shell"]
+      return {languages[(index + offset) % 6]: (index + 1) * 1000 // (offset + 1) for offset in range(index % 3 + 1)}
+    if detail == "commits":
+      return [{
+        "sha": hashlib.sha1(f"{owner}/{index}".encode("utf-8")).hexdigest(),
+        "commit": {
+          "message": f"{self.text(f'{owner}/{index}/commit', 60)}\n\n{self.text(f'{owner}/{index}/body', self.padding // 4)}",
+          "committer": {"date": updated_at},
+        },
+      }]
+    if detail == "pulls":
+      return [
+        {"number": number, "head": {"sha": str(number)}, "base": {"ref": "main"}, "body": self.text(f"{owner}/{index}/{number}", self.padding // 4)}
+        for number in range(index % 4)
+      ]
+    if detail == "commits/HEAD/check-runs":
+      conclusion = "failure" if index % 7 == 0 else "success"
+      return {"total_count": 2, "check_runs": [{"status": "completed", "conclusion": conclusion, "output": {}}] * 2}
+    return None
+
+  def search_results(self, query):
+    # updated:>X / updated:>=X filter the fixed result set, so delta queries
+    # see the same items (and titles) as the full query.
+    since = re.findall(r"updated:(>=?)(\S+)", query)
+    # Without is:pr / is:issue both kinds match, the way a merged query sees
+    # them; titles leave the kind out so merged and split results agree.
+    query = re.sub(r"\s*updated:\S+", "", query).strip()
+    kinds = [kind for term, kind in (("is:pr", "pull"), ("is:issue", "issues")) if term in query.split()] or ["pull", "issues"]
+    base = " ".join(term for term in query.split() if term not in ("is:pr", "is:issue"))
+    items = [
+      {
+        "title": f"{base} #{index}",
+        "html_url": f"https://github.com/octo/repository-{index % 10}/{kind}/{index}",
+        "repository_url": f"https://api.github.com/repos/octo/repository-{index % 10}",
+        "updated_at": f"2024-{index % 12 + 1:02d}-{index % 28 + 1:02d}T00:00:00Z",
+        "state": "open",
+        "body": self.text(f"{base}/{kind}/{index}", self.padding // 2),
+        **({"pull_request": {"url": f"https://api.github.com/repos/octo/pulls/{index}"}} if kind == "pull" else {}),
+      }
+      for kind in kinds
+      for index in range(self.search_items)
+    ]
+    for operator, value in since:
+      items = [item for item in items if item["updated_at"] > value or (operator == ">=" and item["updated_at"] == value)]
+    items.sort(key=lambda item: item["updated_at"], reverse=True)
+    return items
+
+  def payload(self, path):
+    parts = urllib.parse.urlsplit(path)
+    query = dict(urllib.parse.parse_qsl(parts.query))
+    page = max(1, int(query.get("page", 1)))
+    per_page = max(1, int(query.get("per_page", 30)))
+    start = (page - 1) * per_page
+
+    if parts.path == "/user":
+      return {"login": "octo"}
+    match = re.fullmatch(r"/users/([^/]+)", parts.path)
+    if match:
+      return {
+        "login": match.group(1),
+        "name": "Octo Cat",
+        "html_url": f"https://github.com/{match.group(1)}",
+        "followers": 42,
+        "following": 7,
+        "public_repos": self.repositories,
+      }
+    match = re.fullmatch(r"/orgs/([^/]+)", parts.path)
+    if match:
+      return {"login": match.group(1), "public_repos": len(self.repositories_for(match.group(1)))}
+    match = re.fullmatch(r"/(?:users|orgs)/([^/]+)/repos|/user/repos", parts.path)
+    if match:
+      return self.repositories_for(match.group(1) or "octo")[start:start + per_page]
+    match = re.fullmatch(r"/repos/([^/]+)/repository-(\d+)/(languages|commits|pulls|commits/HEAD/check-runs)", parts.path)
+    if match:
+      return self.repository_details(match.group(1), int(match.group(2)), match.group(3))
+    if parts.path == "/search/issues":
+      items = self.search_results(query.get("q", ""))
+      return {"total_count": len(items), "incomplete_results": False, "items": items[start:start + per_page]}
+    return None
+
+  def body(self, path):
+    with self._lock:
+      cached = self._bodies.get(path)
+    if cached is not None:
+      return cached
+    data = self.payload(path)
+    if data is None:
+      return None
+    raw = json.dumps(data).encode("utf-8")
+    cached = (raw, gzip.compress(raw), f'W/"{hashlib.sha1(raw).hexdigest()}"')
+    with self._lock:
+      self._bodies[path] = cached
+    return cached
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+  protocol_version = "HTTP/1.1"
+  # Headers and body go out in separate writes; with Nagle on, small
+  # keep-alive responses stall on delayed ACKs.
+  disable_nagle_algorithm = True
+  mock = None
+
+  def log_message(self, format, *args):
+    pass
+
+  def respond(self, status, body=b"", headers=None):
+    self.send_response(status)
+    for name, value in (headers or {}).items():
+      self.send_header(name, value)
+    self.send_header("Content-Length", str(len(body)))
+    self.end_headers()
+    self.wfile.write(body)
+    self.mock.record(len(body), not_modified=status == 304)
+
+  def do_GET(self):
+    if self.mock.latency_ms:
+      time.sleep(self.mock.latency_ms / 1000)
+
+    if self.path.startswith("/rate_limit"):
+      resources = {}
+      for resource in ("core", "search"):
+        headers = self.mock.rate_limit_headers(resource)
+        resources[resource] = {
+          "limit": int(headers["X-RateLimit-Limit"]),
+          "remaining": int(headers["X-RateLimit-Remaining"]),
+          "reset": int(headers["X-RateLimit-Reset"]),
+        }
+      self.respond(200, json.dumps({"resources": resources}).encode("utf-8"), {"Content-Type": "application/json"})
+      return
+
+    resource = "search" if self.path.startswith("/search/") else "core"
+    if self.mock.rejects(self.path):
+      self.mock.consume(resource)
+      self.respond(422, json.dumps({
+        "message": "Validation Failed",
+        "errors": [{"message": "Query must include 'is:issue' or 'is:pull-request'", "code": "invalid"}],
+      }).encode("utf-8"), {"Content-Type": "application/json", **self.mock.rate_limit_headers(resource)})
+      return
+    cached = self.mock.body(self.path)
+    if cached is None:
+      self.respond(404, b'{"message":"Not Found"}', {"Content-Type": "application/json"})
+      return
+    raw, compressed, etag = cached
+
+    # Conditional hits do not count against the budget, as on api.github.com.
+    if self.headers.get("If-None-Match") == etag:
+      self.respond(304, headers={"ETag": etag, **self.mock.rate_limit_headers(resource)})
+      return
+    if not self.mock.consume(resource):
+      self.respond(403, b'{"message":"API rate limit exceeded"}', self.mock.rate_limit_headers(resource))
+      return
+
+    headers = {"Content-Type": "application/json", "ETag": etag, **self.mock.rate_limit_headers(resource)}
+    if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+      headers["Content-Encoding"] = "gzip"
+      self.respond(200, compressed, headers)
+    else:
+      self.respond(200, raw, headers)
+
+  def do_POST(self):
+    self.rfile.read(int(self.headers.get("Content-Length") or 0))
+    self.respond(501, b'{"message":"GraphQL is not served by the mock"}', {"Content-Type": "application/json"})
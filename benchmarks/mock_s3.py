@@ -0,0 +1,130 @@
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xml.sax.saxutils import escape
+
+STORED_HEADERS = ("Content-Type", "Content-Encoding", "Cache-Control")
+LIST_PAGE_SIZE = 1000
+
+
+class MockS3:
+  def __init__(self):
+    self.objects = {}
+    self._lock = threading.Lock()
+    self._server = None
+
+  @property
+  def url(self):
+    return f"http://127.0.0.1:{self._server.server_port}"
+
+  def start(self):
+    owner = self
+
+    class Handler(RequestHandler):
+      mock = owner
+
+    self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    self._server.daemon_threads = True
+    threading.Thread(target=self._server.serve_forever, daemon=True).start()
+    return self
+
+  def stop(self):
+    if self._server is not None:
+      self._server.shutdown()
+      self._server.server_close()
+      self._server = None
+
+  def put(self, path, body, headers):
+    with self._lock:
+      self.objects[path] = (body, headers)
+
+  def get(self, path):
+    with self._lock:
+      return self.objects.get(path)
+
+  def delete(self, path):
+    with self._lock:
+      self.objects.pop(path, None)
+
+  def list(self, bucket, prefix, after=""):
+    start = f"/{bucket}/"
+    with self._lock:
+      keys = sorted(urllib.parse.unquote(path[len(start):]) for path in self.objects if path.startswith(start))
+    keys = [key for key in keys if key.startswith(prefix) and key > after]
+    return keys[:LIST_PAGE_SIZE], len(keys) > LIST_PAGE_SIZE
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+  protocol_version = "HTTP/1.1"
+  # Headers and body go out in separate writes; with Nagle on, small
+  # keep-alive responses stall on delayed ACKs.
+  disable_nagle_algorithm = True
+  mock = None
+
+  def log_message(self, format, *args):
+    pass
+
+  def respond(self, status, body=b"", headers=None, send_body=True):
+    self.send_response(status)
+    for name, value in (headers or {}).items():
+      self.send_header(name, value)
+    self.send_header("Content-Length", str(len(body)))
+    self.end_headers()
+    if send_body:
+      self.wfile.write(body)
+
+  def authorized(self):
+    # Path-style only; signatures are not checked, just that the request was signed.
+    if (self.headers.get("Authorization") or "").startswith("AWS4-HMAC-SHA256 "):
+      return True
+    self.respond(403, b"<Error><Code>AccessDenied</Code></Error>", send_body=self.command != "HEAD")
+    return False
+
+  def do_PUT(self):
+    if not self.authorized():
+      return
+    body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+    headers = {name: self.headers[name] for name in STORED_HEADERS if self.headers.get(name)}
+    headers.update({name: value for name, value in self.headers.items() if name.lower().startswith("x-amz-meta-")})
+    self.mock.put(self.path, body, headers)
+    self.respond(200, headers={"ETag": '"mock"'})
+
+  def read_object(self, send_body):
+    if not self.authorized():
+      return
+    stored = self.mock.get(self.path)
+    if stored is None:
+      self.respond(404, b"<Error><Code>NoSuchKey</Code></Error>", send_body=send_body)
+      return
+    body, headers = stored
+    self.respond(200, body, headers, send_body=send_body)
+
+  def list_objects(self, bucket, query):
+    # ListObjectsV2; the continuation token is simply the last key returned.
+    keys, truncated = self.mock.list(bucket, query.get("prefix", ""), query.get("continuation-token", ""))
+    body = "".join(f"<Contents><Key>{escape(key)}</Key></Contents>" for key in keys)
+    if truncated:
+      body += f"<NextContinuationToken>{escape(keys[-1])}</NextContinuationToken>"
+    body = (
+      '<ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+      f"<IsTruncated>{'true' if truncated else 'false'}</IsTruncated>{body}</ListBucketResult>"
+    )
+    self.respond(200, body.encode("utf-8"), {"Content-Type": "application/xml"})
+
+  def do_GET(self):
+    parts = urllib.parse.urlsplit(self.path)
+    query = dict(urllib.parse.parse_qsl(parts.query))
+    if query.get("list-type") == "2":
+      if self.authorized():
+        self.list_objects(parts.path.strip("/"), query)
+      return
+    self.read_object(send_body=True)
+
+  def do_DELETE(self):
+    if not self.authorized():
+      return
+    self.mock.delete(self.path)
+    self.respond(204)
+
+  def do_HEAD(self):
+    self.read_object(send_body=False)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+import argparse
+import functools
+import os
+import statistics
+import sys
+import tempfile
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from render_benchmark import render_page, synthetic_dashboard
+
+PAGES = ("objects", "columnar", "static")
+FIELDS = ["fcp_ms", "dom_content_loaded_ms", "load_ms"]
+
+# Resolves once the first contentful paint is recorded; buffered so an entry
+# from before the call is still seen.
+READ_TIMINGS = """() => new Promise((resolve) => {
+  const timings = (fcp) => {
+    const navigation = performance.getEntriesByType("navigation")[0];
+    resolve({
+      fcp_ms: fcp === undefined ? null : fcp,
+      dom_content_loaded_ms: navigation.domContentLoadedEventEnd,
+      load_ms: navigation.loadEventEnd,
+      nodes: document.getElementsByTagName("*").length,
+    });
+  };
+  new PerformanceObserver((list, observer) => {
+    const entry = list.getEntriesByName("first-contentful-paint")[0];
+    if (entry) {
+      observer.disconnect();
+      timings(entry.startTime);
+    }
+  }).observe({ type: "paint", buffered: true });
+  setTimeout(() => timings(undefined), 5000);
+})"""
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+  def log_message(self, format, *args):
+    pass
+
+
+def write_pages(directory, counts):
+  cases = []
+  for count in counts:
+    dashboard = synthetic_dashboard(count)
+    for page in PAGES:
+      name = f"{page}-{count}.html"
+      with open(os.path.join(directory, name), "wb") as handle:
+        handle.write(render_page(page, dashboard))
+      cases.append((page, count, name, os.path.getsize(os.path.join(directory, name))))
+  return cases
+
+
+def measure(browser, url, runs, cpu_throttle):
+  samples = []
+  for _ in range(runs):
+    # A fresh context per load, so nothing is served from the browser cache.
+    context = browser.new_context(viewport={"width": 1280, "height": 800})
+    page = context.new_page()
+    if cpu_throttle > 1:
+      context.new_cdp_session(page).send("Emulation.setCPUThrottlingRate", {"rate": cpu_throttle})
+    page.goto(url, wait_until="load")
+    samples.append(page.evaluate(READ_TIMINGS))
+    context.close()
+  medians = {}
+  for field in FIELDS:
+    values = [sample[field] for sample in samples if sample[field] is not None]
+    medians[field] = statistics.median(values) if values else float("nan")
+  return medians, samples[0]["nodes"]
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Load each dashboard layout in headless Chromium and report first contentful paint.")
+  parser.add_argument("--counts", default="10,100,1000", help="comma separated items per section")
+  parser.add_argument("--runs", type=int, default=5, help="loads per case; the median is reported")
+  parser.add_argument("--cpu-throttle", type=float, default=4, help="Chromium CPU slowdown factor, to approximate a mid-range phone")
+  parser.add_argument("--browser", default="", help="Chrome or Chromium executable to use instead of Playwright's bundled build")
+  args = parser.parse_args()
+
+  try:
+    from playwright.sync_api import sync_playwright
+  except ImportError:
+    print("skipped: needs playwright (pip install playwright && playwright install chromium)")
+    return 0
+
+  directory = tempfile.mkdtemp(prefix="dashboard-paint-")
+  cases = write_pages(directory, [int(x) for x in args.counts.split(",") if x.strip()])
+  server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(QuietHandler, directory=directory))
+  server.daemon_threads = True
+  threading.Thread(target=server.serve_forever, daemon=True).start()
+  try:
+    with sync_playwright() as playwright:
+      browser = playwright.chromium.launch(executable_path=args.browser or None)
+      try:
+        print(f"{'page':<10}{'items':>7}{'page KB':>9}{'FCP ms':>9}{'DCL ms':>9}{'load ms':>9}{'DOM nodes':>11}")
+        for page, count, name, size in cases:
+          url = f"http://127.0.0.1:{server.server_port}/{name}"
+          medians, nodes = measure(browser, url, args.runs, args.cpu_throttle)
+          print(
+            f"{page:<10}{count:>7}{size / 1024:>9.0f}{medians['fcp_ms']:>9.1f}"
+            f"{medians['dom_content_loaded_ms']:>9.1f}{medians['load_ms']:>9.1f}{nodes:>11}"
+          )
+      finally:
+        browser.close()
+  finally:
+    server.shutdown()
+    server.server_close()
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
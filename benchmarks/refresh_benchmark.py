@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from mock_github import MockGitHub
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+USERNAME = "octo"
+TOKEN = "benchmark-token"
+METRICS = ["wall_ms", "requests", "bytes", "peak_kb"]
+
+
+class StubS3:
+  def __init__(self, client_error):
+    self.client_error = client_error
+    self.exceptions = SimpleNamespace(ClientError=client_error)
+    self.objects = {}
+
+  def put_object(self, Bucket, Key, Body, **kwargs):
+    body = Body.read() if hasattr(Body, "read") else Body
+    self.objects[(Bucket, Key)] = {"Body": body, "Metadata": kwargs.get("Metadata", {})}
+    return {}
+
+  def head_object(self, Bucket, Key):
+    if (Bucket, Key) not in self.objects:
+      raise self.client_error(404, "NotFound")
+    return {"Metadata": self.objects[(Bucket, Key)]["Metadata"]}
+
+  def get_object(self, Bucket, Key):
+    if (Bucket, Key) not in self.objects:
+      raise self.client_error(404, "NoSuchKey")
+    stored = self.objects[(Bucket, Key)]
+    return {"Body": io.BytesIO(stored["Body"]), "Metadata": stored["Metadata"]}
+
+  def delete_object(self, Bucket, Key):
+    self.objects.pop((Bucket, Key), None)
+    return {}
+
+  def list_objects_v2(self, Bucket, Prefix="", **kwargs):
+    keys = sorted(key for bucket, key in list(self.objects) if bucket == Bucket and key.startswith(Prefix))
+    return {"Contents": [{"Key": key} for key in keys], "IsTruncated": False}
+
+
+class LambdaContext:
+  def get_remaining_time_in_millis(self):
+    return 900000
+
+
+def reset_module(module):
+  module.HTTP_CLIENT.close()
+  module.RESPONSE_CACHE = module.ConditionalRequestCache()
+  if hasattr(module, "SCHEDULER"):
+    module.SCHEDULER = module.RateLimitScheduler()
+  if hasattr(module, "PUBLISHED_ARTIFACTS"):
+    module.PUBLISHED_ARTIFACTS.clear()
+  if hasattr(module, "SEARCH_SNAPSHOT"):
+    module.SEARCH_SNAPSHOT = module.StateSnapshot(("delta", "full"))
+  if hasattr(module, "ENRICHMENT_CACHE"):
+    module.ENRICHMENT_CACHE = module.StateSnapshot(("cached", "fetched"))
+
+
+def load_modules(api_url):
+  os.environ["GITHUB_API_URL"] = api_url
+  sys.path.insert(0, os.path.join(ROOT, "scripts"))
+  sys.path.insert(0, os.path.join(ROOT, "lambda"))
+  import dashboard_refresher
+  import fetch_github_dashboard
+
+  return dashboard_refresher, fetch_github_dashboard
+
+
+def lambda_stages(module, args):
+  os.environ.update({
+    "GITHUB_TOKEN": TOKEN,
+    "TARGET_GITHUB_USERNAME": USERNAME,
+    "OUTPUT_BUCKET": "benchmark",
+    "OUTPUT_KEY": "index.html",
+    "INCLUDE_PRIVATE": "false",
+    "ORGANIZATIONS_CSV": ",".join(org for org, _ in args.org_list),
+    "MAX_REPOSITORIES": str(args.max_repositories),
+    "MAX_ITEMS_PER_SECTION": str(args.max_items),
+    "MAX_CONCURRENCY": str(args.max_concurrency),
+    "HTTP_CACHE_BACKEND": "memory",
+  })
+  os.environ.pop("TARGET_GITHUB_PROFILE", None)
+  os.environ.pop("TARGET_GITHUB_USERS", None)
+  orgs = [org for org, _ in args.org_list]
+  state = {}
+
+  def fresh_s3():
+    module.S3_CLIENT = StubS3(module.S3Error)
+
+  def collection():
+    with ThreadPoolExecutor(max_workers=args.max_concurrency) as executor:
+      module.collect_repositories(TOKEN, USERNAME, False, orgs, args.max_repositories, executor)
+
+  def search():
+    with ThreadPoolExecutor(max_workers=args.max_concurrency) as executor:
+      groups = module.plan_searches([(section, query.format(username=USERNAME)) for section, query in module.SEARCH_SECTIONS])
+      futures = [executor.submit(module.search_group, TOKEN, group, args.max_items) for group in groups]
+      for future in futures:
+        future.result()
+
+  def sync_searches():
+    with ThreadPoolExecutor(max_workers=args.max_concurrency) as executor:
+      futures = [
+        executor.submit(module.sync_search, TOKEN, USERNAME, section, query.format(username=USERNAME), args.max_items, 3600)
+        for section, query in module.SEARCH_SECTIONS
+      ]
+      for future in futures:
+        future.result()
+
+  def full_sync():
+    module.SEARCH_SNAPSHOT.use(None)
+    sync_searches()
+
+  def collect_for_enrichment():
+    module.ENRICHMENT_CACHE.use(None)
+    with ThreadPoolExecutor(max_workers=args.max_concurrency) as executor:
+      state["repos"] = module.collect_repositories(TOKEN, USERNAME, False, orgs, args.max_repositories, executor)
+
+  def enrichment():
+    settings = {**module.load_settings(), "repository_enrichment": "memory"}
+    with ThreadPoolExecutor(max_workers=args.max_concurrency) as executor:
+      module.enrich_repositories(settings, state["repos"], executor)
+
+  def cached_enrichment():
+    collect_for_enrichment()
+    enrichment()
+
+  def build_for_render():
+    with ThreadPoolExecutor(max_workers=args.max_concurrency) as executor:
+      state["dashboard"] = module.build_dashboard(module.load_settings(), USERNAME, executor)
+
+  def render():
+    module.render_html("benchmark", state["dashboard"])
+
+  def render_static():
+    module.render_static_chunks("benchmark", state["dashboard"])
+
+  trend_settings = {
+    **module.load_settings(),
+    "trend_history": "file",
+    "trend_history_path": os.path.join(tempfile.mkdtemp(prefix="dashboard-benchmark-"), "trends"),
+  }
+  trend_start = 1700000000
+
+  def year_of_trends():
+    build_for_render()
+    shutil.rmtree(trend_settings["trend_history_path"], ignore_errors=True)
+    for day in range(365):
+      module.record_trends(trend_settings, "index.html", state["dashboard"], now=trend_start + day * 86400)
+
+  def trends():
+    module.record_trends(trend_settings, "index.html", state["dashboard"], now=trend_start + 365 * 86400)
+
+  def org_crawl():
+    # Async self-invocations become threads sharing the stub S3, the way
+    # workers share the bucket.
+    fresh_s3()
+    module.invoke_async = lambda name, payload: threading.Thread(
+      target=module.crawl_worker, args=(payload["crawl_shard"], LambdaContext()),
+    ).start()
+    settings = {**module.load_settings(), "crawl_workers": args.crawl_workers, "crawl_backend": "lambda"}
+    with ThreadPoolExecutor(max_workers=args.max_concurrency) as executor:
+      module.start_crawl(settings, LambdaContext(), executor).collect()
+
+  def handler():
+    module.handler({}, LambdaContext())
+
+  def warm_up():
+    fresh_s3()
+    handler()
+
+  return [
+    ("lambda.collection", None, collection),
+    ("lambda.search", None, search),
+    ("lambda.search_delta", full_sync, sync_searches),
+    ("lambda.enrichment_cold", collect_for_enrichment, enrichment),
+    ("lambda.enrichment_cached", cached_enrichment, enrichment),
+    ("lambda.render", build_for_render, render),
+    ("lambda.render_static", build_for_render, render_static),
+    ("lambda.trends", year_of_trends, trends),
+    ("lambda.org_crawl", None, org_crawl),
+    ("lambda.handler_cold", fresh_s3, handler),
+    ("lambda.handler_warm", warm_up, handler),
+  ]
+
+
+def terraform_stages(module, args):
+  scratch = tempfile.mkdtemp(prefix="dashboard-benchmark-")
+  cache_file = os.path.join(scratch, "http-cache.json")
+  snapshot_file = os.path.join(scratch, "snapshot.json")
+  query = {
+    "github_token": TOKEN,
+    "github_username": USERNAME,
+    "include_private": "false",
+    "max_repositories": str(args.max_repositories),
+    "max_items_per_section": str(args.max_items),
+    "max_concurrency": str(args.max_concurrency),
+    "organizations_csv": ",".join(org for org, _ in args.org_list),
+    "http_cache_file": "",
+  }
+
+  def run_main(values):
+    stdin = sys.stdin
+    sys.stdin = io.StringIO(json.dumps(values))
+    try:
+      with contextlib.redirect_stdout(io.StringIO()):
+        module.main()
+    finally:
+      sys.stdin = stdin
+
+  def main():
+    run_main(query)
+
+  def cached_main():
+    run_main({**query, "http_cache_file": cache_file})
+
+  def fresh_cache():
+    if os.path.exists(cache_file):
+      os.remove(cache_file)
+    cached_main()
+
+  def snapshot_main():
+    run_main({**query, "snapshot_file": snapshot_file, "snapshot_max_age": "3600"})
+
+  def fresh_snapshot():
+    if os.path.exists(snapshot_file):
+      os.remove(snapshot_file)
+    snapshot_main()
+
+  return [
+    ("terraform.main", None, main),
+    ("terraform.main_cached", fresh_cache, cached_main),
+    ("terraform.main_snapshot", fresh_snapshot, snapshot_main),
+  ]
+
+
+def measure(mock, modules, setup, run, repeat):
+  def prepare():
+    for module in modules:
+      reset_module(module)
+    mock.reset()
+    if setup is not None:
+      setup()
+    mock.reset()
+
+  walls = []
+  for _ in range(repeat):
+    prepare()
+    started = time.perf_counter()
+    run()
+    walls.append((time.perf_counter() - started) * 1000)
+  stats = mock.stats()
+
+  # Peak memory is taken from a separate traced run so tracing overhead
+  # does not leak into the wall time.
+  prepare()
+  tracemalloc.start()
+  try:
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+  finally:
+    tracemalloc.stop()
+
+  return {
+    "wall_ms": round(statistics.median(walls), 2),
+    "requests": stats["requests"],
+    "bytes": stats["bytes"],
+    "peak_kb": round(peak / 1024, 1),
+  }
+
+
+def compare(results, baseline, tolerance):
+  regressions = []
+  for stage, metrics in results.items():
+    previous = baseline.get(stage)
+    if not previous:
+      continue
+    for metric in METRICS:
+      before = previous.get(metric)
+      after = metrics[metric]
+      if before is None:
+        continue
+      # Request and byte counts are deterministic against the mock; timings
+      # and memory get the configured slack.
+      limit = before if metric in ("requests", "bytes") else before * (1 + tolerance)
+      if after > limit:
+        regressions.append(f"{stage} {metric}: {before} -> {after}")
+  return regressions
+
+
+def parse_orgs(value):
+  orgs = []
+  for entry in [x.strip() for x in value.split(",") if x.strip()]:
+    name, _, count = entry.partition("=")
+    orgs.append((name, int(count or 100)))
+  return orgs
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Benchmark the dashboard refresh pipeline against a local GitHub API stand-in.")
+  parser.add_argument("--repositories", type=int, default=150, help="repositories owned by the user")
+  parser.add_argument("--orgs", default="octo-org=120,octo-labs=40", help="org=repository_count pairs, comma separated")
+  parser.add_argument("--search-items", type=int, default=40, help="results per search query")
+  parser.add_argument("--padding", type=int, default=2000, help="filler bytes per repository (half per issue)")
+  parser.add_argument("--latency-ms", type=float, default=20, help="latency added to every mock response")
+  parser.add_argument("--max-repositories", type=int, default=20)
+  parser.add_argument("--max-items", type=int, default=20)
+  parser.add_argument("--max-concurrency", type=int, default=8)
+  parser.add_argument("--crawl-workers", type=int, default=4, help="shards for the lambda.org_crawl stage")
+  parser.add_argument("--repeat", type=int, default=5, help="timed runs per stage; the median is reported")
+  parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline file to compare against")
+  parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+  parser.add_argument("--tolerance", type=float, default=0.25, help="allowed wall time/memory growth over baseline")
+  args = parser.parse_args()
+  args.org_list = parse_orgs(args.orgs)
+
+  config = {
+    "repositories": args.repositories,
+    "orgs": args.orgs,
+    "search_items": args.search_items,
+    "padding": args.padding,
+    "latency_ms": args.latency_ms,
+    "max_repositories": args.max_repositories,
+    "max_items": args.max_items,
+    "max_concurrency": args.max_concurrency,
+    "crawl_workers": args.crawl_workers,
+  }
+
+  mock = MockGitHub(
+    repositories=args.repositories,
+    org_repositories=dict(args.org_list),
+    search_items=args.search_items,
+    padding=args.padding,
+    latency_ms=args.latency_ms,
+  ).start()
+  try:
+    lambda_module, terraform_module = load_modules(mock.url)
+    modules = [lambda_module, terraform_module]
+    stages = lambda_stages(lambda_module, args) + terraform_stages(terraform_module, args)
+
+    results = {}
+    for name, setup, run in stages:
+      results[name] = measure(mock, modules, setup, run, args.repeat)
+  finally:
+    mock.stop()
+
+  print(f"{'stage':<24}{'wall ms':>10}{'requests':>10}{'bytes':>12}{'peak KB':>10}")
+  for name, metrics in results.items():
+    print(f"{name:<24}{metrics['wall_ms']:>10.1f}{metrics['requests']:>10}{metrics['bytes']:>12}{metrics['peak_kb']:>10.1f}")
+
+  if args.save_baseline:
+    with open(args.baseline, "w", encoding="utf-8") as handle:
+      json.dump({"config": config, "stages": results}, handle, indent=2, sort_keys=True)
+      handle.write("\n")
+    print(f"Saved baseline to {args.baseline}")
+    return 0
+
+  if not os.path.exists(args.baseline):
+    print("No baseline found; run with --save-baseline to record one.")
+    return 0
+  with open(args.baseline, "r", encoding="utf-8") as handle:
+    baseline = json.load(handle)
+  if baseline.get("config") != config:
+    print("Baseline was recorded with different settings; skipping comparison.")
+    return 0
+
+  regressions = compare(results, baseline.get("stages", {}), args.tolerance)
+  for regression in regressions:
+    print(f"REGRESSION {regression}")
+  if not regressions:
+    print("No regressions against baseline.")
+  return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
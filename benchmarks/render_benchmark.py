@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "lambda"))
+
+import dashboard_refresher  # noqa: E402
+
+PROBE = """<script>
+  (() => {
+    const scriptDone = performance.now();
+    requestAnimationFrame(() => setTimeout(() => parent.postMessage({
+      script: scriptDone,
+      interactive: performance.now(),
+      nodes: document.getElementsByTagName("*").length,
+    }, "*"), 0));
+  })();
+</script>
+</body>"""
+
+RUNNER = """<!doctype html>
+<html lang="en">
+<head>
+  <meta charset="utf-8">
+  <title>Dashboard render benchmark</title>
+  <style>
+    body { font-family: ui-sans-serif, sans-serif; margin: 24px; }
+    table { border-collapse: collapse; }
+    th, td { border: 1px solid #ccc; padding: 4px 10px; text-align: right; }
+    iframe { width: 1200px; height: 800px; border: 0; position: absolute; left: -10000px; }
+  </style>
+</head>
+<body>
+  <h1>Dashboard render benchmark</h1>
+  <p>Median of __RUNS__ loads per case. <em>script</em> is when the page script finished, <em>interactive</em> the first frame after it (all ms since navigation start). <em>server</em> is the Python render time. The pages load in offscreen frames, which do not report a reliable first paint; <code>paint_benchmark.py</code> measures that.</p>
+  <table>
+    <thead><tr><th>page</th><th>items/section</th><th>server ms</th><th>script ms</th><th>interactive ms</th><th>DOM nodes</th><th>page KB</th></tr></thead>
+    <tbody id="results"></tbody>
+  </table>
+  <script>
+    const cases = __CASES__;
+    const runs = __RUNS__;
+    const median = (values) => values.slice().sort((a, b) => a - b)[Math.floor(values.length / 2)];
+    const load = (html) => new Promise((resolve) => {
+      const frame = document.createElement("iframe");
+      const onMessage = (event) => {
+        if (event.source !== frame.contentWindow) return;
+        window.removeEventListener("message", onMessage);
+        frame.remove();
+        resolve(event.data);
+      };
+      window.addEventListener("message", onMessage);
+      document.body.appendChild(frame);
+      frame.srcdoc = html;
+    });
+    (async () => {
+      const tbody = document.getElementById("results");
+      for (const item of cases) {
+        const samples = [];
+        for (let run = 0; run < runs; run += 1) {
+          samples.push(await load(item.html));
+        }
+        const row = document.createElement("tr");
+        [
+          item.page,
+          item.count,
+          item.server.toFixed(2),
+          median(samples.map((x) => x.script)).toFixed(1),
+          median(samples.map((x) => x.interactive)).toFixed(1),
+          samples[0].nodes,
+          (item.html.length / 1024).toFixed(0),
+        ].forEach((value) => {
+          const cell = document.createElement("td");
+          cell.textContent = value;
+          row.appendChild(cell);
+        });
+        tbody.appendChild(row);
+      }
+      document.title = "done";
+    })();
+  </script>
+</body>
+</html>
+"""
+
+
+def synthetic_dashboard(count):
+  repos = [
+    {
+      "name": f"octo/repository-{index}",
+      "url": f"https://github.com/octo/repository-{index}",
+      "updated_at": f"2024-01-01T00:{index % 60:02d}:00Z",
+      "stars": index,
+      "open_issues": index % 7,
+      "language": ["Python", "Go", "TypeScript", "Rust"][index % 4],
+      "visibility": "public",
+    }
+    for index in range(count)
+  ]
+
+  def items(kind):
+    return [
+      {
+        "title": f"{kind} number {index} with a reasonably long descriptive title",
+        "url": f"https://github.com/octo/repository-{index % 10}/issues/{index}",
+        "repo": f"octo/repository-{index % 10}",
+        "updated_at": f"2024-02-01T00:{index % 60:02d}:00Z",
+      }
+      for index in range(count)
+    ]
+
+  sections = {
+    "authored_prs": items("Authored PR"),
+    "review_requested_prs": items("Review request"),
+    "assigned_issues": items("Assigned issue"),
+    "authored_issues": items("Authored issue"),
+  }
+  return {
+    "username": "octo",
+    "profile": {
+      "name": "Octo Cat",
+      "bio": "",
+      "avatar_url": "",
+      "html_url": "https://github.com/octo",
+      "followers": 10,
+      "following": 2,
+      "public_repos": count,
+      "company": "",
+      "location": "",
+    },
+    "summary": {
+      "repositories": len(repos),
+      "authored_prs": count,
+      "review_requested_prs": count,
+      "assigned_issues": count,
+      "authored_issues": count,
+      "repo_stars": sum(repo["stars"] for repo in repos),
+    },
+    "languages": [{"name": name, "count": count // 4} for name in ("Python", "Go", "TypeScript", "Rust")],
+    "recent_repositories": repos,
+    **sections,
+  }
+
+
+def render_page(page, dashboard):
+  if page == "static":
+    return b"".join(dashboard_refresher.render_static_chunks("benchmark", dashboard))
+  return dashboard_refresher.render_html("benchmark", dashboard, page)
+
+
+def server_time(page, dashboard, runs):
+  samples = []
+  for _ in range(runs):
+    started = time.perf_counter()
+    render_page(page, dashboard)
+    samples.append((time.perf_counter() - started) * 1000)
+  return statistics.median(samples)
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Write an HTML page that measures dashboard time-to-interactive.")
+  parser.add_argument("--counts", default="10,50,100,250,500,1000", help="comma separated items per section")
+  parser.add_argument("--runs", type=int, default=5, help="loads per case; the median is reported")
+  parser.add_argument("--server-runs", type=int, default=25, help="Python renders per case; the median is reported")
+  parser.add_argument("--output", default="render-benchmark.html", help="path of the generated page")
+  args = parser.parse_args()
+
+  cases = []
+  print(f"{'page':<10} {'items':>6} {'server ms':>10} {'page KB':>8}")
+  for count in [int(x) for x in args.counts.split(",") if x.strip()]:
+    dashboard = synthetic_dashboard(count)
+    # objects and columnar are the script-rendered page with each payload
+    # encoding; static is the Lambda's prerendered page with no script.
+    for page in ("objects", "columnar", "static"):
+      html = render_page(page, dashboard).decode("utf-8")
+      server = server_time(page, dashboard, args.server_runs)
+      print(f"{page:<10} {count:>6} {server:>10.2f} {len(html) / 1024:>8.0f}")
+      cases.append({"page": page, "count": count, "server": server, "html": html.replace("</body>", PROBE, 1)})
+
+  # Escape "</" so embedded pages cannot terminate the runner's script tag.
+  page = RUNNER.replace("__CASES__", json.dumps(cases).replace("</", "<\\/")).replace("__RUNS__", str(args.runs))
+  with open(args.output, "w", encoding="utf-8") as handle:
+    handle.write(page)
+  print(f"Wrote {args.output}; open it in a browser and wait for the table to fill in.")
+
+
+if __name__ == "__main__":
+  main()
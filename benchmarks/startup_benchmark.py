@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from mock_github import MockGitHub
+from mock_s3 import MockS3
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIELDS = ["import_ms", "first_invocation_ms", "warm_invocation_ms", "max_rss_mb"]
+
+
+class LambdaContext:
+  def get_remaining_time_in_millis(self):
+    return 900000
+
+
+def child():
+  # Runs in a fresh interpreter so module import and the first invocation
+  # pay the same costs as a Lambda cold start.
+  import resource
+
+  sys.path.insert(0, os.path.join(ROOT, "lambda"))
+  started = time.perf_counter()
+  import dashboard_refresher
+  imported = time.perf_counter()
+  dashboard_refresher.handler({"force": True}, LambdaContext())
+  first = time.perf_counter()
+  dashboard_refresher.handler({"force": True}, LambdaContext())
+  warm = time.perf_counter()
+
+  rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "first_invocation_ms": (first - imported) * 1000,
+    "warm_invocation_ms": (warm - first) * 1000,
+    # ru_maxrss is kilobytes on Linux and bytes on macOS.
+    "max_rss_mb": rss / (1024 * 1024 if sys.platform == "darwin" else 1024),
+    "boto3_loaded": "boto3" in sys.modules,
+  }))
+
+
+def run_child(env):
+  completed = subprocess.run(
+    [sys.executable, os.path.abspath(__file__), "--child"],
+    env=env, capture_output=True, text=True, check=False,
+  )
+  if completed.returncode != 0:
+    return None, completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "failed"
+  return json.loads(completed.stdout.strip().splitlines()[-1]), None
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Measure refresher import time and first/warm invocation time per S3 client backend.")
+  parser.add_argument("--backends", default="boto3,sigv4", help="S3 client backends to compare")
+  parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per backend; the median is reported")
+  args = parser.parse_args()
+
+  github = MockGitHub(repositories=60, search_items=20).start()
+  s3 = MockS3().start()
+  try:
+    base_env = {
+      **os.environ,
+      "GITHUB_API_URL": github.url,
+      "GITHUB_TOKEN": "benchmark-token",
+      "TARGET_GITHUB_USERNAME": "octo",
+      "INCLUDE_PRIVATE": "false",
+      "OUTPUT_BUCKET": "benchmark",
+      "OUTPUT_KEY": "index.html",
+      "S3_ENDPOINT_URL": s3.url,
+      "AWS_ACCESS_KEY_ID": "AKIDBENCHMARK",
+      "AWS_SECRET_ACCESS_KEY": "benchmark-secret",
+      "AWS_REGION": "us-east-1",
+      "METRICS_MODE": "off",
+    }
+    base_env.pop("TARGET_GITHUB_USERS", None)
+
+    print(f"{'backend':<10}{'import ms':>12}{'first call ms':>16}{'warm call ms':>15}{'max RSS MB':>13}  boto3 loaded")
+    for backend in [x.strip() for x in args.backends.split(",") if x.strip()]:
+      env = {**base_env, "S3_CLIENT_BACKEND": backend}
+      samples = []
+      error = None
+      for _ in range(args.repeat):
+        github.reset()
+        sample, error = run_child(env)
+        if sample is None:
+          break
+        samples.append(sample)
+      if not samples:
+        print(f"{backend:<10}skipped: {error}")
+        continue
+      medians = {field: statistics.median(sample[field] for sample in samples) for field in FIELDS}
+      print(
+        f"{backend:<10}{medians['import_ms']:>12.1f}{medians['first_invocation_ms']:>16.1f}"
+        f"{medians['warm_invocation_ms']:>15.1f}{medians['max_rss_mb']:>13.1f}  {samples[0]['boto3_loaded']}"
+      )
+  finally:
+    github.stop()
+    s3.stop()
+  return 0
+
+
+if __name__ == "__main__":
+  if sys.argv[1:] == ["--child"]:
+    child()
+  else:
+    sys.exit(main())
@@ -0,0 +1,284 @@
+import html
+import urllib.parse
+
+# Server-side counterpart of renderDashboard() in the template: the same
+# panels and markup, built as escaped HTML strings so the page paints without
+# running any script. Keep the two in step when a panel changes.
+VIRTUALIZE_AFTER = 40
+PIE_COLORS = ["#36a2ff", "#3dd4a7", "#ffd166", "#ff7b7b", "#9b8cff", "#2dd4bf", "#f59e0b"]
+TREND_COUNTERS = [
+  ("followers", "Followers"),
+  ("repo_stars", "Stars (Listed Repos)"),
+  ("repositories", "Repos Listed"),
+  ("authored_prs", "Open PRs Authored"),
+  ("review_requested_prs", "PRs Requesting Review"),
+  ("assigned_issues", "Assigned Issues"),
+  ("authored_issues", "Open Issues Authored"),
+]
+
+
+def text(value):
+  return html.escape("" if value is None else str(value))
+
+
+def link(value):
+  # Only web links are emitted; anything else (javascript:, data:) is dropped.
+  value = str(value or "")
+  return html.escape(value) if urllib.parse.urlsplit(value).scheme in ("http", "https") else "#"
+
+
+def number(value):
+  return f"{value:.1f}".rstrip("0").rstrip(".")
+
+
+def repository_row(item):
+  meta = [
+    f"<span>Updated: {text(item.get('updated_at'))}</span>",
+    f"<span>Stars: {text(item.get('stars'))}</span>",
+    f"<span>Open issues: {text(item.get('open_issues'))}</span>",
+    f"<span>Language: {text(item.get('language') or 'n/a')}</span>",
+    f"<span>{text(item.get('visibility'))}</span>",
+  ]
+  if item.get("ci_status"):
+    meta.append(f'<span class="ci-{text(item["ci_status"])}">CI: {text(item["ci_status"])}</span>')
+  if item.get("open_prs") is not None:
+    meta.append(f"<span>Open PRs: {text(item['open_prs'])}</span>")
+  if item.get("last_commit_at"):
+    meta.append(f'<span title="{text(item.get("last_commit_message"))}">Last commit: {text(item["last_commit_at"])}</span>')
+  return (
+    f'<a href="{link(item.get("url"))}" target="_blank" rel="noreferrer">{text(item.get("name"))}</a>'
+    f'<div class="meta">{"".join(meta)}</div>'
+  )
+
+
+def issue_row(item):
+  return (
+    f'<a href="{link(item.get("url"))}" target="_blank" rel="noreferrer">{text(item.get("title"))}</a>'
+    f'<div class="meta"><span>{text(item.get("repo"))}</span><span>Updated: {text(item.get("updated_at"))}</span></div>'
+  )
+
+
+# title, section, dashboard field, empty text, row renderer, row limit
+PANELS = [
+  ("Recently Updated Repositories", "repositories", "recent_repositories", "No repositories found.", repository_row, 3),
+  ("Open PRs Authored", "authored_prs", "authored_prs", "No open authored pull requests.", issue_row, None),
+  ("PRs Requesting Review", "review_requested_prs", "review_requested_prs", "No review requests right now.", issue_row, None),
+  ("Authored Open Issues", "authored_issues", "authored_issues", "No authored open issues.", issue_row, None),
+]
+
+
+def stale_badge(dashboard, section):
+  if section not in (dashboard.get("stale_sections") or []):
+    return ""
+  return '<span class="stale" title="Not refreshed in the last run; showing the previous data.">stale</span>'
+
+
+def heading(dashboard, title, section=None):
+  return f"<h2>{text(title)}{stale_badge(dashboard, section)}</h2>"
+
+
+def empty(message):
+  return f'<p class="empty">{text(message)}</p>'
+
+
+def row_list(items, render_row):
+  rows = "".join(f"<li>{render_row(item)}</li>" for item in items)
+  # Long lists scroll inside the panel like the virtualized client lists;
+  # content-visibility skips layout and paint for the rows out of view.
+  if len(items) > VIRTUALIZE_AFTER:
+    return f'<div class="virtual-viewport"><ul class="static-list">{rows}</ul></div>'
+  return f"<ul>{rows}</ul>"
+
+
+def panel(body, full_span=False):
+  return f'<article class="panel{" full-span" if full_span else ""}">{body}</article>'
+
+
+def grid(panels):
+  # Mirrors applyFullSpanForOddGrid: an odd last panel spans both columns.
+  return "".join(panel(body, full_span=len(panels) % 2 == 1 and index == len(panels) - 1) for index, body in enumerate(panels))
+
+
+def bar_chart(dashboard, title, rows, message, section=None):
+  if not rows:
+    return heading(dashboard, title, section) + empty(message)
+  top = max([float(value or 0) for _, value in rows] + [1])
+  bars = "".join(
+    '<div class="chart-row">'
+    f'<div class="chart-label">{text(label)}</div>'
+    f'<div class="chart-track"><div class="chart-fill" style="width: {max(2, round(float(value or 0) / top * 100))}%"></div></div>'
+    f'<div class="chart-value">{text(value or 0)}</div>'
+    "</div>"
+    for label, value in rows
+  )
+  return heading(dashboard, title, section) + f'<div class="chart-list">{bars}</div>'
+
+
+def pie_chart(dashboard, title, rows, message, section=None):
+  rows = [(label, float(value or 0)) for label, value in rows if float(value or 0) > 0]
+  if not rows:
+    return heading(dashboard, title, section) + empty(message)
+  total = sum(value for _, value in rows)
+  segments = []
+  legend = []
+  current = 0
+  for index, (label, value) in enumerate(rows):
+    color = PIE_COLORS[index % len(PIE_COLORS)]
+    start = current / total * 100
+    current += value
+    segments.append(f"{color} {number(start)}% {number(current / total * 100)}%")
+    legend.append(
+      '<div class="legend-row">'
+      f'<div class="legend-swatch" style="background: {color}"></div>'
+      f"<div>{text(label)}</div><div>{number(value)} ({round(value / total * 100)}%)</div>"
+      "</div>"
+    )
+  return heading(dashboard, title, section) + (
+    '<div class="pie-layout">'
+    f'<div class="pie" style="background: conic-gradient({", ".join(segments)})"><div class="pie-hole">Total {number(total)}</div></div>'
+    f'<div class="legend-list">{"".join(legend)}</div>'
+    "</div>"
+  )
+
+
+def list_panel(dashboard, title, items, message, section):
+  if not items:
+    return heading(dashboard, title, section) + empty(message)
+  return heading(dashboard, title, section) + row_list(items, issue_row)
+
+
+def sparkline(values, labels):
+  if not values or len(values) < 2:
+    return '<span class="subtle">Not enough history</span>'
+  low = min(values)
+  high = max(values)
+  spread = high - low or 1
+  points = " ".join(
+    f"{index / (len(values) - 1) * 100:.1f},{27 - (value - low) / spread * 26:.1f}" for index, value in enumerate(values)
+  )
+  return (
+    '<svg class="sparkline" viewBox="0 0 100 28" preserveAspectRatio="none">'
+    f"<title>{text(labels[0])} to {text(labels[-1])}: {text(low)} to {text(high)}</title>"
+    f'<polyline points="{points}" /></svg>'
+  )
+
+
+def trend_panel(dashboard, title, group, rows, format_value):
+  trends = dashboard["trends"]
+  lines = ['<div class="trend-row subtle"><div></div><div>Daily</div><div>Weekly</div><div class="chart-value">Now</div></div>']
+  for key, label in rows:
+    daily = trends["daily"][group][key]
+    lines.append(
+      '<div class="trend-row">'
+      f'<div class="chart-label">{text(label)}</div>'
+      f'<div>{sparkline(daily, trends["daily"]["labels"])}</div>'
+      f'<div>{sparkline(trends["weekly"][group][key], trends["weekly"]["labels"])}</div>'
+      f'<div class="chart-value">{text(format_value(daily[-1] if daily else 0))}</div>'
+      "</div>"
+    )
+  return heading(dashboard, title) + f'<div class="chart-list">{"".join(lines)}</div>'
+
+
+def profile_section(dashboard):
+  profile = dashboard["profile"]
+  languages = ", ".join(f"{entry['name']} ({entry['count']})" for entry in dashboard.get("languages") or [])
+  meta = []
+  if profile.get("company"):
+    meta.append(f"<span>Company: {text(profile['company'])}</span>")
+  if profile.get("location"):
+    meta.append(f"<span>Location: {text(profile['location'])}</span>")
+  meta.append(f"<span>Following: {text(profile.get('following'))}</span>")
+  if languages:
+    meta.append(f"<span>Top langs: {text(languages)}</span>")
+  bio = f'<p class="subtle">{text(profile["bio"])}</p>' if profile.get("bio") else ""
+  return (
+    f'<img class="avatar" src="{link(profile.get("avatar_url"))}" alt="{text(dashboard["username"])} avatar" />'
+    "<div>"
+    '<div class="profile-title">'
+    f'<a href="{link(profile.get("html_url"))}" target="_blank" rel="noreferrer">{text(profile.get("name"))}</a>'
+    f'<span class="subtle">@{text(dashboard["username"])}</span>'
+    "</div>"
+    f'<div class="meta">{"".join(meta)}</div>{bio}'
+    "</div>"
+  )
+
+
+def summary_section(dashboard):
+  summary = dashboard["summary"]
+  fields = [
+    ("Repos Listed", summary.get("repositories")),
+    ("Public Repos", dashboard["profile"].get("public_repos")),
+    ("Followers", dashboard["profile"].get("followers")),
+    ("Open PRs Authored", summary.get("authored_prs")),
+    ("Open Issues Authored", summary.get("authored_issues")),
+    ("Stars (Listed Repos)", summary.get("repo_stars")),
+  ]
+  return "".join(
+    f'<div class="metric"><div class="label">{text(label)}</div><div class="value">{text(value)}</div></div>'
+    for label, value in fields
+  )
+
+
+def charts_section(dashboard):
+  summary = dashboard["summary"]
+  languages = dashboard.get("languages") or []
+  by_bytes = any(entry.get("bytes") is not None for entry in languages)
+  starred = sorted(dashboard.get("recent_repositories") or [], key=lambda repo: repo.get("stars") or 0, reverse=True)[:6]
+  panels = [
+    bar_chart(
+      dashboard, "Top Repositories by Stars", [(repo["name"], repo.get("stars") or 0) for repo in starred],
+      "No repository star data.", "repositories",
+    ),
+    bar_chart(dashboard, "Open Work Activity", [
+      ("Open PRs Authored", summary.get("authored_prs") or 0),
+      ("PRs Requesting Review", summary.get("review_requested_prs") or 0),
+      ("Assigned Issues", summary.get("assigned_issues") or 0),
+      ("Open Issues Authored", summary.get("authored_issues") or 0),
+    ], "No activity data."),
+    pie_chart(
+      dashboard, "Language Distribution (KB)" if by_bytes else "Language Distribution",
+      [
+        (entry["name"], max(1, round((entry.get("bytes") or 0) / 1024)) if by_bytes else entry.get("count") or 0)
+        for entry in languages
+      ],
+      "No language data.", "repositories",
+    ),
+    list_panel(dashboard, "Assigned Work Issues", dashboard.get("assigned_issues"), "No assigned issues.", "assigned_issues"),
+  ]
+  if dashboard.get("organizations"):
+    panels.append(bar_chart(
+      dashboard, "Organizations by Stars",
+      [(f"{org['name']} ({org['repositories']} repos)", org["stars"]) for org in dashboard["organizations"]],
+      "No organization data.", "organizations",
+    ))
+    panels.append(bar_chart(
+      dashboard, "Top Organization Repositories by Stars",
+      [(repo["name"], repo.get("stars") or 0) for repo in (dashboard.get("org_repositories") or [])[:10]],
+      "No organization repositories.", "organizations",
+    ))
+  if dashboard.get("trends"):
+    panels.append(trend_panel(dashboard, "Trends", "counters", TREND_COUNTERS, str))
+    panels.append(trend_panel(
+      dashboard, "Language Mix Trend", "languages",
+      [(name, name) for name in dashboard["trends"]["daily"]["languages"]], lambda value: f"{value / 10:.1f}%",
+    ))
+  return grid(panels)
+
+
+def panels_section(dashboard):
+  panels = []
+  for title, section, field, message, render_row, limit in PANELS:
+    items = (dashboard.get(field) or [])[:limit]
+    panels.append(heading(dashboard, title, section) + (row_list(items, render_row) if items else empty(message)))
+  return grid(panels)
+
+
+def render_sections(dashboard):
+  # Values for the static template's slots, keyed by slot name.
+  return {
+    "static_title": text(f"GitHub Analytics Dashboard for {dashboard['username']}") + stale_badge(dashboard, "profile"),
+    "static_profile": profile_section(dashboard),
+    "static_summary": summary_section(dashboard),
+    "static_charts": charts_section(dashboard),
+    "static_panels": panels_section(dashboard),
+  }
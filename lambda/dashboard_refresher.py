@@ -1,11 +1,64 @@
 #!/usr/bin/env python3
+import base64
+import concurrent.futures
+import contextlib
+import gzip
+import hashlib
+import heapq
+import hmac
+import http.client
+import io
 import json
+import multiprocessing
 import os
+import posixpath
+import random
+import ssl
+import threading
+import time
+import urllib.error
 import urllib.parse
-import urllib.request
-from datetime import datetime
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from xml.etree import ElementTree
 
-import boto3
+import dashboard_prerender
+import dashboard_template
+
+
+RepositoryRecord = namedtuple(
+  "RepositoryRecord",
+  [
+    "name", "url", "updated_at", "stars", "open_issues", "language", "visibility", "pushed_at",
+    "ci_status", "open_prs", "last_commit_at", "last_commit_message",
+  ],
+  defaults=("", None, None, "", ""),
+)
+IssueRecord = namedtuple("IssueRecord", ["title", "url", "repo", "updated_at"])
+
+LIST_SECTIONS = [
+  "languages",
+  "recent_repositories",
+  "authored_prs",
+  "review_requested_prs",
+  "assigned_issues",
+  "authored_issues",
+  "org_repositories",
+]
+
+GITHUB_API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+
+REPOSITORY_PAGE_SIZE = 100
+MAX_REPOSITORY_PAGES = 10
+
+SEARCH_SECTIONS = [
+  ("authored_prs", "is:pr is:open author:{username}"),
+  ("review_requested_prs", "is:pr is:open review-requested:{username}"),
+  ("assigned_issues", "is:issue is:open assignee:{username}"),
+  ("authored_issues", "is:issue is:open author:{username}"),
+]
 
 
 def bool_from_string(value, default):
@@ -37,7 +90,836 @@ def resolve_username(profile_or_username, fallback_username):
   return path.split("/")[0].replace("@", "")
 
 
-def gh_get(url, token):
+class HTTPResponse:
+  __slots__ = ("status", "reason", "headers", "body")
+
+  def __init__(self, status, reason, headers, body):
+    self.status = status
+    self.reason = reason
+    self.headers = headers
+    self.body = body
+
+
+class PooledHTTPClient:
+  RETRYABLE_ERRORS = (http.client.RemoteDisconnected, http.client.BadStatusLine, ConnectionError)
+
+  def __init__(self, timeout=30, max_idle_per_host=32, max_redirects=5):
+    self.timeout = timeout
+    self.max_idle_per_host = max_idle_per_host
+    self.max_redirects = max_redirects
+    self._ssl_context = None
+    self._idle = {}
+    self._lock = threading.Lock()
+
+  def _acquire(self, scheme, netloc):
+    with self._lock:
+      idle = self._idle.get((scheme, netloc))
+      if idle:
+        return idle.pop(), True
+      # Loading the CA bundle is a noticeable share of module init, so it
+      # waits for the first HTTPS connection.
+      if scheme == "https" and self._ssl_context is None:
+        self._ssl_context = ssl.create_default_context()
+    if scheme == "https":
+      return http.client.HTTPSConnection(netloc, timeout=self.timeout, context=self._ssl_context), False
+    return http.client.HTTPConnection(netloc, timeout=self.timeout), False
+
+  def _release(self, scheme, netloc, conn):
+    with self._lock:
+      idle = self._idle.setdefault((scheme, netloc), [])
+      if len(idle) < self.max_idle_per_host:
+        idle.append(conn)
+        return
+    conn.close()
+
+  def close(self):
+    with self._lock:
+      pools, self._idle = self._idle, {}
+    for idle in pools.values():
+      for conn in idle:
+        conn.close()
+
+  def _send(self, method, parsed, headers, body, decode_content):
+    path = parsed.path or "/"
+    if parsed.query:
+      path = f"{path}?{parsed.query}"
+    for attempt in range(2):
+      conn, reused = self._acquire(parsed.scheme, parsed.netloc)
+      try:
+        conn.request(method, path, body=body, headers=headers)
+        resp = conn.getresponse()
+        data = resp.read()
+      except self.RETRYABLE_ERRORS:
+        conn.close()
+        # The server may have dropped a connection that sat idle in the pool.
+        if reused and attempt == 0:
+          continue
+        raise
+      except Exception:
+        conn.close()
+        raise
+      if resp.will_close:
+        conn.close()
+      else:
+        self._release(parsed.scheme, parsed.netloc, conn)
+      if decode_content and (resp.getheader("Content-Encoding") or "").lower() == "gzip":
+        data = gzip.decompress(data)
+      return HTTPResponse(resp.status, resp.reason, resp.headers, data)
+
+  def request(self, method, url, headers=None, body=None, decode_content=True):
+    headers = dict(headers or {})
+    if decode_content:
+      headers.setdefault("Accept-Encoding", "gzip")
+    for _ in range(self.max_redirects + 1):
+      parsed = urllib.parse.urlsplit(url)
+      response = self._send(method, parsed, headers, body, decode_content)
+      location = response.headers.get("Location")
+      if method != "GET" or response.status not in {301, 302, 303, 307, 308} or not location:
+        return response
+      url = urllib.parse.urljoin(url, location)
+      if urllib.parse.urlsplit(url).netloc != parsed.netloc:
+        headers.pop("Authorization", None)
+    raise urllib.error.HTTPError(url, response.status, "Too many redirects", response.headers, io.BytesIO(response.body))
+
+
+HTTP_CLIENT = PooledHTTPClient()
+
+
+# Every invocation is a new run. A section that missed its deadline keeps
+# running in the background, in threads that remember the run that started
+# them; state kept between invocations ignores their writes once a later run
+# has begun, so a straggler cannot change that run's skip list, snapshots or
+# response cache.
+RUNS = {"current": 0}
+RUN_THREAD = threading.local()
+
+
+def new_run():
+  RUNS["current"] += 1
+
+
+def join_run(run):
+  RUN_THREAD.run = run
+
+
+def outdated_thread():
+  run = getattr(RUN_THREAD, "run", None)
+  return run is not None and run != RUNS["current"]
+
+
+HTTP_CACHE_STATS = ("hits", "revalidated", "misses", "evicted")
+HTTP_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+
+class ConditionalRequestCache:
+  # Two tiers: entries live in memory, which a warm process keeps between
+  # runs, over an optional store that is read once and written back on flush.
+  # An entry younger than its endpoint's TTL is served without a request; an
+  # older one is revalidated with If-None-Match. Past max_bytes of bodies the
+  # least recently used entries are evicted.
+  def __init__(self, store=None):
+    self.store = store
+    self.enabled = True
+    self.ttls = {}
+    self.max_bytes = HTTP_CACHE_MAX_BYTES
+    self.entries = OrderedDict()
+    self.loaded = False
+    self._size = 0
+    self._dirty = False
+    self._stats = dict.fromkeys(HTTP_CACHE_STATS, 0)
+    self._lock = threading.Lock()
+
+  def use(self, store, enabled=True, ttls=None, max_bytes=HTTP_CACHE_MAX_BYTES):
+    with self._lock:
+      self.enabled = enabled
+      self.ttls = dict(ttls or {})
+      self.max_bytes = max_bytes
+      if getattr(store, "location", None) != getattr(self.store, "location", None):
+        self.store = store
+        self.loaded = False
+      self._dirty = False
+      self._stats = dict.fromkeys(HTTP_CACHE_STATS, 0)
+
+  def key(self, url, token):
+    scope = hashlib.sha256(token.encode("utf-8")).hexdigest()[:16] if token else "anonymous"
+    return f"{scope} {url}"
+
+  def ttl(self, url):
+    return self.ttls.get(request_endpoint(url), 0)
+
+  def _load(self):
+    if self.loaded:
+      return
+    if self.store is not None:
+      self.entries = OrderedDict(self.store.load())
+    self._size = sum(len(entry["body"]) for entry in self.entries.values())
+    self.loaded = True
+    self._evict()
+
+  def _evict(self):
+    while self._size > self.max_bytes and self.entries:
+      _, entry = self.entries.popitem(last=False)
+      self._size -= len(entry["body"])
+      self._stats["evicted"] += 1
+      self._dirty = True
+
+  def lookup(self, key):
+    with self._lock:
+      if not self.enabled:
+        return None
+      self._load()
+      entry = self.entries.get(key)
+      if entry is not None:
+        self.entries.move_to_end(key)
+      return entry
+
+  def fresh(self, entry, url):
+    ttl = self.ttl(url)
+    return ttl > 0 and time.time() - entry.get("fetched_at", 0) < ttl
+
+  def hit(self):
+    if outdated_thread():
+      return
+    with self._lock:
+      self._stats["hits"] += 1
+
+  def revalidated(self, key, url):
+    if outdated_thread():
+      return
+    with self._lock:
+      self._stats["revalidated"] += 1
+      entry = self.entries.get(key)
+      # A 304 confirms the body is current, so its TTL starts over.
+      if entry is not None and self.ttl(url) > 0:
+        entry["fetched_at"] = time.time()
+        self._dirty = True
+
+  def remember(self, key, url, headers, body):
+    etag = headers.get("ETag")
+    last_modified = headers.get("Last-Modified")
+    if outdated_thread():
+      return
+    with self._lock:
+      self._stats["misses"] += 1
+      if not self.enabled or (not etag and not last_modified and not self.ttl(url)):
+        return
+      self._load()
+      previous = self.entries.pop(key, None)
+      if previous is not None:
+        self._size -= len(previous["body"])
+        self._dirty = True
+      # A body larger than the whole cache would only evict everything else.
+      if len(body) > self.max_bytes:
+        return
+      self.entries[key] = {"etag": etag, "last_modified": last_modified, "fetched_at": time.time(), "body": body}
+      self._size += len(body)
+      self._dirty = True
+      self._evict()
+
+  def stats(self):
+    with self._lock:
+      return dict(self._stats)
+
+  def flush(self):
+    with self._lock:
+      if not self.enabled or not self._dirty:
+        return
+      entries = dict(self.entries)
+      self._dirty = False
+    if self.store is not None:
+      self.store.save(entries)
+
+
+class S3CacheStore:
+  def __init__(self, bucket, key):
+    self.bucket = bucket
+    self.key = key
+    self.location = f"s3://{bucket}/{key}"
+
+  def load(self):
+    s3 = s3_client()
+    try:
+      obj = s3.get_object(Bucket=self.bucket, Key=self.key)
+    except s3.exceptions.ClientError:
+      return {}
+    return json.loads(gzip.decompress(obj["Body"].read()).decode("utf-8"))
+
+  def save(self, entries):
+    s3_client().put_object(
+      Bucket=self.bucket,
+      Key=self.key,
+      Body=gzip.compress(json.dumps(entries).encode("utf-8")),
+      ContentType="application/json",
+      ContentEncoding="gzip",
+    )
+
+
+RESPONSE_CACHE = ConditionalRequestCache()
+
+
+class StateSnapshot:
+  # Keyed state carried between runs: search results with their high-water
+  # updated_at, or per-repository enrichment with the version it was read at.
+  # stats() counts how each entry was produced, by the given modes.
+  def __init__(self, modes, store=None):
+    self.modes = modes
+    self.store = store
+    self.enabled = False
+    self.entries = {}
+    self.loaded = False
+    self._used = set()
+    self._dirty = False
+    self._stats = dict.fromkeys(modes, 0)
+    self._lock = threading.Lock()
+
+  def use(self, store, enabled=True):
+    with self._lock:
+      self.enabled = enabled
+      if getattr(store, "location", None) != getattr(self.store, "location", None):
+        self.store = store
+        self.loaded = False
+      self._used = set()
+      self._dirty = False
+      self._stats = dict.fromkeys(self.modes, 0)
+
+  def get(self, key):
+    with self._lock:
+      if not self.enabled:
+        return None
+      if not self.loaded:
+        self.entries = self.store.load() if self.store is not None else self.entries
+        self.loaded = True
+      self._used.add(key)
+      return self.entries.get(key)
+
+  def put(self, key, entry, mode):
+    if outdated_thread():
+      return
+    with self._lock:
+      self._stats[mode] += 1
+      if not self.enabled:
+        return
+      self._used.add(key)
+      self._dirty = True
+      self.entries[key] = entry
+
+  def count(self, mode):
+    if outdated_thread():
+      return
+    with self._lock:
+      self._stats[mode] += 1
+
+  def stats(self):
+    with self._lock:
+      return dict(self._stats)
+
+  def flush(self):
+    with self._lock:
+      # A run that never read the snapshot (a webhook patching other
+      # sections) leaves it as it is instead of pruning every entry.
+      if not self.enabled or not self._used:
+        return
+      stale = set(self.entries) - self._used
+      if not self._dirty and not stale:
+        return
+      for key in stale:
+        del self.entries[key]
+      entries = dict(self.entries)
+      self._dirty = False
+    if self.store is not None:
+      self.store.save(entries)
+
+
+SEARCH_SNAPSHOT = StateSnapshot(("delta", "full"))
+ENRICHMENT_CACHE = StateSnapshot(("cached", "fetched"))
+
+
+def sigv4_headers(method, url, headers, body, region, service, credentials, now=None):
+  parsed = urllib.parse.urlsplit(url)
+  amz_date = (now or datetime.utcnow()).strftime("%Y%m%dT%H%M%SZ")
+  digest = hashlib.sha256()
+  for chunk in [body] if isinstance(body, bytes) else body:
+    digest.update(chunk)
+  payload_hash = digest.hexdigest()
+  headers = {**headers, "Host": parsed.netloc, "X-Amz-Date": amz_date, "X-Amz-Content-Sha256": payload_hash}
+  if credentials.get("token"):
+    headers["X-Amz-Security-Token"] = credentials["token"]
+
+  canonical_headers = sorted((name.lower(), " ".join(str(value).split())) for name, value in headers.items())
+  signed_headers = ";".join(name for name, _ in canonical_headers)
+  canonical_query = "&".join(sorted(
+    f"{urllib.parse.quote(name, safe='-_.~')}={urllib.parse.quote(value, safe='-_.~')}"
+    for name, value in urllib.parse.parse_qsl(parsed.query, keep_blank_values=True)
+  ))
+  canonical_request = "\n".join([
+    method,
+    parsed.path or "/",
+    canonical_query,
+    "".join(f"{name}:{value}\n" for name, value in canonical_headers),
+    signed_headers,
+    payload_hash,
+  ])
+  scope = f"{amz_date[:8]}/{region}/{service}/aws4_request"
+  string_to_sign = "\n".join([
+    "AWS4-HMAC-SHA256", amz_date, scope, hashlib.sha256(canonical_request.encode("utf-8")).hexdigest(),
+  ])
+  signing_key = f"AWS4{credentials['secret_key']}".encode("utf-8")
+  for part in (amz_date[:8], region, service, "aws4_request"):
+    signing_key = hmac.new(signing_key, part.encode("utf-8"), hashlib.sha256).digest()
+  signature = hmac.new(signing_key, string_to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
+  headers["Authorization"] = (
+    f"AWS4-HMAC-SHA256 Credential={credentials['access_key']}/{scope}, "
+    f"SignedHeaders={signed_headers}, Signature={signature}"
+  )
+  return headers
+
+
+def aws_region():
+  return os.getenv("AWS_REGION") or os.getenv("AWS_DEFAULT_REGION") or "us-east-1"
+
+
+def aws_credentials():
+  return {
+    "access_key": os.getenv("AWS_ACCESS_KEY_ID", ""),
+    "secret_key": os.getenv("AWS_SECRET_ACCESS_KEY", ""),
+    "token": os.getenv("AWS_SESSION_TOKEN", ""),
+  }
+
+
+class S3Error(Exception):
+  def __init__(self, status, code, message=""):
+    super().__init__(f"S3 request failed ({status} {code}) {message}".strip())
+    self.response = {"Error": {"Code": code, "Message": message}, "ResponseMetadata": {"HTTPStatusCode": status}}
+
+
+class SigV4S3Client:
+  # Covers the S3 calls the refresher makes, with boto3's call shape,
+  # over the pooled HTTP client so boto3 never has to be imported.
+  exceptions = SimpleNamespace(ClientError=S3Error)
+  PUT_HEADERS = {"ContentType": "Content-Type", "ContentEncoding": "Content-Encoding", "CacheControl": "Cache-Control"}
+
+  def __init__(self, region, endpoint_url="", http_client=None):
+    self.region = region
+    self.endpoint_url = endpoint_url.rstrip("/")
+    self.http_client = http_client or HTTP_CLIENT
+
+  def _url(self, bucket, key):
+    path = urllib.parse.quote(key, safe="/-_.~")
+    if self.endpoint_url:
+      return f"{self.endpoint_url}/{bucket}/{path}"
+    # Dotted bucket names do not match the wildcard certificate, so they
+    # fall back to path-style addressing.
+    if "." in bucket:
+      return f"https://s3.{self.region}.amazonaws.com/{bucket}/{path}"
+    return f"https://{bucket}.s3.{self.region}.amazonaws.com/{path}"
+
+  def _request(self, method, bucket, key, headers=None, body=b"", query=None):
+    url = self._url(bucket, key)
+    if query:
+      url += "?" + urllib.parse.urlencode(query, quote_via=urllib.parse.quote)
+    headers = dict(headers or {})
+    if isinstance(body, dashboard_template.ChunkedBody):
+      # Sent chunk by chunk with an explicit length instead of being joined.
+      headers["Content-Length"] = str(body.length)
+      body = body.chunks
+    signed = sigv4_headers(method, url, headers, body, self.region, "s3", aws_credentials())
+    response = self.http_client.request(method, url, signed, body or None, decode_content=False)
+    if response.status >= 300:
+      text = response.body.decode("utf-8", "replace")
+      code = text.split("<Code>", 1)[1].split("</Code>", 1)[0] if "<Code>" in text else str(response.status)
+      raise S3Error(response.status, code, response.reason)
+    return response
+
+  def _metadata(self, headers):
+    return {
+      name[len("x-amz-meta-"):].lower(): value
+      for name, value in headers.items()
+      if name.lower().startswith("x-amz-meta-")
+    }
+
+  def put_object(self, Bucket, Key, Body, Metadata=None, **kwargs):
+    headers = {self.PUT_HEADERS[name]: value for name, value in kwargs.items()}
+    for name, value in (Metadata or {}).items():
+      headers[f"x-amz-meta-{name}"] = value
+    response = self._request("PUT", Bucket, Key, headers, Body)
+    return {"ETag": response.headers.get("ETag")}
+
+  def head_object(self, Bucket, Key):
+    response = self._request("HEAD", Bucket, Key)
+    return {"Metadata": self._metadata(response.headers), "ETag": response.headers.get("ETag")}
+
+  def get_object(self, Bucket, Key):
+    response = self._request("GET", Bucket, Key)
+    return {
+      "Body": io.BytesIO(response.body),
+      "Metadata": self._metadata(response.headers),
+      "ContentEncoding": response.headers.get("Content-Encoding"),
+    }
+
+  def delete_object(self, Bucket, Key):
+    self._request("DELETE", Bucket, Key)
+    return {}
+
+  def list_objects_v2(self, Bucket, Prefix="", ContinuationToken=None):
+    query = {"list-type": "2", "prefix": Prefix}
+    if ContinuationToken:
+      query["continuation-token"] = ContinuationToken
+    root = ElementTree.fromstring(self._request("GET", Bucket, "", query=query).body)
+    # {*} matches the S3 XML namespace.
+    result = {
+      "Contents": [{"Key": element.findtext("{*}Key")} for element in root.iterfind("{*}Contents")],
+      "IsTruncated": root.findtext("{*}IsTruncated") == "true",
+    }
+    if result["IsTruncated"]:
+      result["NextContinuationToken"] = root.findtext("{*}NextContinuationToken")
+    return result
+
+
+S3_CLIENT = None
+S3_CLIENT_LOCK = threading.Lock()
+
+
+def list_keys(s3, bucket, prefix):
+  keys = []
+  token = {}
+  while True:
+    page = s3.list_objects_v2(Bucket=bucket, Prefix=prefix, **token)
+    keys += [item["Key"] for item in page.get("Contents", [])]
+    if not page.get("IsTruncated"):
+      return keys
+    token = {"ContinuationToken": page["NextContinuationToken"]}
+
+
+def invoke_async(function_name, payload):
+  # Lambda Invoke with InvocationType=Event, signed the same way as the S3
+  # requests so no boto3 Lambda client is needed.
+  endpoint = os.getenv("LAMBDA_ENDPOINT_URL", "").strip().rstrip("/") or f"https://lambda.{aws_region()}.amazonaws.com"
+  url = f"{endpoint}/2015-03-31/functions/{urllib.parse.quote(function_name, safe='')}/invocations"
+  body = json.dumps(payload).encode("utf-8")
+  headers = {"Content-Type": "application/json", "X-Amz-Invocation-Type": "Event"}
+  signed = sigv4_headers("POST", url, headers, body, aws_region(), "lambda", aws_credentials())
+  response = HTTP_CLIENT.request("POST", url, signed, body, decode_content=False)
+  if response.status != 202:
+    raise RuntimeError(f"Async invoke of {function_name} failed ({response.status} {response.reason})")
+
+
+def s3_client():
+  # Created on first use and kept for warm invocations. boto3 is imported
+  # here rather than at module load because it dominates cold-start init.
+  global S3_CLIENT
+  with S3_CLIENT_LOCK:
+    if S3_CLIENT is None:
+      endpoint_url = os.getenv("S3_ENDPOINT_URL", "").strip()
+      if os.getenv("S3_CLIENT_BACKEND", "boto3").strip().lower() == "sigv4":
+        S3_CLIENT = SigV4S3Client(aws_region(), endpoint_url)
+      else:
+        import boto3
+        S3_CLIENT = boto3.client("s3", endpoint_url=endpoint_url or None)
+    return S3_CLIENT
+
+
+class RateLimitExceeded(Exception):
+  pass
+
+
+class RateLimitScheduler:
+  RETRY_STATUSES = {403, 429, 500, 502, 503, 504}
+
+  def __init__(self, max_attempts=4, base_delay=1.0, max_delay=20.0, safety_margin=10.0, max_wait=60.0):
+    self.max_attempts = max_attempts
+    self.base_delay = base_delay
+    self.max_delay = max_delay
+    self.safety_margin = safety_margin
+    self.max_wait = max_wait
+    self.budgets = {}
+    self.deadline = None
+    self.skipped = []
+    self._lock = threading.Lock()
+
+  def start(self, context=None):
+    with self._lock:
+      self.skipped = []
+      self.deadline = None
+      if context is not None and hasattr(context, "get_remaining_time_in_millis"):
+        self.deadline = time.monotonic() + context.get_remaining_time_in_millis() / 1000 - self.safety_margin
+
+  def resource_for(self, url):
+    # Classified like the metrics and cache TTLs, so a GitHub Enterprise
+    # /api/v3 prefix is stripped here too; everything else is core.
+    endpoint = request_endpoint(url)
+    return endpoint if endpoint in ("search", "graphql") else "core"
+
+  def observe(self, resource, headers):
+    remaining = headers.get("X-RateLimit-Remaining")
+    if remaining is None:
+      return
+    resource = headers.get("X-RateLimit-Resource") or resource
+    with self._lock:
+      self.budgets[resource] = {
+        "limit": int_from_string(headers.get("X-RateLimit-Limit"), 0),
+        "remaining": int_from_string(remaining, 0),
+        "reset": int_from_string(headers.get("X-RateLimit-Reset"), 0),
+      }
+
+  def load(self, token):
+    # /rate_limit is free, so a cold container can learn its budgets up front.
+    url = f"{GITHUB_API_URL}/rate_limit"
+    started = time.perf_counter()
+    try:
+      response = HTTP_CLIENT.request("GET", url, gh_headers(token))
+    except (OSError, http.client.HTTPException):
+      return
+    METRICS.request(url, response.status, time.perf_counter() - started, len(response.body))
+    if response.status != 200:
+      return
+    resources = json.loads(response.body.decode("utf-8")).get("resources", {})
+    with self._lock:
+      for resource, budget in resources.items():
+        self.budgets[resource] = {
+          "limit": budget.get("limit", 0),
+          "remaining": budget.get("remaining", 0),
+          "reset": budget.get("reset", 0),
+        }
+
+  def remaining(self, resource):
+    with self._lock:
+      budget = self.budgets.get(resource)
+      if not budget or budget["reset"] <= time.time():
+        return None
+      return budget["remaining"]
+
+  def known(self):
+    return self.remaining("core") is not None and self.remaining("search") is not None
+
+  def time_left(self):
+    if self.deadline is None:
+      return None
+    return self.deadline - time.monotonic()
+
+  def sleep(self, delay, resource):
+    time_left = self.time_left()
+    if time_left is not None and delay > time_left:
+      raise RateLimitExceeded(f"GitHub {resource} rate limit: waiting {delay:.0f}s would exceed the Lambda deadline")
+    # Without a Lambda deadline nothing else bounds the wait, and a reset can
+    # be close to an hour away.
+    if time_left is None and delay > self.max_wait:
+      raise RateLimitExceeded(f"GitHub {resource} rate limit: waiting {delay:.0f}s exceeds the {self.max_wait:.0f}s limit")
+    time.sleep(delay)
+
+  def wait_for_budget(self, resource):
+    with self._lock:
+      budget = self.budgets.get(resource)
+      delay = budget["reset"] - time.time() + 1 if budget and budget["remaining"] <= 0 else 0
+    if delay > 0:
+      self.sleep(delay, resource)
+
+  def retry_delay(self, response, attempt):
+    if response.status not in self.RETRY_STATUSES or attempt + 1 >= self.max_attempts:
+      return None
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+      return float(int_from_string(retry_after, 1))
+    if response.status == 403:
+      if response.headers.get("X-RateLimit-Remaining") == "0":
+        return max(1.0, int_from_string(response.headers.get("X-RateLimit-Reset"), 0) - time.time() + 1)
+      if b"rate limit" not in response.body.lower():
+        return None
+    return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+  def skip(self, section):
+    if outdated_thread():
+      return
+    with self._lock:
+      self.skipped.append(section)
+
+  def report(self):
+    with self._lock:
+      return {
+        resource: {
+          "limit": budget["limit"],
+          "remaining": budget["remaining"],
+          "reset": datetime.utcfromtimestamp(budget["reset"]).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        }
+        for resource, budget in sorted(self.budgets.items())
+        if resource in {"core", "search", "graphql"}
+      }
+
+
+SCHEDULER = RateLimitScheduler(max_wait=max(0, int_from_string(os.getenv("RATE_LIMIT_MAX_WAIT_SECONDS"), 60)))
+
+
+LATENCY_BUCKETS_MS = [25, 50, 100, 250, 500, 1000, 2500, 5000]
+EMF_MAX_VALUES = 100
+DISABLED_STAGE = contextlib.nullcontext()
+
+
+def request_endpoint(url):
+  # Relative to GITHUB_API_URL, so a GitHub Enterprise /api/v3 prefix does
+  # not change the class.
+  path = urllib.parse.urlsplit(url).path
+  base = urllib.parse.urlsplit(GITHUB_API_URL).path
+  if base and path.startswith(base):
+    path = path[len(base):]
+  if path.startswith("/search/"):
+    return "search"
+  if path == "/graphql":
+    return "graphql"
+  if path == "/rate_limit":
+    return "rate_limit"
+  if path.endswith("/repos"):
+    return "repositories"
+  if path.startswith("/repos/"):
+    return "repository"
+  return "profile"
+
+
+class RefreshMetrics:
+  def __init__(self):
+    self.mode = "off"
+    self.enabled = False
+    self.namespace = "GithubDashboard"
+    self.path = "dashboard-metrics.jsonl"
+    self._lock = threading.Lock()
+    self.reset()
+
+  def configure(self, mode, namespace=None, path=None):
+    mode = (mode or "off").strip().lower()
+    if mode == "auto":
+      mode = "emf" if os.getenv("AWS_LAMBDA_FUNCTION_NAME") else "json"
+    self.mode = mode if mode in {"emf", "json"} else "off"
+    self.enabled = self.mode != "off"
+    self.namespace = (namespace or "").strip() or self.namespace
+    self.path = (path or "").strip() or self.path
+    self.reset()
+
+  def reset(self):
+    with self._lock:
+      self._stages = {}
+      self._requests = {}
+
+  @contextlib.contextmanager
+  def _timer(self, name, attrs):
+    started = time.perf_counter()
+    try:
+      yield
+    finally:
+      duration_ms = (time.perf_counter() - started) * 1000
+      with self._lock:
+        self._stages.setdefault(name, []).append({"duration_ms": round(duration_ms, 3), **attrs})
+
+  def stage(self, name, **attrs):
+    if not self.enabled:
+      return DISABLED_STAGE
+    return self._timer(name, attrs)
+
+  def timed(self, name, func, **attrs):
+    if not self.enabled:
+      return func
+
+    def timed_call(*args, **kwargs):
+      with self._timer(name, attrs):
+        return func(*args, **kwargs)
+    return timed_call
+
+  def request(self, url, status, seconds, size):
+    if not self.enabled:
+      return
+    endpoint = request_endpoint(url)
+    with self._lock:
+      entry = self._requests.setdefault(endpoint, {"latency_ms": [], "bytes": 0, "status_codes": {}})
+      entry["latency_ms"].append(round(seconds * 1000, 3))
+      entry["bytes"] += size
+      entry["status_codes"][str(status)] = entry["status_codes"].get(str(status), 0) + 1
+
+  def snapshot(self):
+    with self._lock:
+      stages = {
+        name: {
+          "count": len(samples),
+          "total_ms": round(sum(sample["duration_ms"] for sample in samples), 3),
+          "max_ms": max(sample["duration_ms"] for sample in samples),
+          "samples": list(samples),
+        }
+        for name, samples in self._stages.items()
+      }
+      requests = {}
+      for endpoint, entry in self._requests.items():
+        histogram = {f"le_{bound}": 0 for bound in LATENCY_BUCKETS_MS}
+        histogram[f"gt_{LATENCY_BUCKETS_MS[-1]}"] = 0
+        for latency in entry["latency_ms"]:
+          bucket = next((f"le_{bound}" for bound in LATENCY_BUCKETS_MS if latency <= bound), f"gt_{LATENCY_BUCKETS_MS[-1]}")
+          histogram[bucket] += 1
+        requests[endpoint] = {
+          "count": len(entry["latency_ms"]),
+          "bytes": entry["bytes"],
+          "status_codes": dict(entry["status_codes"]),
+          "latency_histogram_ms": histogram,
+          "latency_ms": list(entry["latency_ms"]),
+        }
+      return {"stages": stages, "requests": requests}
+
+  def emf_documents(self, snapshot):
+    timestamp = int(time.time() * 1000)
+
+    def document(dimension, value, metrics, fields):
+      return {
+        "_aws": {
+          "Timestamp": timestamp,
+          "CloudWatchMetrics": [{
+            "Namespace": self.namespace,
+            "Dimensions": [[dimension]],
+            "Metrics": [{"Name": name, "Unit": unit} for name, unit in metrics],
+          }],
+        },
+        dimension: value,
+        **fields,
+      }
+
+    # EMF accepts at most 100 values per metric, so long sample lists are
+    # spread over several documents with the same dimensions.
+    for name, stage in snapshot["stages"].items():
+      durations = [sample["duration_ms"] for sample in stage["samples"]]
+      for offset in range(0, len(durations), EMF_MAX_VALUES):
+        yield document("Stage", name, [("Duration", "Milliseconds")], {
+          "Duration": durations[offset:offset + EMF_MAX_VALUES],
+          "samples": stage["samples"][offset:offset + EMF_MAX_VALUES],
+        })
+    for endpoint, entry in snapshot["requests"].items():
+      latencies = entry["latency_ms"]
+      errors = sum(count for status, count in entry["status_codes"].items() if int(status) >= 400)
+      for offset in range(0, len(latencies), EMF_MAX_VALUES):
+        fields = {"Latency": latencies[offset:offset + EMF_MAX_VALUES]}
+        metrics = [("Latency", "Milliseconds")]
+        if offset == 0:
+          fields.update({
+            "Requests": entry["count"],
+            "Bytes": entry["bytes"],
+            "Errors": errors,
+            "NotModified": entry["status_codes"].get("304", 0),
+            "status_codes": entry["status_codes"],
+            "latency_histogram_ms": entry["latency_histogram_ms"],
+          })
+          metrics += [("Requests", "Count"), ("Bytes", "Bytes"), ("Errors", "Count"), ("NotModified", "Count")]
+        yield document("Endpoint", endpoint, metrics, fields)
+
+  def flush(self):
+    if not self.enabled:
+      return
+    snapshot = self.snapshot()
+    self.reset()
+    if self.mode == "emf":
+      # Lambda forwards stdout to CloudWatch Logs, which extracts EMF lines.
+      for document in self.emf_documents(snapshot):
+        print(json.dumps(document, separators=(",", ":")))
+      return
+    with open(self.path, "a", encoding="utf-8") as handle:
+      handle.write(json.dumps({"timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"), **snapshot}) + "\n")
+
+
+METRICS = RefreshMetrics()
+
+
+def gh_headers(token):
   headers = {
     "Accept": "application/vnd.github+json",
     "X-GitHub-Api-Version": "2022-11-28",
@@ -45,262 +927,1197 @@ def gh_get(url, token):
   }
   if token:
     headers["Authorization"] = f"Bearer {token}"
+  return headers
 
-  req = urllib.request.Request(url, headers=headers)
-  with urllib.request.urlopen(req, timeout=30) as resp:
-    return json.loads(resp.read().decode("utf-8"))
 
+def gh_request(method, url, headers, body=None):
+  resource = SCHEDULER.resource_for(url)
+  attempt = 0
+  while True:
+    SCHEDULER.wait_for_budget(resource)
+    started = time.perf_counter()
+    response = HTTP_CLIENT.request(method, url, headers, body)
+    METRICS.request(url, response.status, time.perf_counter() - started, len(response.body))
+    SCHEDULER.observe(resource, response.headers)
+    delay = SCHEDULER.retry_delay(response, attempt)
+    if delay is None:
+      return response
+    SCHEDULER.sleep(delay, resource)
+    attempt += 1
+
+
+def gh_get(url, token, object_hook=None):
+  headers = gh_headers(token)
+  cache_key = RESPONSE_CACHE.key(url, token)
+  cached = RESPONSE_CACHE.lookup(cache_key)
+  if cached and RESPONSE_CACHE.fresh(cached, url):
+    RESPONSE_CACHE.hit()
+    return json.loads(cached["body"], object_hook=object_hook)
+  if cached:
+    if cached.get("etag"):
+      headers["If-None-Match"] = cached["etag"]
+    if cached.get("last_modified"):
+      headers["If-Modified-Since"] = cached["last_modified"]
+
+  response = gh_request("GET", url, headers)
+  if response.status == 304 and cached:
+    RESPONSE_CACHE.revalidated(cache_key, url)
+    return json.loads(cached["body"], object_hook=object_hook)
+  if response.status >= 400:
+    raise urllib.error.HTTPError(url, response.status, response.reason, response.headers, io.BytesIO(response.body))
+  body = response.body.decode("utf-8")
+  RESPONSE_CACHE.remember(cache_key, url, response.headers, body)
+  return json.loads(body, object_hook=object_hook)
 
-def collect_repositories(token, username, include_private, orgs, max_repositories):
-  repos = []
-  seen = set()
 
+def repository_sources(username, include_private, orgs):
   if include_private:
-    page = 1
-    while len(repos) < max_repositories and page <= 5:
-      url = f"https://api.github.com/user/repos?sort=updated&per_page=100&page={page}"
-      chunk = gh_get(url, token)
-      if not chunk:
-        break
-      for repo in chunk:
-        full_name = repo.get("full_name", "")
-        if full_name in seen:
-          continue
-        seen.add(full_name)
-        repos.append({
-          "name": full_name,
-          "url": repo.get("html_url", ""),
-          "updated_at": repo.get("updated_at", ""),
-          "stars": repo.get("stargazers_count", 0),
-          "open_issues": repo.get("open_issues_count", 0),
-          "language": repo.get("language", ""),
-          "visibility": "private" if repo.get("private") else "public",
-        })
-        if len(repos) >= max_repositories:
-          break
-      page += 1
+    sources = [(f"{GITHUB_API_URL}/user/repos?sort=updated&per_page={REPOSITORY_PAGE_SIZE}", MAX_REPOSITORY_PAGES)]
   else:
-    page = 1
-    while len(repos) < max_repositories and page <= 5:
-      url = f"https://api.github.com/users/{urllib.parse.quote(username)}/repos?sort=updated&per_page=100&page={page}"
-      chunk = gh_get(url, token)
-      if not chunk:
-        break
-      for repo in chunk:
-        full_name = repo.get("full_name", "")
-        if full_name in seen:
-          continue
-        seen.add(full_name)
-        repos.append({
-          "name": full_name,
-          "url": repo.get("html_url", ""),
-          "updated_at": repo.get("updated_at", ""),
-          "stars": repo.get("stargazers_count", 0),
-          "open_issues": repo.get("open_issues_count", 0),
-          "language": repo.get("language", ""),
-          "visibility": "private" if repo.get("private") else "public",
-        })
-        if len(repos) >= max_repositories:
-          break
-      page += 1
-
+    sources = [(f"{GITHUB_API_URL}/users/{urllib.parse.quote(username)}/repos?sort=updated&per_page={REPOSITORY_PAGE_SIZE}", MAX_REPOSITORY_PAGES)]
   for org in orgs:
+    sources.append((f"{GITHUB_API_URL}/orgs/{urllib.parse.quote(org)}/repos?sort=updated&per_page={REPOSITORY_PAGE_SIZE}", MAX_REPOSITORY_PAGES))
+  return sources
+
+
+def repository_record(repo):
+  return RepositoryRecord(
+    name=repo.get("full_name", ""),
+    url=repo.get("html_url", ""),
+    updated_at=repo.get("updated_at", ""),
+    stars=repo.get("stargazers_count", 0),
+    open_issues=repo.get("open_issues_count", 0),
+    language=repo.get("language", ""),
+    visibility="private" if repo.get("private") else "public",
+    pushed_at=repo.get("pushed_at") or "",
+  )
+
+
+def repository_object_hook(obj):
+  # json calls this bottom-up while a page is parsed, so each repository
+  # becomes a record as soon as it is read and its nested owner, license and
+  # permissions objects are dropped instead of living until the page is done.
+  if "full_name" in obj and "stargazers_count" in obj:
+    return repository_record(obj)
+  return None
+
+
+def source_records(index, max_pages, fetch_page):
+  for page in range(1, max_pages + 1):
+    chunk = fetch_page(index, page)
+    yield from chunk
+    if len(chunk) < REPOSITORY_PAGE_SIZE:
+      return
+
+
+def merge_repository_sources(page_limits, fetch_page, max_repositories):
+  # Every source is already sorted by updated_at, so a lazy k-way merge only
+  # asks a source for its next page once all of its current page made the
+  # top-N; sources whose next page cannot rank are never fetched.
+  streams = [source_records(index, max_pages, fetch_page) for index, max_pages in enumerate(page_limits)]
+  repos = []
+  seen = set()
+  for repo in heapq.merge(*streams, key=lambda r: r.updated_at or "", reverse=True):
+    if repo.name in seen:
+      continue
+    seen.add(repo.name)
+    repos.append(repo)
     if len(repos) >= max_repositories:
       break
-    page = 1
-    while len(repos) < max_repositories and page <= 3:
-      url = f"https://api.github.com/orgs/{urllib.parse.quote(org)}/repos?sort=updated&per_page=100&page={page}"
-      chunk = gh_get(url, token)
-      if not chunk:
-        break
-      for repo in chunk:
-        full_name = repo.get("full_name", "")
-        if full_name in seen:
-          continue
-        seen.add(full_name)
-        repos.append({
-          "name": full_name,
-          "url": repo.get("html_url", ""),
-          "updated_at": repo.get("updated_at", ""),
-          "stars": repo.get("stargazers_count", 0),
-          "open_issues": repo.get("open_issues_count", 0),
-          "language": repo.get("language", ""),
-          "visibility": "private" if repo.get("private") else "public",
-        })
-        if len(repos) >= max_repositories:
-          break
-      page += 1
+  return repos
+
+
+class SharedRequests:
+  def __init__(self):
+    self.futures = {}
+    self._lock = threading.Lock()
+
+  def submit(self, executor, url, token, object_hook=None):
+    with self._lock:
+      future = self.futures.get(url)
+      if future is None:
+        future = self.futures[url] = executor.submit(gh_get, url, token, object_hook)
+      return future
+
+
+def collect_repositories(token, username, include_private, orgs, max_repositories, executor=None, shared_pages=None):
+  sources = repository_sources(username, include_private, orgs)
+
+  # First pages are requested for every source up front; later pages are
+  # pulled lazily by the merge, so they stay on demand.
+  # Batch refreshes pass shared_pages so org listings are fetched once.
+  first_pages = []
+  if shared_pages is not None:
+    first_pages = [
+      shared_pages.submit(executor, f"{base_url}&page=1", token, repository_object_hook) for base_url, _ in sources
+    ]
+  elif executor is not None:
+    first_pages = [
+      executor.submit(gh_get, f"{base_url}&page=1", token, repository_object_hook) for base_url, _ in sources
+    ]
+
+  def fetch_page(index, page):
+    url = f"{sources[index][0]}&page={page}"
+    try:
+      with METRICS.stage("repository_page", source=index, page=page):
+        if page == 1 and first_pages:
+          chunk = first_pages[index].result()
+        elif shared_pages is not None:
+          chunk = shared_pages.submit(executor, url, token, repository_object_hook).result()
+        else:
+          chunk = gh_get(url, token, repository_object_hook)
+    except RateLimitExceeded:
+      # Org listings are lower priority than the user's own repositories.
+      if index == 0:
+        raise
+      SCHEDULER.skip(urllib.parse.urlsplit(sources[index][0]).path)
+      return []
+    return chunk
+
+  try:
+    return merge_repository_sources([max_pages for _, max_pages in sources], fetch_page, max_repositories)
+  finally:
+    if shared_pages is None:
+      for future in first_pages:
+        future.cancel()
+
+
+def issue_record(item):
+  return IssueRecord(
+    title=item.get("title", ""),
+    url=item.get("html_url", ""),
+    repo="/".join(item.get("repository_url", "").split("/")[-2:]),
+    updated_at=item.get("updated_at", ""),
+  )
+
 
-  repos.sort(key=lambda r: r.get("updated_at", ""), reverse=True)
-  return repos[:max_repositories]
+def search_object_hook(obj):
+  if "repository_url" in obj and "title" in obj:
+    return issue_record(obj)
+  if "items" in obj:
+    return obj
+  return None
 
 
 def search_issues(token, query, limit):
   q = urllib.parse.quote(query)
-  url = f"https://api.github.com/search/issues?q={q}&sort=updated&order=desc&per_page={limit}"
-  data = gh_get(url, token)
-  items = data.get("items", [])
-  output = []
-  for item in items:
-    repo = item.get("repository_url", "").split("/")[-2:]
-    output.append({
-      "title": item.get("title", ""),
-      "url": item.get("html_url", ""),
-      "repo": "/".join(repo),
-      "updated_at": item.get("updated_at", ""),
-    })
-  return output[:limit]
-
-
-def aggregate_languages(repos):
+  url = f"{GITHUB_API_URL}/search/issues?q={q}&sort=updated&order=desc&per_page={limit}"
+  data = gh_get(url, token, search_object_hook)
+  return data.get("items", [])[:limit]
+
+
+SEARCH_KINDS = ("is:pr", "is:issue")
+MAX_MERGED_SEARCH_PAGES = 2
+# Merged queries GitHub rejected with a 422; their groups go straight to one
+# query per section from then on.
+MERGED_SEARCH_REJECTED = set()
+
+
+def plan_searches(queries):
+  # Queries that differ only by is:pr / is:issue are merged into one search
+  # and split on each item's pull_request field. Returns groups of
+  # (section, query, kind), ordered by their highest-priority section.
+  groups = []
+  mergeable = {}
+  for section, query in queries:
+    terms = query.split()
+    kinds = [term for term in terms if term in SEARCH_KINDS]
+    base = " ".join(term for term in terms if term not in SEARCH_KINDS)
+    kind = kinds[0] if len(kinds) == 1 else None
+    group = mergeable.get(base) if kind else None
+    if group is not None and kind not in [member[2] for member in group]:
+      group.append((section, query, kind))
+      continue
+    group = [(section, query, kind)]
+    groups.append(group)
+    if kind:
+      mergeable.setdefault(base, group)
+  return groups
+
+
+def search_kind_hook(obj):
+  if "repository_url" in obj and "title" in obj:
+    return (issue_record(obj), "is:pr" if "pull_request" in obj else "is:issue")
+  if "items" in obj:
+    return obj
+  return None
+
+
+def search_group(token, group, limit):
+  if len(group) == 1:
+    section, query, _ = group[0]
+    return {section: search_issues(token, query, limit)}
+
+  # Pages sized for every section in the group.
+  base = " ".join(term for term in group[0][1].split() if term not in SEARCH_KINDS)
+  if base in MERGED_SEARCH_REJECTED:
+    return {section: search_issues(token, query, limit) for section, query, _ in group}
+  per_page = min(100, limit * len(group))
+  url = f"{GITHUB_API_URL}/search/issues?q={urllib.parse.quote(base)}&sort=updated&order=desc&per_page={per_page}"
+  try:
+    data = gh_get(url, token, search_kind_hook)
+  except urllib.error.HTTPError as err:
+    # GitHub may reject a search without is:issue or is:pull-request.
+    if err.code != 422:
+      raise
+    MERGED_SEARCH_REJECTED.add(base)
+    return {section: search_issues(token, query, limit) for section, query, _ in group}
+  sections = {kind: section for section, _, kind in group}
+  results = {section: [] for section, _, _ in group}
+  page = 1
+  while True:
+    items = data.get("items", [])
+    for record, kind in items:
+      section = results[sections[kind]]
+      if len(section) < limit:
+        section.append(record)
+    # The pages are in updated order across every kind, so a section can be
+    # short while GitHub has more matches; the next page of the same search
+    # fills it.
+    if (
+      all(len(section) >= limit for section in results.values())
+      or len(items) < per_page or page * per_page >= data.get("total_count", 0)
+      or page == MAX_MERGED_SEARCH_PAGES
+    ):
+      break
+    page += 1
+    try:
+      data = gh_get(f"{url}&page={page}", token, search_kind_hook)
+    except RateLimitExceeded:
+      for section, items in results.items():
+        if len(items) < limit:
+          SCHEDULER.skip(f"{section}: partial")
+      return results
+
+  # When the other kinds fill the first pages, a section still short after
+  # the last one runs its own query.
+  if page == MAX_MERGED_SEARCH_PAGES and data.get("total_count", 0) > page * per_page:
+    for section, query, _ in group:
+      if len(results[section]) < limit:
+        try:
+          results[section] = search_issues(token, query, limit)
+        except RateLimitExceeded:
+          SCHEDULER.skip(f"{section}: partial")
+  return results
+
+
+def search_delta_hook(obj):
+  if "repository_url" in obj and "title" in obj:
+    return (issue_record(obj), obj.get("state", "open"))
+  if "items" in obj:
+    return obj
+  return None
+
+
+def search_changes(token, query, since, limit):
+  # Drops is:open so items closed since the last run come back too and can
+  # be removed. >= rather than > so an item updated in the same second as the
+  # high-water mark is not missed; it is simply merged again.
+  terms = [term for term in query.split() if term != "is:open"]
+  q = urllib.parse.quote(" ".join(terms + [f"updated:>={since}"]))
+  url = f"{GITHUB_API_URL}/search/issues?q={q}&sort=updated&order=desc&per_page={limit}"
+  return gh_get(url, token, search_delta_hook).get("items", [])
+
+
+def sync_search(token, username, section, query, limit, verify_seconds):
+  key = f"{username} {section}"
+  entry = SEARCH_SNAPSHOT.get(key)
+  now = time.time()
+  if (
+    entry and entry["query"] == query and entry["limit"] == limit and entry["high_water"]
+    and now - entry["verified_at"] < verify_seconds
+  ):
+    previous = [IssueRecord(*item) for item in entry["items"]]
+    changes = search_changes(token, query, entry["high_water"], limit)
+    closed = {record.url for record, state in changes if state != "open"}
+    opened = {record.url: record for record, state in changes if state == "open"}
+    # A full page of changes may hide more, and a removal from a full
+    # snapshot leaves a gap only a full query can fill.
+    if len(changes) < limit and not (closed & {item.url for item in previous} and len(previous) >= limit):
+      merged = [item for item in previous if item.url not in closed and item.url not in opened]
+      items = sorted(merged + list(opened.values()), key=lambda item: item.updated_at, reverse=True)[:limit]
+      SEARCH_SNAPSHOT.put(key, {
+        **entry,
+        "high_water": max([entry["high_water"]] + [record.updated_at for record, _ in changes]),
+        "items": [list(item) for item in items],
+      }, "delta")
+      return items
+
+  # Verification pass: the full query replaces the snapshot, which also drops
+  # items that left the result set without a new update (a review request
+  # that was withdrawn, an unassigned issue).
+  items = search_issues(token, query, limit)
+  SEARCH_SNAPSHOT.put(key, {
+    "query": query,
+    "limit": limit,
+    "verified_at": now,
+    "high_water": max([item.updated_at for item in items], default=""),
+    "items": [list(item) for item in items],
+  }, "full")
+  return items
+
+
+GRAPHQL_REPOSITORY_FIELDS = """
+  pageInfo { hasNextPage endCursor }
+  nodes {
+    nameWithOwner
+    url
+    updatedAt
+    pushedAt
+    stargazerCount
+    isPrivate
+    primaryLanguage { name }
+    issues(states: OPEN) { totalCount }
+    pullRequests(states: OPEN) { totalCount }
+  }
+"""
+
+GRAPHQL_SEARCH_FIELDS = """
+  nodes {
+    ... on Issue { title url updatedAt repository { nameWithOwner } }
+    ... on PullRequest { title url updatedAt repository { nameWithOwner } }
+  }
+"""
+
+GRAPHQL_PROFILE_FIELDS = """
+  login name bio avatarUrl url company location
+  followers { totalCount }
+  following { totalCount }
+  repositories(privacy: PUBLIC, ownerAffiliations: [OWNER]) { totalCount }
+"""
+
+
+def gh_graphql(query, variables, token, partial=False):
+  headers = gh_headers(token)
+  headers["Content-Type"] = "application/json"
+  url = f"{GITHUB_API_URL}/graphql"
+  body = json.dumps({"query": query, "variables": variables}).encode("utf-8")
+  response = gh_request("POST", url, headers, body)
+  if response.status >= 400:
+    raise urllib.error.HTTPError(url, response.status, response.reason, response.headers, io.BytesIO(response.body))
+  payload = json.loads(response.body.decode("utf-8"))
+  # partial accepts the fields that did resolve alongside errors for the
+  # rest, such as one repository in a batch that no longer exists.
+  if payload.get("errors") and not (partial and payload.get("data")):
+    messages = "; ".join(error.get("message", "") for error in payload["errors"])
+    raise ValueError(f"GitHub GraphQL error: {messages}")
+  return payload.get("data") or {}
+
+
+def graphql_repository_sources(include_private, orgs):
+  # (root field, variable it needs, connection arguments, page cap) mirroring
+  # repository_sources so both backends merge the same way.
+  if include_private:
+    sources = [(
+      "viewer",
+      None,
+      "affiliations: [OWNER, COLLABORATOR, ORGANIZATION_MEMBER], "
+      "ownerAffiliations: [OWNER, COLLABORATOR, ORGANIZATION_MEMBER]",
+      MAX_REPOSITORY_PAGES,
+    )]
+  else:
+    sources = [("user(login: $login)", "login", "ownerAffiliations: [OWNER], privacy: PUBLIC", MAX_REPOSITORY_PAGES)]
+  for index in range(len(orgs)):
+    sources.append((f"organization(login: $org{index})", f"org{index}", "", MAX_REPOSITORY_PAGES))
+  return sources
+
+
+def graphql_repository_selection(index, source, after=False):
+  root, _, arguments, _ = source
+  arguments = ", ".join(x for x in (
+    f"first: {REPOSITORY_PAGE_SIZE}",
+    "after: $after" if after else "",
+    "orderBy: {field: UPDATED_AT, direction: DESC}",
+    arguments,
+  ) if x)
+  return f"r{index}: {root} {{ repositories({arguments}) {{ {GRAPHQL_REPOSITORY_FIELDS} }} }}"
+
+
+def graphql_repository_record(node):
+  return RepositoryRecord(
+    name=node.get("nameWithOwner", ""),
+    url=node.get("url", ""),
+    updated_at=node.get("updatedAt", ""),
+    stars=node.get("stargazerCount", 0),
+    open_issues=node["issues"]["totalCount"] + node["pullRequests"]["totalCount"],
+    language=(node.get("primaryLanguage") or {}).get("name"),
+    visibility="private" if node.get("isPrivate") else "public",
+    pushed_at=node.get("pushedAt") or "",
+  )
+
+
+def graphql_search_record(node):
+  return IssueRecord(
+    title=node.get("title", ""),
+    url=node.get("url", ""),
+    repo=(node.get("repository") or {}).get("nameWithOwner", ""),
+    updated_at=node.get("updatedAt", ""),
+  )
+
+
+def graphql_profile(node):
+  return {
+    "name": node.get("name"),
+    "bio": node.get("bio"),
+    "avatar_url": node.get("avatarUrl", ""),
+    "html_url": node.get("url", ""),
+    "followers": node["followers"]["totalCount"],
+    "following": node["following"]["totalCount"],
+    "public_repos": node["repositories"]["totalCount"],
+    "company": node.get("company"),
+    "location": node.get("location"),
+  }
+
+
+def collect_dashboard_graphql(token, username, include_private, orgs, max_repositories, max_items):
+  sources = graphql_repository_sources(include_private, orgs)
+  variables = {"login": username}
+  variables.update({f"org{index}": org for index, org in enumerate(orgs)})
+  variables.update({
+    f"q{index}": f"{query.format(username=username)} sort:updated-desc"
+    for index, (_, query) in enumerate(SEARCH_SECTIONS)
+  })
+
+  declarations = ", ".join(f"${name}: String!" for name in variables)
+  selections = [f"profile: user(login: $login) {{ {GRAPHQL_PROFILE_FIELDS} }}"]
+  selections += [graphql_repository_selection(index, source) for index, source in enumerate(sources)]
+  selections += [
+    f"s{index}: search(query: $q{index}, type: ISSUE, first: {max_items}) {{ {GRAPHQL_SEARCH_FIELDS} }}"
+    for index in range(len(SEARCH_SECTIONS))
+  ]
+  data = gh_graphql(f"query({declarations}) {{ {' '.join(selections)} }}", variables, token)
+  if not data.get("profile"):
+    raise ValueError(f"GitHub user not found: {username}")
+
+  connections = {}
+
+  def fetch_page(index, page):
+    if page == 1:
+      connection = data[f"r{index}"]["repositories"]
+    else:
+      page_info = connections[index]["pageInfo"]
+      if not page_info["hasNextPage"]:
+        return []
+      variable = sources[index][1]
+      page_variables = {"after": page_info["endCursor"]}
+      declarations = "$after: String"
+      if variable:
+        page_variables[variable] = variables[variable]
+        declarations += f", ${variable}: String!"
+      selection = graphql_repository_selection(index, sources[index], after=True)
+      connection = gh_graphql(f"query({declarations}) {{ {selection} }}", page_variables, token)[f"r{index}"]["repositories"]
+    connections[index] = connection
+    return [graphql_repository_record(node) for node in connection["nodes"]]
+
+  repos = merge_repository_sources([source[3] for source in sources], fetch_page, max_repositories)
+  searches = {
+    section: [graphql_search_record(node) for node in data[f"s{index}"]["nodes"] if node][:max_items]
+    for index, (section, _) in enumerate(SEARCH_SECTIONS)
+  }
+  return graphql_profile(data["profile"]), repos, searches
+
+
+ENRICHMENT_BATCH_SIZE = 25
+REST_ENRICHMENT_REQUESTS = 4
+GRAPHQL_ENRICHMENT_FIELDS = """
+  languages(first: 10, orderBy: {field: SIZE, direction: DESC}) { edges { size node { name } } }
+  pullRequests(states: OPEN) { totalCount }
+  defaultBranchRef {
+    target {
+      ... on Commit { committedDate messageHeadline statusCheckRollup { state } }
+    }
+  }
+"""
+ROLLUP_STATES = {"SUCCESS": "success", "FAILURE": "failure", "ERROR": "failure", "PENDING": "pending", "EXPECTED": "pending"}
+FAILED_CHECK_CONCLUSIONS = {"failure", "timed_out", "cancelled", "action_required", "startup_failure"}
+
+
+def enrichment_version(repo):
+  # pushed_at moves with commits (languages, last commit, checks) and
+  # open_issues with pull requests opened or closed; updated_at covers the
+  # rest. An entry read at the same version is still current.
+  return [repo.pushed_at, repo.updated_at, repo.open_issues]
+
+
+def pull_request_object_hook(obj):
+  if "head" in obj and "base" in obj:
+    return True
+  return None
+
+
+def check_run_object_hook(obj):
+  if "check_runs" in obj:
+    return obj
+  if "status" in obj and "conclusion" in obj:
+    return (obj["status"], obj["conclusion"])
+  return None
+
+
+def check_runs_state(runs):
+  if not runs:
+    return None
+  if any(conclusion in FAILED_CHECK_CONCLUSIONS for _, conclusion in runs):
+    return "failure"
+  if any(status != "completed" for status, _ in runs):
+    return "pending"
+  return "success"
+
+
+def rest_enrichment_requests(token, name, executor):
+  base = f"{GITHUB_API_URL}/repos/{urllib.parse.quote(name)}"
+  return {
+    "languages": executor.submit(gh_get, f"{base}/languages", token),
+    "commits": executor.submit(gh_get, f"{base}/commits?per_page=1", token),
+    "pulls": executor.submit(gh_get, f"{base}/pulls?state=open&per_page=100", token, pull_request_object_hook),
+    "checks": executor.submit(gh_get, f"{base}/commits/HEAD/check-runs?per_page=100", token, check_run_object_hook),
+  }
+
+
+def rest_enrichment(name, futures):
+  def result(part, default):
+    try:
+      return futures[part].result()
+    except urllib.error.HTTPError as err:
+      # An empty repository has no commits (409) and so no checks either;
+      # a repository deleted or made private since it was listed is a 404.
+      if err.code in (404, 409):
+        return default
+      raise
+
+  commits = result("commits", [])
+  commit = commits[0]["commit"] if commits else {}
+  return {name: {
+    "languages": result("languages", {}),
+    "ci_status": check_runs_state(result("checks", {}).get("check_runs", [])),
+    # Counted from one page; the GraphQL backend reads the exact total.
+    "open_prs": len(result("pulls", [])),
+    "last_commit_at": (commit.get("committer") or {}).get("date", ""),
+    "last_commit_message": (commit.get("message") or "").split("\n", 1)[0],
+  }}
+
+
+def graphql_enrichment(token, names):
+  variables = {}
+  selections = []
+  for index, name in enumerate(names):
+    owner, _, repository = name.partition("/")
+    variables.update({f"o{index}": owner, f"n{index}": repository})
+    selections.append(f"e{index}: repository(owner: $o{index}, name: $n{index}) {{ {GRAPHQL_ENRICHMENT_FIELDS} }}")
+  declarations = ", ".join(f"${name}: String!" for name in variables)
+  data = gh_graphql(f"query({declarations}) {{ {' '.join(selections)} }}", variables, token, partial=True)
+
+  results = {}
+  for index, name in enumerate(names):
+    node = data.get(f"e{index}")
+    if not node:
+      continue
+    commit = (node.get("defaultBranchRef") or {}).get("target") or {}
+    results[name] = {
+      "languages": {edge["node"]["name"]: edge["size"] for edge in node["languages"]["edges"]},
+      "ci_status": ROLLUP_STATES.get((commit.get("statusCheckRollup") or {}).get("state")),
+      "open_prs": node["pullRequests"]["totalCount"],
+      "last_commit_at": commit.get("committedDate", ""),
+      "last_commit_message": commit.get("messageHeadline", ""),
+    }
+  return results
+
+
+def enrich_repositories(settings, repos, executor):
+  # Languages by bytes, CI status, open pull requests and the last commit
+  # cost extra requests per repository, so each result is kept with the
+  # version it was read at and only repositories that changed are fetched.
+  # Returns the enriched records and each repository's language bytes.
+  token = settings["token"]
+  entries = {}
+  changed = []
+  for repo in repos:
+    entry = ENRICHMENT_CACHE.get(repo.name)
+    if entry:
+      entries[repo.name] = entry
+    # Pending checks finish without a push, so those are read again.
+    if entry and entry["version"] == enrichment_version(repo) and entry["ci_status"] != "pending":
+      ENRICHMENT_CACHE.count("cached")
+    else:
+      changed.append(repo)
+
+  # Every request is submitted before any result is awaited, and this runs
+  # outside the request pool, so it never waits on a pool it is blocking.
+  pending = []
+  if settings["fetch_backend"] == "graphql" and token:
+    for start in range(0, len(changed), ENRICHMENT_BATCH_SIZE):
+      batch = [repo.name for repo in changed[start:start + ENRICHMENT_BATCH_SIZE]]
+      pending.append((batch, executor.submit(graphql_enrichment, token, batch).result))
+  else:
+    # Repositories are in priority order (most recently updated first); the
+    # ones the core budget cannot cover keep their previous data.
+    budget = SCHEDULER.remaining("core")
+    if budget is not None and budget < len(changed) * REST_ENRICHMENT_REQUESTS:
+      fits = budget // REST_ENRICHMENT_REQUESTS
+      SCHEDULER.skip(f"enrichment: {len(changed) - fits} repositories")
+      changed = changed[:fits]
+    for repo in changed:
+      futures = rest_enrichment_requests(token, repo.name, executor)
+      pending.append(([repo.name], lambda name=repo.name, futures=futures: rest_enrichment(name, futures)))
+
+  fetched = {}
+  for names, result in pending:
+    try:
+      fetched.update(result())
+    # The pooled client raises transport errors (timeouts, resets) as they
+    # are; URLError and HTTPError are OSErrors too.
+    except (RateLimitExceeded, OSError, http.client.HTTPException, ValueError) as err:
+      SCHEDULER.skip(f"enrichment {', '.join(names)}: {err}")
+
+  versions = {repo.name: enrichment_version(repo) for repo in changed}
+  for name, result in fetched.items():
+    entries[name] = {"version": versions[name], **result}
+    ENRICHMENT_CACHE.put(name, entries[name], "fetched")
+
+  enriched = []
+  for repo in repos:
+    entry = entries.get(repo.name)
+    if entry:
+      repo = repo._replace(
+        ci_status=entry["ci_status"],
+        open_prs=entry["open_prs"],
+        last_commit_at=entry["last_commit_at"],
+        last_commit_message=entry["last_commit_message"],
+      )
+    enriched.append(repo)
+  return enriched, {name: entry["languages"] for name, entry in entries.items()}
+
+
+def dashboard_payload(dashboard, encoding="objects"):
+  if encoding != "columnar":
+    return json.dumps(dashboard)
+  # Columnar form stores each list section once as column names plus row
+  # arrays, so keys are not repeated for every repository and issue.
+  encoded = dict(dashboard)
+  for section in LIST_SECTIONS:
+    rows = dashboard.get(section) or []
+    if rows:
+      columns = list(rows[0])
+      encoded[section] = {"columns": columns, "rows": [[row.get(column) for column in columns] for row in rows]}
+  return json.dumps(encoded, separators=(",", ":"))
+
+
+def aggregate_languages(repos, language_bytes=None):
+  if language_bytes:
+    # Weighted by bytes of code across the listed repositories; count is the
+    # number of those repositories using the language at all.
+    sizes = {}
+    counts = {}
+    for repo in repos:
+      for language, size in (language_bytes.get(repo.name) or {}).items():
+        sizes[language] = sizes.get(language, 0) + size
+        counts[language] = counts.get(language, 0) + 1
+    ranked = sorted(sizes.items(), key=lambda x: x[1], reverse=True)[:6]
+    return [{"name": name, "count": counts[name], "bytes": size} for name, size in ranked]
   counts = {}
   for repo in repos:
-    language = repo.get("language", "")
+    language = repo.language
     if language:
       counts[language] = counts.get(language, 0) + 1
   return [{"name": name, "count": count} for name, count in sorted(counts.items(), key=lambda x: x[1], reverse=True)[:6]]
 
 
-def render_html(generated_at, dashboard):
-  dashboard_json = json.dumps(dashboard)
-  return f"""<!doctype html>
-<html lang="en">
-<head>
-  <meta charset="utf-8">
-  <meta name="viewport" content="width=device-width, initial-scale=1">
-  <title>GitHub Dashboard</title>
-  <style>
-    :root {{ --bg:#0c1018; --card:#141b28; --line:#23314c; --text:#e6ecf7; --muted:#9fb0cc; --accent:#3dd4a7; --link:#8ab7ff; }}
-    * {{ box-sizing: border-box; }}
-    body {{ margin:0; font-family:ui-sans-serif,-apple-system,BlinkMacSystemFont,"Segoe UI",sans-serif; color:var(--text); background:radial-gradient(1200px 500px at 20% -10%, #22345d 0%, var(--bg) 55%); }}
-    .wrap {{ width:min(1150px,92vw); margin:24px auto 48px; }}
-    .top {{ display:flex; justify-content:space-between; align-items:end; gap:12px; margin-bottom:20px; }}
-    .summary {{ display:grid; grid-template-columns:repeat(6,minmax(120px,1fr)); gap:10px; margin-bottom:16px; }}
-    .profile-card {{ background:var(--card); border:1px solid var(--line); border-radius:12px; padding:12px; margin-bottom:14px; display:flex; align-items:center; gap:12px; }}
-    .avatar {{ width:56px; height:56px; border-radius:50%; border:1px solid var(--line); object-fit:cover; background:#0f1522; }}
-    .profile-title {{ display:flex; align-items:center; gap:8px; flex-wrap:wrap; }}
-    .metric {{ background:linear-gradient(180deg,rgba(255,255,255,0.02),transparent),var(--card); border:1px solid var(--line); border-radius:12px; padding:12px; }}
-    .metric .label {{ color:var(--muted); font-size:.78rem; }}
-    .metric .value {{ margin-top:6px; color:var(--accent); font-weight:700; font-size:1.35rem; }}
-    .grid {{ display:grid; grid-template-columns:repeat(2,minmax(0,1fr)); gap:12px; }}
-    .panel {{ background:var(--card); border:1px solid var(--line); border-radius:12px; padding:12px; min-height:220px; }}
-    ul {{ margin:0; padding:0; list-style:none; display:flex; flex-direction:column; gap:8px; }}
-    li {{ border:1px solid var(--line); border-radius:10px; padding:10px; background:rgba(255,255,255,.01); }}
-    a {{ color:var(--link); text-decoration:none; }} a:hover {{ text-decoration:underline; }}
-    .subtle,.meta,.empty {{ color:var(--muted); }} .meta {{ margin-top:6px; display:flex; flex-wrap:wrap; gap:10px; font-size:.82rem; }}
-    .empty {{ font-style:italic; margin-top:14px; }}
-    @media (max-width:920px) {{ .summary {{ grid-template-columns:repeat(2,minmax(120px,1fr)); }} .grid {{ grid-template-columns:1fr; }} }}
-  </style>
-</head>
-<body>
-  <main class="wrap">
-    <section class="top">
-      <div>
-        <h1 id="title">GitHub Dashboard</h1>
-        <p class="subtle">Generated at {generated_at}</p>
-      </div>
-    </section>
-    <section id="profile" class="profile-card"></section>
-    <section id="summary" class="summary"></section>
-    <section id="panels" class="grid"></section>
-  </main>
-  <script>
-    const dashboard = {dashboard_json};
-    const summaryFields = [
-      ["Repos Listed", dashboard.summary.repositories],
-      ["Public Repos", dashboard.profile.public_repos],
-      ["Followers", dashboard.profile.followers],
-      ["Open PRs Authored", dashboard.summary.authored_prs],
-      ["Open Issues Authored", dashboard.summary.authored_issues],
-      ["Stars (Listed Repos)", dashboard.summary.repo_stars]
-    ];
-    const topLanguages = (dashboard.languages || []).map((x) => `${{x.name}} (${{x.count}})`).join(", ");
-    const panels = [
-      {{ title:"Recently Updated Repositories", empty:"No repositories found.", items:dashboard.recent_repositories, renderItem:(item)=>`<a href="${{item.url}}" target="_blank" rel="noreferrer">${{item.name}}</a><div class="meta"><span>Updated: ${{item.updated_at}}</span><span>Stars: ${{item.stars}}</span><span>Open issues: ${{item.open_issues}}</span><span>Language: ${{item.language || "n/a"}}</span><span>${{item.visibility}}</span></div>` }},
-      {{ title:"Open PRs Authored", empty:"No open authored pull requests.", items:dashboard.authored_prs, renderItem:(item)=>`<a href="${{item.url}}" target="_blank" rel="noreferrer">${{item.title}}</a><div class="meta"><span>${{item.repo}}</span><span>Updated: ${{item.updated_at}}</span></div>` }},
-      {{ title:"PRs Requesting Review", empty:"No review requests right now.", items:dashboard.review_requested_prs, renderItem:(item)=>`<a href="${{item.url}}" target="_blank" rel="noreferrer">${{item.title}}</a><div class="meta"><span>${{item.repo}}</span><span>Updated: ${{item.updated_at}}</span></div>` }},
-      {{ title:"Top Languages (Listed Repositories)", empty:"No languages found.", items:dashboard.languages, renderItem:(item)=>`<strong>${{item.name}}</strong><div class="meta"><span>Repositories: ${{item.count}}</span></div>` }},
-      {{ title:"Assigned Open Issues", empty:"No assigned issues.", items:dashboard.assigned_issues, renderItem:(item)=>`<a href="${{item.url}}" target="_blank" rel="noreferrer">${{item.title}}</a><div class="meta"><span>${{item.repo}}</span><span>Updated: ${{item.updated_at}}</span></div>` }},
-      {{ title:"Authored Open Issues", empty:"No authored open issues.", items:dashboard.authored_issues, renderItem:(item)=>`<a href="${{item.url}}" target="_blank" rel="noreferrer">${{item.title}}</a><div class="meta"><span>${{item.repo}}</span><span>Updated: ${{item.updated_at}}</span></div>` }}
-    ];
-    document.getElementById("title").textContent = `GitHub Dashboard for ${{dashboard.username}}`;
-    document.getElementById("profile").innerHTML = `
-      <img class="avatar" src="${{dashboard.profile.avatar_url}}" alt="${{dashboard.username}} avatar" />
-      <div>
-        <div class="profile-title">
-          <a href="${{dashboard.profile.html_url}}" target="_blank" rel="noreferrer">${{dashboard.profile.name}}</a>
-          <span class="subtle">@${{dashboard.username}}</span>
-        </div>
-        <div class="meta">
-          ${{dashboard.profile.company ? `<span>Company: ${{dashboard.profile.company}}</span>` : ""}}
-          ${{dashboard.profile.location ? `<span>Location: ${{dashboard.profile.location}}</span>` : ""}}
-          <span>Following: ${{dashboard.profile.following}}</span>
-          ${{topLanguages ? `<span>Top langs: ${{topLanguages}}</span>` : ""}}
-        </div>
-        ${{dashboard.profile.bio ? `<p class="subtle">${{dashboard.profile.bio}}</p>` : ""}}
-      </div>
-    `;
-    const summaryNode = document.getElementById("summary");
-    summaryFields.forEach(([label, value]) => {{
-      const metric = document.createElement("div");
-      metric.className = "metric";
-      metric.innerHTML = `<div class="label">${{label}}</div><div class="value">${{value}}</div>`;
-      summaryNode.appendChild(metric);
-    }});
-    const panelsNode = document.getElementById("panels");
-    panels.forEach((panel) => {{
-      const article = document.createElement("article");
-      article.className = "panel";
-      const title = document.createElement("h2");
-      title.textContent = panel.title;
-      article.appendChild(title);
-      if (!panel.items || panel.items.length === 0) {{
-        const empty = document.createElement("p");
-        empty.className = "empty";
-        empty.textContent = panel.empty;
-        article.appendChild(empty);
-      }} else {{
-        const list = document.createElement("ul");
-        panel.items.forEach((item) => {{
-          const row = document.createElement("li");
-          row.innerHTML = panel.renderItem(item);
-          list.appendChild(row);
-        }});
-        article.appendChild(list);
-      }}
-      panelsNode.appendChild(article);
-    }});
-  </script>
-</body>
-</html>"""
+# Compiled once per container from the same template Terraform renders.
+TEMPLATE = dashboard_template.load()
 
 
-def handler(event, context):
+def renderer_fingerprint():
+  digest = hashlib.sha256(TEMPLATE.sha256.encode("utf-8"))
+  for path in (__file__, dashboard_template.__file__, dashboard_prerender.__file__):
+    with open(path, "rb") as handle:
+      digest.update(handle.read())
+  return digest.hexdigest()
+
+
+RENDERER_FINGERPRINT = renderer_fingerprint()
+
+
+def dashboard_fingerprint(dashboard, variant="objects"):
+  # generated_at is not part of the dashboard dict, so identical data hashes
+  # identically; the renderer hash makes a code deploy force a re-render.
+  payload = json.dumps(dashboard, sort_keys=True, separators=(",", ":"))
+  return hashlib.sha256(f"{RENDERER_FINGERPRINT}\n{variant}\n{payload}".encode("utf-8")).hexdigest()
+
+
+def published_fingerprint(s3, bucket, key, field="dashboard-sha256"):
+  try:
+    head = s3.head_object(Bucket=bucket, Key=key)
+  except s3.exceptions.ClientError:
+    return ""
+  return head.get("Metadata", {}).get(field, "")
+
+
+ASSET_PREFIX = "assets"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Content-hashed asset keys already in the bucket; warm containers skip the
+# HEAD requests for them.
+PUBLISHED_ARTIFACTS = set()
+
+
+def render_chunks(generated_at, dashboard, payload_encoding="objects"):
+  return TEMPLATE.page.chunks({
+    "generated_at": generated_at,
+    "dashboard_json": dashboard_payload(dashboard, payload_encoding),
+  })
+
+
+def render_html(generated_at, dashboard, payload_encoding="objects"):
+  return b"".join(render_chunks(generated_at, dashboard, payload_encoding))
+
+
+def render_static_chunks(generated_at, dashboard):
+  # Fully rendered markup with the stylesheet inline and no script, so the
+  # first paint does not wait on any JavaScript.
+  return TEMPLATE.static.chunks({
+    "generated_at": dashboard_prerender.text(generated_at),
+    **dashboard_prerender.render_sections(dashboard),
+  })
+
+
+def load_settings():
   token = (os.getenv("GITHUB_TOKEN") or "").strip()
-  include_private = bool_from_string(os.getenv("INCLUDE_PRIVATE"), True)
-  max_repositories = max(1, min(100, int_from_string(os.getenv("MAX_REPOSITORIES"), 20)))
-  max_items = max(1, min(100, int_from_string(os.getenv("MAX_ITEMS_PER_SECTION"), 20)))
   organizations_csv = os.getenv("ORGANIZATIONS_CSV", "")
-  orgs = [x.strip() for x in organizations_csv.split(",") if x.strip()]
+  return {
+    "token": token,
+    "include_private": bool_from_string(os.getenv("INCLUDE_PRIVATE"), True) and bool(token),
+    "max_repositories": max(1, min(100, int_from_string(os.getenv("MAX_REPOSITORIES"), 20))),
+    "max_items": max(1, min(100, int_from_string(os.getenv("MAX_ITEMS_PER_SECTION"), 20))),
+    "max_concurrency": max(1, min(32, int_from_string(os.getenv("MAX_CONCURRENCY"), 8))),
+    "fetch_backend": os.getenv("FETCH_BACKEND", "rest").strip().lower(),
+    "payload_encoding": os.getenv("PAYLOAD_ENCODING", "objects").strip().lower(),
+    "output_layout": os.getenv("OUTPUT_LAYOUT", "split").strip().lower(),
+    "output_compression": os.getenv("OUTPUT_COMPRESSION", "gzip").strip().lower(),
+    "output_max_age": max(0, int_from_string(os.getenv("OUTPUT_MAX_AGE"), 300)),
+    "search_sync": os.getenv("SEARCH_SYNC", "off").strip().lower(),
+    "search_verify_seconds": max(0, int_from_string(os.getenv("SEARCH_VERIFY_SECONDS"), 21600)),
+    "repository_enrichment": os.getenv("REPOSITORY_ENRICHMENT", "off").strip().lower(),
+    "section_timeout": max(1, int_from_string(os.getenv("SECTION_TIMEOUT_SECONDS"), 60)),
+    "crawl_workers": max(0, min(100, int_from_string(os.getenv("CRAWL_WORKERS"), 0))),
+    "crawl_backend": os.getenv("CRAWL_BACKEND", "lambda").strip().lower(),
+    "trend_history": os.getenv("TREND_HISTORY", "off").strip().lower(),
+    "trend_history_path": os.getenv("TREND_HISTORY_PATH", "/tmp/dashboard-trends").strip(),
+    "webhook_secret": os.getenv("WEBHOOK_SECRET", "").strip(),
+    "webhook_debounce_seconds": max(0, min(60, int_from_string(os.getenv("WEBHOOK_DEBOUNCE_SECONDS"), 30))),
+    "orgs": [x.strip() for x in organizations_csv.split(",") if x.strip()],
+    "bucket": os.getenv("OUTPUT_BUCKET", "").strip(),
+    "key": os.getenv("OUTPUT_KEY", "index.html").strip(),
+  }
+
+
+def batch_targets(event):
+  users = event.get("users")
+  if users is None:
+    users = [x.strip() for x in os.getenv("TARGET_GITHUB_USERS", "").split(",") if x.strip()]
+  key_template = os.getenv("OUTPUT_KEY_TEMPLATE", "{username}/index.html").strip()
+
+  targets = []
+  for entry in users:
+    if isinstance(entry, dict):
+      username = resolve_username(entry.get("profile", ""), entry.get("username", ""))
+      key = entry.get("key", "")
+    else:
+      name, _, key = str(entry).partition("=")
+      username = resolve_username(name, "")
+    if username:
+      targets.append((username, (key or key_template.format(username=username)).strip()))
+  return targets
+
+
+def plan_section_searches(settings, username, sections):
+  queries = [(section, dict(SEARCH_SECTIONS)[section].format(username=username)) for section in sections]
+  # Delta sync keeps a snapshot per section, so those searches stay separate.
+  if settings["search_sync"] in ("memory", "s3"):
+    return [[(section, query, None)] for section, query in queries]
+  return plan_searches(queries)
 
-  username = resolve_username(os.getenv("TARGET_GITHUB_PROFILE", ""), os.getenv("TARGET_GITHUB_USERNAME", ""))
-  if not username and token:
-    viewer = gh_get("https://api.github.com/user", token)
-    username = viewer.get("login", "")
-  if not username:
-    raise ValueError("Could not resolve GitHub username. Configure TARGET_GITHUB_PROFILE or TARGET_GITHUB_USERNAME.")
 
-  if not token:
-    include_private = False
+def search_sections(settings, username, group):
+  if settings["search_sync"] in ("memory", "s3"):
+    section, query, _ = group[0]
+    return {section: sync_search(
+      settings["token"], username, section, query, settings["max_items"], settings["search_verify_seconds"],
+    )}
+  return search_group(settings["token"], group, settings["max_items"])
 
-  profile = gh_get(f"https://api.github.com/users/{urllib.parse.quote(username)}", token)
-  repos = collect_repositories(token, username, include_private, orgs, max_repositories)
-  authored_prs = search_issues(token, f"is:pr is:open author:{username}", max_items)
-  review_requested_prs = search_issues(token, f"is:pr is:open review-requested:{username}", max_items)
-  assigned_issues = search_issues(token, f"is:issue is:open assignee:{username}", max_items)
-  authored_issues = search_issues(token, f"is:issue is:open author:{username}", max_items)
-  languages = aggregate_languages(repos)
-  total_stars = sum(int(repo.get("stars", 0)) for repo in repos)
+
+def submit_searches(settings, username, groups, executor):
+  futures = {}
+  for group in groups:
+    sections = [section for section, _, _ in group]
+    future = executor.submit(
+      METRICS.timed(f"search.{'+'.join(sections)}", search_sections, username=username), settings, username, group,
+    )
+    futures.update(dict.fromkeys(sections, future))
+  return futures
+
+
+def repository_section(settings, username, repos, executor):
+  # Returns the repositories and their language breakdown, enriched when
+  # REPOSITORY_ENRICHMENT is on.
+  language_bytes = None
+  if settings["repository_enrichment"] in ("memory", "s3"):
+    with METRICS.stage("enrichment", username=username):
+      repos, language_bytes = enrich_repositories(settings, repos, executor)
+  with METRICS.stage("aggregate_languages", username=username):
+    return repos, aggregate_languages(repos, language_bytes)
+
+
+# Dashboard fields and summary counters owned by each section, in priority
+# order: sections are submitted in this order and the rate-limit budget
+# trimming in build_dashboard drops from the end.
+SECTION_FIELDS = {
+  "profile": (["profile"], []),
+  "repositories": (["recent_repositories", "languages"], ["repositories", "repo_stars"]),
+  **{section: ([section], [section]) for section, _ in SEARCH_SECTIONS},
+  "organizations": (["organizations", "org_repositories"], []),
+}
+PUBLISH_RESERVE_SECONDS = 5
+
+
+@contextlib.contextmanager
+def task_pool(max_workers):
+  # Unlike a plain executor block this does not wait for stragglers on exit:
+  # a section past its deadline is published stale while its request finishes
+  # or times out in the background.
+  pool = ThreadPoolExecutor(max_workers=max_workers, initializer=join_run, initargs=(RUNS["current"],))
+  try:
+    yield pool
+  finally:
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def section_timeout(settings):
+  timeout = settings["section_timeout"]
+  time_left = SCHEDULER.time_left()
+  if time_left is not None:
+    timeout = min(timeout, max(0, time_left - PUBLISH_RESERVE_SECONDS))
+  return timeout
+
+
+def fill_stale_sections(dashboard, previous, stale):
+  for section in stale:
+    fields, counters = SECTION_FIELDS[section]
+    for field in fields:
+      if field in previous:
+        dashboard[field] = previous[field]
+    for counter in counters:
+      if counter in previous.get("summary", {}):
+        dashboard["summary"][counter] = previous["summary"][counter]
+  dashboard["stale_sections"] = stale
+  return dashboard
+
+
+CRAWL_PREFIX = "_state/crawl"
+CRAWL_POLL_SECONDS = 0.25
+# Older than any Lambda run, so partials from runs this old are abandoned.
+CRAWL_PARTIAL_MAX_AGE_SECONDS = 3600
+
+
+def crawl_page_url(org, page):
+  # Sorted by name rather than updated_at, so repositories updated during the
+  # crawl do not move between pages owned by different shards.
+  return f"{GITHUB_API_URL}/orgs/{urllib.parse.quote(org)}/repos?sort=full_name&per_page={REPOSITORY_PAGE_SIZE}&page={page}"
+
+
+def plan_crawl(org_pages, workers):
+  # Splits every org page into contiguous runs of about equal length, one
+  # per worker; a shard is a list of [org, first_page, last_page, open]
+  # ranges, where open marks the range holding the org's last planned page.
+  counts = dict(org_pages)
+  pages = [(org, page) for org, count in org_pages for page in range(1, count + 1)]
+  if not pages:
+    return []
+  size = -(-len(pages) // workers)
+  shards = []
+  for start in range(0, len(pages), size):
+    ranges = []
+    for org, page in pages[start:start + size]:
+      if ranges and ranges[-1][0] == org:
+        ranges[-1][2] = page
+      else:
+        ranges.append([org, page, page, False])
+      ranges[-1][3] = page == counts[org]
+    shards.append(ranges)
+  return shards
+
+
+def crawl_shard(settings, shard):
+  # Worker side: fetches the shard's pages and reduces them to per-org totals
+  # and the shard's top repositories by stars.
+  token = settings["token"]
+  pages = [(org, page) for org, first, last, _ in shard["ranges"] for page in range(first, last + 1)]
+  # The planned pages come from the org's repository counts, which can miss
+  # repositories the token sees; an open range keeps reading while its
+  # pages come back full.
+  open_ends = {(org, last) for org, _, last, is_open in shard["ranges"] if is_open}
+  organizations = {}
+  top = []
+
+  def fetch(entry):
+    return entry, gh_get(crawl_page_url(*entry), token, repository_object_hook)
+
+  def add(org, repos):
+    nonlocal top
+    totals = organizations.setdefault(org, {"repositories": 0, "stars": 0, "open_issues": 0})
+    totals["repositories"] += len(repos)
+    totals["stars"] += sum(int(repo.stars or 0) for repo in repos)
+    totals["open_issues"] += sum(int(repo.open_issues or 0) for repo in repos)
+    top = heapq.nlargest(shard["top"], top + repos, key=lambda repo: (int(repo.stars or 0), repo.name))
+
+  following = []
+  with ThreadPoolExecutor(max_workers=settings["max_concurrency"]) as executor:
+    for (org, page), repos in executor.map(fetch, pages):
+      add(org, repos)
+      if (org, page) in open_ends and len(repos) == REPOSITORY_PAGE_SIZE:
+        following.append((org, page + 1))
+  for org, page in following:
+    while True:
+      _, repos = fetch((org, page))
+      add(org, repos)
+      if len(repos) < REPOSITORY_PAGE_SIZE:
+        break
+      page += 1
+  return {"run": shard["run"], "index": shard["index"], "organizations": organizations, "top": [repo._asdict() for repo in top]}
+
+
+def reduce_crawl(partials, top):
+  organizations = {}
+  repos = {}
+  for partial in partials:
+    for org, totals in partial["organizations"].items():
+      entry = organizations.setdefault(org, {"name": org, "repositories": 0, "stars": 0, "open_issues": 0})
+      for field, value in totals.items():
+        entry[field] += value
+    for repo in partial["top"]:
+      repos[repo["name"]] = repo
+  ranked = heapq.nlargest(top, repos.values(), key=lambda repo: (int(repo["stars"] or 0), repo["name"]))
+  return sorted(organizations.values(), key=lambda entry: entry["stars"], reverse=True), ranked
+
+
+def crawl_partial_store(settings, run, index):
+  # Keyed by run as well, so overlapping refreshes do not overwrite each
+  # other's partials.
+  return S3CacheStore(settings["bucket"], f"{CRAWL_PREFIX}/{run}/{index}.json.gz")
+
+
+def crawl_run_time(key):
+  try:
+    return int(key[len(CRAWL_PREFIX) + 1:].split("-", 1)[0])
+  except ValueError:
+    return 0
+
+
+class OrganizationCrawl:
+  # Coordinator side of the sharded org crawl. Shards are dispatched when the
+  # refresh starts, to async invocations of this function (partials come
+  # back through S3) or to a local process pool, and collected as the
+  # organizations section.
+  def __init__(self, settings, function_name):
+    self.settings = settings
+    self.function_name = function_name
+    self.run = f"{int(time.time())}-{os.urandom(4).hex()}"
+    self.shards = []
+    self.futures = []
+    self.error = None
+    self.outcome = None
+    self.lock = threading.Lock()
+
+  def start(self, executor):
+    settings = self.settings
+    orgs = settings["orgs"]
+    try:
+      with METRICS.stage("crawl_dispatch"):
+        profiles = list(executor.map(lambda org: gh_get(f"{GITHUB_API_URL}/orgs/{urllib.parse.quote(org)}", settings["token"]), orgs))
+        org_pages = []
+        for org, profile in zip(orgs, profiles):
+          count = profile.get("public_repos", 0) + (profile.get("total_private_repos", 0) if settings["include_private"] else 0)
+          # At least one page, so an org whose counts are short is still read.
+          org_pages.append((org, max(1, -(-count // REPOSITORY_PAGE_SIZE))))
+        needed = sum(pages for _, pages in org_pages)
+        budget = SCHEDULER.remaining("core")
+        if budget is not None and budget < needed:
+          raise RateLimitExceeded(f"the org crawl needs {needed} core requests, {budget} remain")
+
+        self.shards = [
+          {"run": self.run, "index": index, "ranges": ranges, "top": settings["max_repositories"]}
+          for index, ranges in enumerate(plan_crawl(org_pages, settings["crawl_workers"]))
+        ]
+        if self.shards and settings["crawl_backend"] == "process":
+          # Spawned rather than forked: the refresh already has threads and
+          # open connections that a forked worker must not inherit.
+          self.pool = ProcessPoolExecutor(max_workers=len(self.shards) or 1, mp_context=multiprocessing.get_context("spawn"))
+          self.futures = [self.pool.submit(crawl_shard, settings, shard) for shard in self.shards]
+        else:
+          for shard in self.shards:
+            invoke_async(self.function_name, {"crawl_shard": shard})
+    except Exception as err:
+      self.error = err
+    return self
+
+  def partials(self, deadline):
+    if self.futures:
+      try:
+        done, _ = concurrent.futures.wait(self.futures, timeout=max(0, deadline - time.monotonic()))
+        return [future.result() for future in self.futures if future in done]
+      finally:
+        self.pool.shutdown(wait=False, cancel_futures=True)
+    bucket = self.settings["bucket"]
+    prefix = f"{CRAWL_PREFIX}/{self.run}/"
+    s3 = s3_client()
+    collected = {}
+    while True:
+      # One listing per tick; only partials that have appeared are read.
+      for key in list_keys(s3, bucket, prefix):
+        if key not in collected:
+          partial = S3CacheStore(bucket, key).load()
+          if partial.get("run") == self.run:
+            collected[key] = partial
+      if len(collected) == len(self.shards) or time.monotonic() + CRAWL_POLL_SECONDS > deadline:
+        return list(collected.values())
+      time.sleep(CRAWL_POLL_SECONDS)
+
+  def collect(self):
+    # Batch mode shares one crawl between every user: the first to get here
+    # collects and reduces it, and the others wait for that outcome, so the
+    # partials are read and discarded once.
+    with self.lock:
+      if self.outcome is None:
+        try:
+          self.outcome = (self.reduce(), None)
+        except Exception as err:
+          self.outcome = (None, err)
+    result, error = self.outcome
+    if error is not None:
+      raise error
+    return result
+
+  def reduce(self):
+    if self.error is not None:
+      raise self.error
+    # Stops polling before the section deadline; missing shards fail the
+    # section so it is published from the previous dashboard.
+    try:
+      partials = self.partials(time.monotonic() + section_timeout(self.settings))
+    finally:
+      if not self.futures:
+        self.discard_partials()
+    if len(partials) < len(self.shards):
+      raise RuntimeError(f"{len(self.shards) - len(partials)} of {len(self.shards)} crawl shards missing")
+    return reduce_crawl(partials, self.settings["max_repositories"])
+
+  def discard_partials(self):
+    # This run's partials, and any a late shard left behind in an older run.
+    bucket = self.settings["bucket"]
+    cutoff = time.time() - CRAWL_PARTIAL_MAX_AGE_SECONDS
+    try:
+      s3 = s3_client()
+      for key in list_keys(s3, bucket, f"{CRAWL_PREFIX}/"):
+        if key.startswith(f"{CRAWL_PREFIX}/{self.run}/") or crawl_run_time(key) < cutoff:
+          s3.delete_object(Bucket=bucket, Key=key)
+    except Exception as err:
+      SCHEDULER.skip(f"crawl cleanup: {err}")
+
+
+def start_crawl(settings, context, executor):
+  if not settings["crawl_workers"] or not settings["orgs"]:
+    return None
+  function_name = getattr(context, "function_name", "") or os.getenv("AWS_LAMBDA_FUNCTION_NAME", "")
+  return OrganizationCrawl(settings, function_name).start(executor)
+
+
+def crawl_worker(shard, context):
+  settings = load_settings()
+  SCHEDULER.start(context)
+  with METRICS.stage("crawl_shard", index=shard["index"]):
+    partial = crawl_shard(settings, shard)
+  crawl_partial_store(settings, shard["run"], shard["index"]).save(partial)
+  return {"statusCode": 200, "body": json.dumps({"message": f"Crawled shard {shard['index']}", "run": shard["run"]})}
+
+
+def build_dashboard(settings, username, executor, shared_pages=None, previous=None, crawl=None):
+  token = settings["token"]
+  orgs = settings["orgs"]
+  max_repositories = settings["max_repositories"]
+  max_items = settings["max_items"]
+
+  # SEARCH_SECTIONS is in priority order and so are the planned searches;
+  # when the budget cannot cover every request, the trailing searches and
+  # org listings are dropped up front.
+  groups = plan_section_searches(settings, username, [section for section, _ in SEARCH_SECTIONS])
+  search_budget = SCHEDULER.remaining("search")
+  if search_budget is not None and search_budget < len(groups):
+    for group in groups[search_budget:]:
+      for section, _, _ in group:
+        SCHEDULER.skip(section)
+    groups = groups[:search_budget]
+  core_budget = SCHEDULER.remaining("core")
+  if core_budget is not None and core_budget < len(orgs) + 2:
+    for org in orgs[max(0, core_budget - 2):]:
+      SCHEDULER.skip(f"/orgs/{org}/repos")
+    orgs = orgs[:max(0, core_budget - 2)]
+
+  def graphql():
+    profile, repos, searches = METRICS.timed("graphql", collect_dashboard_graphql, username=username)(
+      token, username, include_private_for(settings, username), orgs, max_repositories, max_items,
+    )
+    return profile, repository_section(settings, username, repos, executor), searches
+
+  def repositories():
+    repos = METRICS.timed("repositories", collect_repositories, username=username)(
+      token, username, include_private_for(settings, username), orgs, max_repositories, executor, shared_pages,
+    )
+    return repository_section(settings, username, repos, executor)
+
+  # Each section is an independent task with a deadline that leaves time to
+  # publish. One that fails or misses it no longer fails the refresh; it is
+  # filled from the previous dashboard and listed in stale_sections.
+  with task_pool(len(SECTION_FIELDS)) as tasks:
+    # GraphQL needs an authenticated request; anonymous runs stay on REST.
+    if settings["fetch_backend"] == "graphql" and token:
+      futures = {"graphql": tasks.submit(graphql)}
+    else:
+      futures = {
+        "profile": executor.submit(
+          METRICS.timed("profile", gh_get, username=username), f"{GITHUB_API_URL}/users/{urllib.parse.quote(username)}", token,
+        ),
+        "repositories": tasks.submit(repositories),
+      }
+      futures.update(submit_searches(settings, username, groups, executor))
+    if crawl is not None:
+      futures["organizations"] = tasks.submit(METRICS.timed("organizations", crawl.collect, username=username))
+    done, _ = concurrent.futures.wait(list(futures.values()), timeout=section_timeout(settings))
+
+  results = {}
+  errors = []
+  for name, future in futures.items():
+    if future not in done:
+      future.cancel()
+      SCHEDULER.skip(f"{name}: missed the section deadline")
+    elif isinstance(future.exception(), RateLimitExceeded):
+      SCHEDULER.skip(name)
+    elif future.exception() is not None:
+      errors.append(future.exception())
+      SCHEDULER.skip(f"{name}: {future.exception()}")
+    elif name == "graphql":
+      profile, repos, searches = future.result()
+      results.update({"profile": profile, "repositories": repos, **searches})
+    elif name in dict(SEARCH_SECTIONS):
+      results[name] = future.result()[name]
+    else:
+      results[name] = future.result()
+
+  profile = results.get("profile", {})
+  repos, languages = results.get("repositories", ([], []))
+  searches = {section: results.get(section, []) for section, _ in SEARCH_SECTIONS}
+  authored_prs = searches["authored_prs"]
+  review_requested_prs = searches["review_requested_prs"]
+  assigned_issues = searches["assigned_issues"]
+  authored_issues = searches["authored_issues"]
+  total_stars = sum(int(repo.stars or 0) for repo in repos)
 
   dashboard = {
     "username": username,
@@ -324,35 +2141,684 @@ def handler(event, context):
       "repo_stars": total_stars,
     },
     "languages": languages,
-    "recent_repositories": repos,
-    "authored_prs": authored_prs,
-    "review_requested_prs": review_requested_prs,
-    "assigned_issues": assigned_issues,
-    "authored_issues": authored_issues,
+    "recent_repositories": [repo._asdict() for repo in repos],
+    "authored_prs": [item._asdict() for item in authored_prs],
+    "review_requested_prs": [item._asdict() for item in review_requested_prs],
+    "assigned_issues": [item._asdict() for item in assigned_issues],
+    "authored_issues": [item._asdict() for item in authored_issues],
+    "stale_sections": [],
   }
+  if "organizations" in results:
+    dashboard["organizations"], dashboard["org_repositories"] = results["organizations"]
+  stale = [
+    section for section in SECTION_FIELDS
+    if section not in results and (section != "organizations" or crawl is not None)
+  ]
+  if stale:
+    last_good = (previous() if previous else None) or {}
+    # With nothing fetched and nothing to fall back on, publishing would
+    # replace the page with an empty one. Sections that missed their deadline
+    # or were skipped for the rate limit are not in errors, so this is decided
+    # by what completed rather than by what failed.
+    if not results.keys() - {"organizations"} and not last_good:
+      if errors:
+        raise errors[0]
+      raise RuntimeError(f"No dashboard section completed for {username} and there is no saved dashboard to fall back on")
+    dashboard = fill_stale_sections(dashboard, last_good, stale)
+  return dashboard
+
+
+def put_artifact(s3, bucket, key, chunks, content_type, cache_control, compression, metadata=None):
+  # The rendered chunks are compressed and uploaded as a stream; the page is
+  # never joined into one string first.
+  chunks, content_encoding = dashboard_template.compress_chunks(chunks, compression)
+  extra = {"ContentEncoding": content_encoding} if content_encoding else {}
+  with METRICS.stage("s3_put", key=key):
+    s3.put_object(
+      Bucket=bucket,
+      Key=key,
+      Body=dashboard_template.ChunkedBody(chunks),
+      ContentType=content_type,
+      CacheControl=cache_control,
+      Metadata=metadata or {},
+      **extra,
+    )
+
+
+def publish_asset(s3, bucket, name, extension, content_type, body, compression, force):
+  # Asset keys carry a hash of their content, so an existing object is
+  # already current and can be cached by browsers forever.
+  digest = hashlib.sha256(f"{compression}\n".encode("utf-8") + body).hexdigest()[:16]
+  key = f"{ASSET_PREFIX}/{name}.{digest}.{extension}"
+  if force or key not in PUBLISHED_ARTIFACTS:
+    with METRICS.stage("s3_head", key=key):
+      exists = not force and published_fingerprint(s3, bucket, key, "asset-sha256") == digest
+    if not exists:
+      put_artifact(s3, bucket, key, [body], content_type, IMMUTABLE_CACHE_CONTROL, compression, {"asset-sha256": digest})
+    PUBLISHED_ARTIFACTS.add(key)
+  return key
+
 
-  generated_at = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
-  html = render_html(generated_at, dashboard)
+def publish_split(s3, settings, key, dashboard, force, fingerprint):
+  bucket = settings["bucket"]
+  compression = settings["output_compression"]
+  cache_control = f"public, max-age={settings['output_max_age']}"
+  base = posixpath.dirname(key)
+  data_key = posixpath.join(base, "dashboard.json")
 
-  bucket = os.getenv("OUTPUT_BUCKET", "").strip()
-  key = os.getenv("OUTPUT_KEY", "index.html").strip()
+  css_key = publish_asset(s3, bucket, "dashboard", "css", "text/css; charset=utf-8", TEMPLATE.css, compression, force)
+  js_key = publish_asset(s3, bucket, "dashboard", "js", "text/javascript; charset=utf-8", TEMPLATE.js, compression, force)
+  shell = TEMPLATE.shell.chunks({
+    "generated_at": "",
+    "css_href": posixpath.relpath(css_key, base or "."),
+    "js_href": posixpath.relpath(js_key, base or "."),
+  })
+  shell_digest = hashlib.sha256(f"{compression}\n".encode("utf-8") + b"".join(shell)).hexdigest()
+  # Unlike the assets, the shell's key is not content-addressed: terraform
+  # apply uploads its own inline page to index.html, so it is compared on
+  # every run rather than remembered per container.
+  with METRICS.stage("s3_head", key=key):
+    current = not force and published_fingerprint(s3, bucket, key, "shell-sha256") == shell_digest
+  if not current:
+    put_artifact(
+      s3, bucket, key, shell, "text/html; charset=utf-8", cache_control, compression,
+      {"shell-sha256": shell_digest},
+    )
+
+  if force:
+    unchanged = False
+  else:
+    with METRICS.stage("s3_head", key=data_key):
+      unchanged = published_fingerprint(s3, bucket, data_key) == fingerprint
+  if not unchanged:
+    generated_at = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
+    with METRICS.stage("render_html", key=data_key):
+      data = [
+        f'{{"generated_at":{json.dumps(generated_at)},"dashboard":'.encode("utf-8"),
+        dashboard_payload(dashboard, settings["payload_encoding"]).encode("utf-8"),
+        b"}",
+      ]
+    put_artifact(
+      s3, bucket, data_key, data, "application/json; charset=utf-8", cache_control, compression,
+      {"dashboard-sha256": fingerprint},
+    )
+  return unchanged
+
+
+def publish_dashboard(s3, settings, key, dashboard, force):
+  bucket = settings["bucket"]
+  variant = f"{settings['payload_encoding']}\n{settings['output_layout']}\n{settings['output_compression']}"
+  with METRICS.stage("fingerprint", key=key):
+    fingerprint = dashboard_fingerprint(dashboard, variant)
+
+  if settings["output_layout"] == "split":
+    return publish_split(s3, settings, key, dashboard, force, fingerprint), fingerprint
+
+  if force:
+    unchanged = False
+  else:
+    with METRICS.stage("s3_head", key=key):
+      unchanged = published_fingerprint(s3, bucket, key) == fingerprint
+
+  if not unchanged:
+    generated_at = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
+    with METRICS.stage("render_html", key=key):
+      if settings["output_layout"] == "static":
+        chunks = render_static_chunks(generated_at, dashboard)
+      else:
+        chunks = render_chunks(generated_at, dashboard, settings["payload_encoding"])
+    put_artifact(
+      s3, bucket, key, chunks, "text/html; charset=utf-8",
+      f"public, max-age={settings['output_max_age']}", settings["output_compression"], {"dashboard-sha256": fingerprint},
+    )
+  return unchanged, fingerprint
+
+
+DASHBOARD_STATE_PREFIX = "_state/dashboards"
+
+
+def dashboard_state_store(settings, key):
+  return S3CacheStore(settings["bucket"], f"{DASHBOARD_STATE_PREFIX}/{key}.json.gz")
+
+
+def save_dashboard_state(settings, key, dashboard, unchanged):
+  # The last published dashboard is what webhook refreshes patch and what
+  # sections that miss a refresh fall back to.
+  if not unchanged:
+    with METRICS.stage("s3_put", key=key):
+      dashboard_state_store(settings, key).save(dashboard)
+
+
+TREND_PREFIX = "_state/trends"
+# One segment per UTC day: S3 appends rewrite the whole segment, so a run
+# costs at most one day of records (96 lines at 15-minute refreshes).
+TREND_SEGMENT_FORMAT = "%Y-%m-%d"
+TREND_DAILY_BUCKETS = 92
+TREND_WEEKLY_BUCKETS = 105
+# Tracked counters and the section each comes from; a stale section's
+# counters keep their last recorded value instead of the copied one.
+TREND_COUNTERS = {
+  "followers": "profile",
+  "repositories": "repositories",
+  "repo_stars": "repositories",
+  **{section: section for section, _ in SEARCH_SECTIONS},
+}
+
+
+class S3TrendStore:
+  def __init__(self, bucket, prefix):
+    self.bucket = bucket
+    self.prefix = prefix
+    self.rollups = S3CacheStore(bucket, f"{prefix}/rollups.json.gz")
+
+  def load(self):
+    return self.rollups.load()
+
+  def save(self, rollups):
+    self.rollups.save(rollups)
+
+  def append(self, segment, first, record):
+    # S3 objects cannot be appended to, so the day's segment is rewritten
+    # with one more line; lines already written never change.
+    s3 = s3_client()
+    key = f"{self.prefix}/{segment}.jsonl.gz"
+    try:
+      lines = gzip.decompress(s3.get_object(Bucket=self.bucket, Key=key)["Body"].read())
+    except s3.exceptions.ClientError:
+      lines = b""
+    line = json.dumps(record if lines else first, separators=(",", ":")) + "\n"
+    s3.put_object(
+      Bucket=self.bucket,
+      Key=key,
+      Body=gzip.compress(lines + line.encode("utf-8")),
+      ContentType="application/x-ndjson",
+      ContentEncoding="gzip",
+    )
+
+
+class FileTrendStore:
+  def __init__(self, directory):
+    self.directory = directory
+    self.path = os.path.join(directory, "rollups.json")
+
+  def load(self):
+    try:
+      with open(self.path, "r", encoding="utf-8") as handle:
+        return json.load(handle)
+    except (OSError, ValueError):
+      return {}
+
+  def save(self, rollups):
+    os.makedirs(self.directory, exist_ok=True)
+    with open(f"{self.path}.tmp", "w", encoding="utf-8") as handle:
+      json.dump(rollups, handle, separators=(",", ":"))
+    os.replace(f"{self.path}.tmp", self.path)
+
+  def append(self, segment, first, record):
+    os.makedirs(self.directory, exist_ok=True)
+    with open(os.path.join(self.directory, f"{segment}.jsonl"), "a", encoding="utf-8") as handle:
+      handle.write(json.dumps(record if handle.tell() else first, separators=(",", ":")) + "\n")
+
+
+def trend_store(settings, key):
+  if settings["trend_history"] == "s3":
+    return S3TrendStore(settings["bucket"], f"{TREND_PREFIX}/{key}")
+  if settings["trend_history"] == "file":
+    return FileTrendStore(os.path.join(settings["trend_history_path"], key))
+  return None
+
+
+def trend_values(dashboard):
+  stale = set(dashboard["stale_sections"])
+  values = {
+    name: dashboard["profile"].get(name, 0) if name == "followers" else dashboard["summary"].get(name, 0)
+    for name, section in TREND_COUNTERS.items()
+    if section not in stale
+  }
+  if "repositories" not in stale:
+    # Language mix as permille of the listed languages, by bytes when the
+    # repositories are enriched and by repository count otherwise.
+    weights = {entry["name"]: entry.get("bytes", entry["count"]) or 0 for entry in dashboard["languages"]}
+    total = sum(weights.values()) or 1
+    values["languages"] = {name: round(weight * 1000 / total) for name, weight in weights.items()}
+  return values
+
+
+def trend_delta(previous, values):
+  delta = {}
+  for name, value in values.items():
+    if name == "languages":
+      before = previous.get("languages", {})
+      changed = {language: share for language, share in value.items() if before.get(language) != share}
+      changed.update({language: None for language in before if language not in value})
+      if changed:
+        delta["languages"] = changed
+    elif previous.get(name) != value:
+      delta[name] = value
+  return delta
+
+
+def roll_up(rollups, values, timestamp):
+  # Each bucket keeps the last values seen in its day or week, so sparklines
+  # read a bounded list instead of replaying the raw records.
+  day = datetime.utcfromtimestamp(timestamp).date()
+  updated = {"last": {"t": timestamp, "v": values}}
+  for name, label, limit in (
+    ("daily", day.isoformat(), TREND_DAILY_BUCKETS),
+    ("weekly", (day - timedelta(days=day.weekday())).isoformat(), TREND_WEEKLY_BUCKETS),
+  ):
+    buckets = list(rollups.get(name, []))
+    if buckets and buckets[-1][0] == label:
+      buckets.pop()
+    buckets.append([label, values])
+    updated[name] = buckets[-limit:]
+  return updated
+
+
+def trend_series(rollups):
+  languages = list(rollups["last"]["v"].get("languages", {}))
+  series = {}
+  for name in ("daily", "weekly"):
+    buckets = rollups.get(name, [])
+    series[name] = {
+      "labels": [label for label, _ in buckets],
+      "counters": {counter: [values.get(counter, 0) for _, values in buckets] for counter in TREND_COUNTERS},
+      "languages": {
+        language: [values.get("languages", {}).get(language, 0) for _, values in buckets] for language in languages
+      },
+    }
+  return series
+
+
+def record_trends(settings, key, dashboard, now=None):
+  # Appends this run to the raw history, delta-encoded against the previous
+  # record (each daily segment opens with a full record so it decodes on
+  # its own), and adds sparkline series from the updated rollups.
+  store = trend_store(settings, key)
+  if store is None:
+    return dashboard
+  timestamp = int(now if now is not None else time.time())
+  try:
+    with METRICS.stage("trends", key=key):
+      rollups = store.load()
+      last = rollups.get("last")
+      values = {**(last["v"] if last else {}), **trend_values(dashboard)}
+      first = {"t": timestamp, "v": values}
+      record = first
+      if last:
+        record = {"d": timestamp - last["t"]}
+        delta = trend_delta(last["v"], values)
+        if delta:
+          record["v"] = delta
+      store.append(datetime.utcfromtimestamp(timestamp).strftime(TREND_SEGMENT_FORMAT), first, record)
+      rollups = roll_up(rollups, values, timestamp)
+      store.save(rollups)
+  except Exception as err:
+    SCHEDULER.skip(f"trends: {err}")
+    return dashboard
+  dashboard["trends"] = trend_series(rollups)
+  return dashboard
+
+
+def refresh_batch(settings, targets, s3, force, context=None):
+  shared_pages = SharedRequests()
+
+  def refresh_one(username, key, executor):
+    try:
+      dashboard = build_dashboard(
+        settings, username, executor, shared_pages, lambda: dashboard_state_store(settings, key).load(), crawl,
+      )
+      record_trends(settings, key, dashboard)
+      unchanged, fingerprint = publish_dashboard(s3, settings, key, dashboard, force)
+      save_dashboard_state(settings, key, dashboard, unchanged)
+    except Exception as err:
+      return {"username": username, "key": key, "error": str(err)}
+    return {
+      "username": username,
+      "key": key,
+      "unchanged": unchanged,
+      "fingerprint": fingerprint,
+      "stale_sections": dashboard["stale_sections"],
+    }
+
+  # Users get their own pool so a user task waiting on its requests can never
+  # starve the request pool it is waiting on.
+  with task_pool(settings["max_concurrency"]) as executor:
+    # Every user shares the orgs, so they share one crawl.
+    crawl = start_crawl(settings, context, executor)
+    with task_pool(min(len(targets), settings["max_concurrency"])) as user_executor:
+      futures = [user_executor.submit(refresh_one, username, key, executor) for username, key in targets]
+      return [future.result() for future in futures]
+
+
+def handler(event, context):
+  METRICS.configure(os.getenv("METRICS_MODE"), os.getenv("METRICS_NAMESPACE"), os.getenv("METRICS_FILE"))
+  try:
+    with METRICS.stage("handler"):
+      event = event or {}
+      if "crawl_shard" in event:
+        return crawl_worker(event["crawl_shard"], context)
+      return refresh(event, context)
+  finally:
+    METRICS.flush()
+
+
+TOKEN_OWNERS = {}
+TOKEN_OWNERS_LOCK = threading.Lock()
+
+
+def token_owner(token):
+  # Resolved once per container; concurrent batch users wait on the lock
+  # rather than each asking /user.
+  with TOKEN_OWNERS_LOCK:
+    if token not in TOKEN_OWNERS:
+      try:
+        TOKEN_OWNERS[token] = gh_get(f"{GITHUB_API_URL}/user", token).get("login", "")
+      except urllib.error.HTTPError:
+        return ""
+    return TOKEN_OWNERS[token]
+
+
+def include_private_for(settings, username):
+  # /user/repos and the GraphQL viewer list the token owner's repositories,
+  # so only the token owner's own dashboard may use them; everyone else in a
+  # batch gets their public listing.
+  return settings["include_private"] and token_owner(settings["token"]).lower() == username.lower()
+
+
+def resolve_target_username(token):
+  with METRICS.stage("resolve_username"):
+    username = resolve_username(os.getenv("TARGET_GITHUB_PROFILE", ""), os.getenv("TARGET_GITHUB_USERNAME", ""))
+    if not username and token:
+      viewer = gh_get(f"{GITHUB_API_URL}/user", token)
+      username = viewer.get("login", "")
+      with TOKEN_OWNERS_LOCK:
+        TOKEN_OWNERS[token] = username
+  if not username:
+    raise ValueError("Could not resolve GitHub username. Configure TARGET_GITHUB_PROFILE or TARGET_GITHUB_USERNAME.")
+  return username
+
+
+def http_cache_ttls():
+  # Seconds a response is served without asking GitHub, by endpoint class.
+  return {
+    "profile": max(0, int_from_string(os.getenv("HTTP_CACHE_TTL_PROFILE"), 3600)),
+    "repositories": max(0, int_from_string(os.getenv("HTTP_CACHE_TTL_REPOS"), 300)),
+    "search": max(0, int_from_string(os.getenv("HTTP_CACHE_TTL_SEARCH"), 0)),
+  }
+
+
+def start_run(settings, context, cache_ttls=True):
+  new_run()
+  bucket = settings["bucket"]
+  cache_backend = os.getenv("HTTP_CACHE_BACKEND", "memory").strip().lower()
+  cache_options = {
+    "ttls": http_cache_ttls() if cache_ttls else {},
+    "max_bytes": max(1, int_from_string(os.getenv("HTTP_CACHE_MAX_MB"), 32)) * 1024 * 1024,
+  }
+  if cache_backend == "s3":
+    RESPONSE_CACHE.use(S3CacheStore(bucket, os.getenv("HTTP_CACHE_KEY", "_state/http-cache.json.gz").strip()), **cache_options)
+  else:
+    RESPONSE_CACHE.use(None, enabled=cache_backend != "none", **cache_options)
+  if settings["search_sync"] == "s3":
+    SEARCH_SNAPSHOT.use(S3CacheStore(bucket, os.getenv("SEARCH_SNAPSHOT_KEY", "_state/search-snapshot.json.gz").strip()))
+  else:
+    SEARCH_SNAPSHOT.use(None, enabled=settings["search_sync"] == "memory")
+  if settings["repository_enrichment"] == "s3":
+    ENRICHMENT_CACHE.use(S3CacheStore(bucket, os.getenv("ENRICHMENT_CACHE_KEY", "_state/repository-enrichment.json.gz").strip()))
+  else:
+    ENRICHMENT_CACHE.use(None, enabled=settings["repository_enrichment"] == "memory")
+
+  SCHEDULER.start(context)
+  if not SCHEDULER.known():
+    SCHEDULER.load(settings["token"])
+
+
+def finish_run():
+  RESPONSE_CACHE.flush()
+  SEARCH_SNAPSHOT.flush()
+  ENRICHMENT_CACHE.flush()
+
+
+def refresh(event, context):
+  settings = load_settings()
+  token = settings["token"]
+  bucket = settings["bucket"]
+  key = settings["key"]
   if not bucket:
     raise ValueError("OUTPUT_BUCKET is required.")
 
-  s3 = boto3.client("s3")
-  s3.put_object(
-    Bucket=bucket,
-    Key=key,
-    Body=html.encode("utf-8"),
-    ContentType="text/html; charset=utf-8",
-  )
+  start_run(settings, context)
+  s3 = s3_client()
+  force = bool_from_string(event.get("force"), False)
+
+  targets = batch_targets(event)
+  if targets:
+    results = refresh_batch(settings, targets, s3, force, context)
+    finish_run()
+    failed = [result for result in results if "error" in result]
+    return {
+      "statusCode": 207 if failed else 200,
+      "body": json.dumps({
+        "message": f"Refreshed {len(results) - len(failed)} of {len(results)} dashboards",
+        "bucket": bucket,
+        "results": results,
+        "http_cache": RESPONSE_CACHE.stats(),
+        "search_sync": SEARCH_SNAPSHOT.stats(),
+        "enrichment": ENRICHMENT_CACHE.stats(),
+        "rate_limit": SCHEDULER.report(),
+        "skipped_sections": SCHEDULER.skipped,
+      }),
+    }
+
+  username = resolve_target_username(token)
+
+  with task_pool(settings["max_concurrency"]) as executor:
+    crawl = start_crawl(settings, context, executor)
+    dashboard = build_dashboard(
+      settings, username, executor, previous=lambda: dashboard_state_store(settings, key).load(), crawl=crawl,
+    )
+  record_trends(settings, key, dashboard)
+  unchanged, fingerprint = publish_dashboard(s3, settings, key, dashboard, force)
+  save_dashboard_state(settings, key, dashboard, unchanged)
+  finish_run()
 
   return {
     "statusCode": 200,
     "body": json.dumps({
-      "message": "Dashboard refreshed",
+      "message": "Dashboard unchanged" if unchanged else "Dashboard refreshed",
       "bucket": bucket,
       "key": key,
       "username": username,
+      "unchanged": unchanged,
+      "fingerprint": fingerprint,
+      "stale_sections": dashboard["stale_sections"],
+      "http_cache": RESPONSE_CACHE.stats(),
+      "search_sync": SEARCH_SNAPSHOT.stats(),
+      "enrichment": ENRICHMENT_CACHE.stats(),
+      "rate_limit": SCHEDULER.report(),
+      "skipped_sections": SCHEDULER.skipped,
     }),
   }
+
+
+# One object per delivery, named by its event time, so concurrent deliveries
+# never overwrite each other's sections.
+WEBHOOK_PENDING_PREFIX = "_state/webhook-pending"
+# Dashboard sections each GitHub event can change. "repositories" covers the
+# repository list, languages and the repository/star totals.
+WEBHOOK_SECTIONS = {
+  "pull_request": ["authored_prs", "review_requested_prs"],
+  "issues": ["assigned_issues", "authored_issues"],
+  "push": ["repositories"],
+  "repository": ["repositories"],
+}
+
+
+def webhook_signature(secret, body):
+  return "sha256=" + hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+
+
+def valid_webhook_signature(secret, body, signature):
+  return hmac.compare_digest(webhook_signature(secret, body), signature or "")
+
+
+def webhook_job_body(job):
+  return json.dumps(job, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def webhook_pending_key(event_at, delivery):
+  delivery = "".join(char for char in delivery if char.isalnum() or char == "-") or os.urandom(8).hex()
+  return f"{WEBHOOK_PENDING_PREFIX}/{event_at:.6f}-{delivery}.json.gz"
+
+
+def webhook_event_time(key):
+  return float(posixpath.basename(key).split("-", 1)[0])
+
+
+def webhook_response(status, message, **extra):
+  return {
+    "statusCode": status,
+    "headers": {"Content-Type": "application/json"},
+    "body": json.dumps({"message": message, **extra}),
+  }
+
+
+def patch_dashboard(settings, username, dashboard, sections, executor):
+  # Only the sections named by the events are fetched again; the profile and
+  # every other section are carried over from the saved dashboard.
+  patched = {
+    **dashboard,
+    "summary": dict(dashboard["summary"]),
+    "stale_sections": [section for section in dashboard.get("stale_sections", []) if section not in sections],
+  }
+  groups = plan_section_searches(settings, username, [section for section, _ in SEARCH_SECTIONS if section in sections])
+  search_futures = submit_searches(settings, username, groups, executor)
+  if "repositories" in sections:
+    with METRICS.stage("repositories", username=username):
+      repos = collect_repositories(
+        settings["token"], username, include_private_for(settings, username), settings["orgs"], settings["max_repositories"],
+        executor,
+      )
+    repos, patched["languages"] = repository_section(settings, username, repos, executor)
+    patched["recent_repositories"] = [repo._asdict() for repo in repos]
+    patched["summary"]["repositories"] = len(repos)
+    patched["summary"]["repo_stars"] = sum(int(repo.stars or 0) for repo in repos)
+  for section, future in search_futures.items():
+    items = future.result()[section]
+    patched[section] = [item._asdict() for item in items]
+    patched["summary"][section] = len(items)
+  return patched
+
+
+def webhook_handler(event, context):
+  METRICS.configure(os.getenv("METRICS_MODE"), os.getenv("METRICS_NAMESPACE"), os.getenv("METRICS_FILE"))
+  try:
+    with METRICS.stage("webhook"):
+      event = event or {}
+      if "webhook_flush" in event:
+        return flush_webhook_events(event["webhook_flush"], event.get("signature"), context)
+      return receive_webhook(event, context)
+  finally:
+    METRICS.flush()
+
+
+def receive_webhook(event, context):
+  settings = load_settings()
+  body = event.get("body") or ""
+  raw = base64.b64decode(body) if event.get("isBase64Encoded") else body.encode("utf-8")
+  headers = {str(name).lower(): value for name, value in (event.get("headers") or {}).items()}
+  secret = settings["webhook_secret"]
+  if not secret or not valid_webhook_signature(secret, raw, headers.get("x-hub-signature-256", "")):
+    return webhook_response(401, "Invalid signature")
+
+  name = headers.get("x-github-event", "")
+  if name == "ping":
+    return webhook_response(200, "pong")
+  sections = WEBHOOK_SECTIONS.get(name)
+  if not sections:
+    return webhook_response(202, f"Ignored {name or 'unknown'} event")
+
+  # GitHub gives up on a delivery after 10 seconds, so the refresh runs in a
+  # separate asynchronous invocation of this function.
+  # Rounded to the precision the pending object's name keeps.
+  event_at = round(time.time(), 6)
+  pending_key = webhook_pending_key(event_at, headers.get("x-github-delivery", ""))
+  S3CacheStore(settings["bucket"], pending_key).save({"sections": sections, "event_at": event_at})
+  function_name = getattr(context, "function_name", "") or os.getenv("AWS_LAMBDA_FUNCTION_NAME", "")
+  # The function can be invoked publicly (see the function URL permissions),
+  # so flush jobs carry an HMAC of their own under the same secret.
+  job = {"sections": sections, "event_at": event_at}
+  invoke_async(function_name, {"webhook_flush": job, "signature": webhook_signature(secret, webhook_job_body(job))})
+  return webhook_response(202, "Queued", sections=sections, delivery=headers.get("x-github-delivery", ""))
+
+
+def flush_webhook_events(job, signature, context):
+  settings = load_settings()
+  secret = settings["webhook_secret"]
+  if not secret or not valid_webhook_signature(secret, webhook_job_body(job), signature):
+    return webhook_response(401, "Invalid signature")
+  s3 = s3_client()
+  bucket = settings["bucket"]
+
+  # Trailing-edge debounce: wait out the window after this event; if a later
+  # delivery is pending by then, its invocation refreshes instead, with the
+  # sections of every delivery still pending.
+  wait = job["event_at"] + settings["webhook_debounce_seconds"] - time.time()
+  if wait > 0:
+    time.sleep(wait)
+  keys = list_keys(s3, bucket, f"{WEBHOOK_PENDING_PREFIX}/")
+  if any(webhook_event_time(key) > job["event_at"] for key in keys):
+    return webhook_response(200, "Coalesced into a later event", sections=job["sections"])
+  sections = set(job["sections"])
+  for key in keys:
+    sections.update(S3CacheStore(bucket, key).load().get("sections", []))
+  response = refresh_sections(settings, sorted(sections), context)
+  # Only the deliveries folded into this refresh are cleared; one that
+  # arrived meanwhile keeps its object for its own invocation.
+  for key in keys:
+    s3.delete_object(Bucket=bucket, Key=key)
+  return response
+
+
+def refresh_sections(settings, sections, context):
+  # An event means the data just changed, so cached responses are always
+  # revalidated rather than served within their TTL.
+  start_run(settings, context, cache_ttls=False)
+  s3 = s3_client()
+  targets = batch_targets({}) or [(resolve_target_username(settings["token"]), settings["key"])]
+
+  results = []
+  with task_pool(settings["max_concurrency"]) as executor:
+    for username, key in targets:
+      try:
+        state = dashboard_state_store(settings, key).load()
+        if state.get("username") == username:
+          dashboard = patch_dashboard(settings, username, state, sections, executor)
+        else:
+          # Nothing saved for this dashboard yet, so it is built in full once.
+          dashboard = build_dashboard(settings, username, executor)
+        unchanged, fingerprint = publish_dashboard(s3, settings, key, dashboard, False)
+        save_dashboard_state(settings, key, dashboard, unchanged)
+      except Exception as err:
+        results.append({"username": username, "key": key, "error": str(err)})
+        continue
+      results.append({
+        "username": username,
+        "key": key,
+        "unchanged": unchanged,
+        "fingerprint": fingerprint,
+        "stale_sections": dashboard.get("stale_sections", []),
+      })
+  finish_run()
+
+  failed = [result for result in results if "error" in result]
+  return webhook_response(
+    207 if failed else 200,
+    f"Patched {', '.join(sections)} for {len(results) - len(failed)} of {len(results)} dashboards",
+    results=results,
+    http_cache=RESPONSE_CACHE.stats(),
+    search_sync=SEARCH_SNAPSHOT.stats(),
+    enrichment=ENRICHMENT_CACHE.stats(),
+    rate_limit=SCHEDULER.report(),
+  )
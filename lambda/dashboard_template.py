@@ -0,0 +1,200 @@
+import hashlib
+import io
+import os
+import re
+import zlib
+
+TEMPLATE_NAME = "dashboard.html.tftpl"
+# Terraform templatefile() syntax: ${name} interpolates, $${ and %%{ are
+# literal escapes. Directives (%{ if }, %{ for }) are not used by the
+# dashboard and are rejected rather than silently emitted.
+TOKEN = re.compile(r"\$\$\{|%%\{|%\{|\$\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}")
+ESCAPES = {"$${": "${", "%%{": "%{"}
+STYLE_OPEN = "<style>\n"
+STYLE_CLOSE = "  </style>"
+SCRIPT_OPEN = "<script>\n"
+SCRIPT_CLOSE = "  </script>"
+RENDER_CALL = "    renderDashboard(${dashboard_json});\n"
+# The shell keeps the page markup but loads the stylesheet, script and data
+# separately; the data request starts from <head> so it downloads alongside
+# the assets instead of after them.
+SHELL_HEAD = (
+  '<link rel="stylesheet" href="${css_href}">\n'
+  '  <script>window.dashboardData = fetch("dashboard.json").then((response) => response.json());</script>'
+)
+SHELL_SCRIPTS = (
+  '<script src="${js_href}"></script>\n'
+  "  <script>\n"
+  "    dashboardData.then((data) => {\n"
+  '      document.getElementById("generated-at").textContent = data.generated_at;\n'
+  "      renderDashboard(data.dashboard);\n"
+  "    }).catch(() => {\n"
+  '      document.getElementById("panels").textContent = "Dashboard data could not be loaded.";\n'
+  "    });\n"
+  "  </script>"
+)
+# The static page fills the title and the empty panel sections with markup
+# prerendered in Python, under slots named static_<id>.
+STATIC_SLOT = re.compile(r'(<(h1|section) id="(title|profile|summary|charts|panels)"[^>]*>)[^<]*(</\2>)')
+STATIC_SLOTS = 5
+
+
+class Template:
+  # Compiled once into static byte segments and placeholder names, so a
+  # render is a list of references rather than a parse plus a big string.
+  def __init__(self, text):
+    self.parts = []
+    self.names = set()
+    literal = []
+    position = 0
+    for match in TOKEN.finditer(text):
+      literal.append(text[position:match.start()])
+      position = match.end()
+      token = match.group(0)
+      if token in ESCAPES:
+        literal.append(ESCAPES[token])
+      elif token == "%{":
+        line = text.count("\n", 0, match.start()) + 1
+        raise ValueError(f"template directives are not supported (line {line})")
+      else:
+        self._literal(literal)
+        literal = []
+        self.parts.append(match.group(1))
+        self.names.add(match.group(1))
+    literal.append(text[position:])
+    self._literal(literal)
+
+  def _literal(self, pieces):
+    text = "".join(pieces)
+    if text:
+      self.parts.append(text.encode("utf-8"))
+
+  def chunks(self, values):
+    missing = self.names - set(values)
+    if missing:
+      raise KeyError(f"missing template values: {', '.join(sorted(missing))}")
+    encoded = {name: value if isinstance(value, bytes) else str(value).encode("utf-8") for name, value in values.items()}
+    return [encoded[part] if isinstance(part, str) else part for part in self.parts]
+
+  def render(self, values):
+    return b"".join(self.chunks(values))
+
+
+class DashboardTemplate:
+  def __init__(self, text):
+    self.sha256 = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    self.page = Template(text)
+
+    style_start = text.index(STYLE_OPEN)
+    style_end = text.index(STYLE_CLOSE, style_start) + len(STYLE_CLOSE)
+    script_start = text.rindex(SCRIPT_OPEN)
+    script_end = text.index(SCRIPT_CLOSE, script_start) + len(SCRIPT_CLOSE)
+    script = text[script_start + len(SCRIPT_OPEN):script_end - len(SCRIPT_CLOSE)]
+    if not script.endswith(RENDER_CALL):
+      raise ValueError("template script must end with renderDashboard(${dashboard_json});")
+
+    self.css = Template(text[style_start + len(STYLE_OPEN):style_end - len(STYLE_CLOSE)]).render({})
+    self.js = Template(script[:-len(RENDER_CALL)]).render({})
+    self.shell = Template(
+      text[:style_start] + SHELL_HEAD + text[style_end:script_start] + SHELL_SCRIPTS + text[script_end:]
+    )
+    # Keeps the inline stylesheet and drops the render script entirely.
+    page = text[:script_start].rstrip() + "\n" + text[script_end:].lstrip("\n")
+    static, slots = STATIC_SLOT.subn(r"\1${static_\3}\4", page)
+    if slots != STATIC_SLOTS:
+      raise ValueError("template must keep the title, profile, summary, charts and panels elements")
+    self.static = Template(static)
+
+
+def template_path():
+  configured = os.getenv("DASHBOARD_TEMPLATE_PATH", "").strip()
+  if configured:
+    return configured
+  # Packaged next to this module in the Lambda zip; the repository keeps it
+  # under templates/ for Terraform's templatefile().
+  here = os.path.dirname(os.path.abspath(__file__))
+  candidates = [os.path.join(here, TEMPLATE_NAME), os.path.join(here, os.pardir, "templates", TEMPLATE_NAME)]
+  for candidate in candidates:
+    if os.path.exists(candidate):
+      return candidate
+  raise FileNotFoundError(f"{TEMPLATE_NAME} not found next to {here} or in ../templates")
+
+
+def load(path=None):
+  with open(path or template_path(), "r", encoding="utf-8") as handle:
+    return DashboardTemplate(handle.read())
+
+
+def compress_chunks(chunks, compression):
+  # Compresses chunk by chunk so the rendered page is never joined into one
+  # buffer before compression. Returns the output chunks and Content-Encoding.
+  if compression == "br":
+    try:
+      import brotli
+    except ImportError:
+      # brotli is not part of the Lambda runtime; gzip is the fallback.
+      compression = "gzip"
+    else:
+      compressor = brotli.Compressor()
+      output = [compressor.process(chunk) for chunk in chunks]
+      output.append(compressor.finish())
+      return [chunk for chunk in output if chunk], "br"
+  if compression == "gzip":
+    # wbits=31 writes a gzip container with a zero mtime, so identical input
+    # yields identical bytes.
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 31)
+    output = [compressor.compress(chunk) for chunk in chunks]
+    output.append(compressor.flush())
+    return [chunk for chunk in output if chunk], "gzip"
+  return list(chunks), None
+
+
+class ChunkedBody(io.RawIOBase):
+  # Seekable read-only stream over a list of byte chunks; boto3 can size,
+  # hash and retry it, and the SigV4 client sends the chunks directly.
+  def __init__(self, chunks):
+    self.chunks = list(chunks)
+    self.length = sum(len(chunk) for chunk in self.chunks)
+    self._position = 0
+    self._index = 0
+    self._offset = 0
+
+  def __len__(self):
+    return self.length
+
+  def readable(self):
+    return True
+
+  def seekable(self):
+    return True
+
+  def tell(self):
+    return self._position
+
+  def seek(self, offset, whence=io.SEEK_SET):
+    if whence == io.SEEK_CUR:
+      offset += self._position
+    elif whence == io.SEEK_END:
+      offset += self.length
+    self._position = max(0, min(offset, self.length))
+    self._index = 0
+    self._offset = self._position
+    while self._index < len(self.chunks) and self._offset >= len(self.chunks[self._index]):
+      self._offset -= len(self.chunks[self._index])
+      self._index += 1
+    return self._position
+
+  def readinto(self, buffer):
+    written = 0
+    view = memoryview(buffer)
+    while written < len(view) and self._index < len(self.chunks):
+      chunk = self.chunks[self._index]
+      size = min(len(chunk) - self._offset, len(view) - written)
+      view[written:written + size] = chunk[self._offset:self._offset + size]
+      written += size
+      self._offset += size
+      if self._offset >= len(chunk):
+        self._index += 1
+        self._offset = 0
+    self._position += written
+    return written
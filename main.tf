@@ -6,13 +6,24 @@ data "external" "github_dashboard" {
   program = ["python3", local.script_path]
 
   query = {
-    github_token          = var.github_token
-    github_username       = var.github_username
-    github_profile        = var.github_profile
-    organizations_csv     = join(",", var.organizations)
-    include_private       = tostring(var.include_private_repos)
-    max_repositories      = tostring(var.max_repositories)
-    max_items_per_section = tostring(var.max_items_per_section)
+    github_token           = var.github_token
+    github_username        = var.github_username
+    github_profile         = var.github_profile
+    organizations_csv      = join(",", var.organizations)
+    include_private        = tostring(var.include_private_repos)
+    max_repositories       = tostring(var.max_repositories)
+    max_items_per_section  = tostring(var.max_items_per_section)
+    max_concurrency        = tostring(var.max_concurrency)
+    http_cache_file        = var.http_cache_file
+    http_cache_ttl_profile = tostring(var.http_cache_ttl_seconds.profile)
+    http_cache_ttl_repos   = tostring(var.http_cache_ttl_seconds.repos)
+    http_cache_ttl_search  = tostring(var.http_cache_ttl_seconds.search)
+    http_cache_max_mb      = tostring(var.http_cache_max_mb)
+    fetch_backend          = var.fetch_backend
+    payload_encoding       = var.payload_encoding
+    snapshot_file          = var.dashboard_snapshot_file
+    snapshot_max_age       = tostring(var.dashboard_snapshot_max_age_seconds)
+    snapshot_refresh       = var.dashboard_snapshot_refresh
   }
 }
 
@@ -18,6 +18,11 @@ output "lambda_refresh_function_name" {
   value       = local.lambda_enabled ? aws_lambda_function.dashboard_refresh[0].function_name : null
 }
 
+output "lambda_webhook_url" {
+  description = "Payload URL for the GitHub webhook when github_webhook_secret is set."
+  value       = local.webhook_enabled ? aws_lambda_function_url.dashboard_webhook[0].function_url : null
+}
+
 output "lambda_refresh_schedule_expression" {
   description = "EventBridge schedule for dashboard refresh Lambda."
   value       = local.lambda_enabled ? aws_cloudwatch_event_rule.dashboard_refresh[0].schedule_expression : null
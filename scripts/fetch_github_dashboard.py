@@ -1,13 +1,50 @@
 #!/usr/bin/env python3
+import gzip
+import hashlib
+import heapq
+import http.client
+import io
 import json
 import os
+import ssl
+import subprocess
 import sys
+import threading
+import time
 import urllib.error
 import urllib.parse
-import urllib.request
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 
 
+RepositoryRecord = namedtuple(
+  "RepositoryRecord", ["name", "url", "updated_at", "stars", "open_issues", "language", "visibility"],
+)
+IssueRecord = namedtuple("IssueRecord", ["title", "url", "repo", "updated_at"])
+
+LIST_SECTIONS = [
+  "languages",
+  "recent_repositories",
+  "authored_prs",
+  "review_requested_prs",
+  "assigned_issues",
+  "authored_issues",
+]
+
+GITHUB_API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+
+REPOSITORY_PAGE_SIZE = 100
+MAX_REPOSITORY_PAGES = 10
+
+SEARCH_SECTIONS = [
+  ("authored_prs", "is:pr is:open author:{username}"),
+  ("review_requested_prs", "is:pr is:open review-requested:{username}"),
+  ("assigned_issues", "is:issue is:open assignee:{username}"),
+  ("authored_issues", "is:issue is:open author:{username}"),
+]
+
+
 def read_query():
   payload = sys.stdin.read().strip()
   if not payload:
@@ -28,7 +65,252 @@ def int_from_string(value, default):
     return default
 
 
-def gh_get(url, token):
+class HTTPResponse:
+  __slots__ = ("status", "reason", "headers", "body")
+
+  def __init__(self, status, reason, headers, body):
+    self.status = status
+    self.reason = reason
+    self.headers = headers
+    self.body = body
+
+
+class PooledHTTPClient:
+  RETRYABLE_ERRORS = (http.client.RemoteDisconnected, http.client.BadStatusLine, ConnectionError)
+
+  def __init__(self, timeout=30, max_idle_per_host=32, max_redirects=5):
+    self.timeout = timeout
+    self.max_idle_per_host = max_idle_per_host
+    self.max_redirects = max_redirects
+    self._ssl_context = ssl.create_default_context()
+    self._idle = {}
+    self._lock = threading.Lock()
+
+  def _acquire(self, scheme, netloc):
+    with self._lock:
+      idle = self._idle.get((scheme, netloc))
+      if idle:
+        return idle.pop(), True
+    if scheme == "https":
+      return http.client.HTTPSConnection(netloc, timeout=self.timeout, context=self._ssl_context), False
+    return http.client.HTTPConnection(netloc, timeout=self.timeout), False
+
+  def _release(self, scheme, netloc, conn):
+    with self._lock:
+      idle = self._idle.setdefault((scheme, netloc), [])
+      if len(idle) < self.max_idle_per_host:
+        idle.append(conn)
+        return
+    conn.close()
+
+  def close(self):
+    with self._lock:
+      pools, self._idle = self._idle, {}
+    for idle in pools.values():
+      for conn in idle:
+        conn.close()
+
+  def _send(self, method, parsed, headers, body):
+    path = parsed.path or "/"
+    if parsed.query:
+      path = f"{path}?{parsed.query}"
+    for attempt in range(2):
+      conn, reused = self._acquire(parsed.scheme, parsed.netloc)
+      try:
+        conn.request(method, path, body=body, headers=headers)
+        resp = conn.getresponse()
+        data = resp.read()
+      except self.RETRYABLE_ERRORS:
+        conn.close()
+        # The server may have dropped a connection that sat idle in the pool.
+        if reused and attempt == 0:
+          continue
+        raise
+      except Exception:
+        conn.close()
+        raise
+      if resp.will_close:
+        conn.close()
+      else:
+        self._release(parsed.scheme, parsed.netloc, conn)
+      if (resp.getheader("Content-Encoding") or "").lower() == "gzip":
+        data = gzip.decompress(data)
+      return HTTPResponse(resp.status, resp.reason, resp.headers, data)
+
+  def request(self, method, url, headers=None, body=None):
+    headers = dict(headers or {})
+    headers.setdefault("Accept-Encoding", "gzip")
+    for _ in range(self.max_redirects + 1):
+      parsed = urllib.parse.urlsplit(url)
+      response = self._send(method, parsed, headers, body)
+      location = response.headers.get("Location")
+      if method != "GET" or response.status not in {301, 302, 303, 307, 308} or not location:
+        return response
+      url = urllib.parse.urljoin(url, location)
+      if urllib.parse.urlsplit(url).netloc != parsed.netloc:
+        headers.pop("Authorization", None)
+    raise urllib.error.HTTPError(url, response.status, "Too many redirects", response.headers, io.BytesIO(response.body))
+
+
+HTTP_CLIENT = PooledHTTPClient()
+
+
+HTTP_CACHE_STATS = ("hits", "revalidated", "misses", "evicted")
+HTTP_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+
+class ConditionalRequestCache:
+  # Two tiers: entries live in memory, which a warm process keeps between
+  # runs, over an optional store that is read once and written back on flush.
+  # An entry younger than its endpoint's TTL is served without a request; an
+  # older one is revalidated with If-None-Match. Past max_bytes of bodies the
+  # least recently used entries are evicted.
+  def __init__(self, store=None):
+    self.store = store
+    self.enabled = True
+    self.ttls = {}
+    self.max_bytes = HTTP_CACHE_MAX_BYTES
+    self.entries = OrderedDict()
+    self.loaded = False
+    self._size = 0
+    self._dirty = False
+    self._stats = dict.fromkeys(HTTP_CACHE_STATS, 0)
+    self._lock = threading.Lock()
+
+  def use(self, store, enabled=True, ttls=None, max_bytes=HTTP_CACHE_MAX_BYTES):
+    with self._lock:
+      self.enabled = enabled
+      self.ttls = dict(ttls or {})
+      self.max_bytes = max_bytes
+      if getattr(store, "location", None) != getattr(self.store, "location", None):
+        self.store = store
+        self.loaded = False
+      self._dirty = False
+      self._stats = dict.fromkeys(HTTP_CACHE_STATS, 0)
+
+  def key(self, url, token):
+    scope = hashlib.sha256(token.encode("utf-8")).hexdigest()[:16] if token else "anonymous"
+    return f"{scope} {url}"
+
+  def ttl(self, url):
+    return self.ttls.get(request_endpoint(url), 0)
+
+  def _load(self):
+    if self.loaded:
+      return
+    if self.store is not None:
+      self.entries = OrderedDict(self.store.load())
+    self._size = sum(len(entry["body"]) for entry in self.entries.values())
+    self.loaded = True
+    self._evict()
+
+  def _evict(self):
+    while self._size > self.max_bytes and self.entries:
+      _, entry = self.entries.popitem(last=False)
+      self._size -= len(entry["body"])
+      self._stats["evicted"] += 1
+      self._dirty = True
+
+  def lookup(self, key):
+    with self._lock:
+      if not self.enabled:
+        return None
+      self._load()
+      entry = self.entries.get(key)
+      if entry is not None:
+        self.entries.move_to_end(key)
+      return entry
+
+  def fresh(self, entry, url):
+    ttl = self.ttl(url)
+    return ttl > 0 and time.time() - entry.get("fetched_at", 0) < ttl
+
+  def hit(self):
+    with self._lock:
+      self._stats["hits"] += 1
+
+  def revalidated(self, key, url):
+    with self._lock:
+      self._stats["revalidated"] += 1
+      entry = self.entries.get(key)
+      # A 304 confirms the body is current, so its TTL starts over.
+      if entry is not None and self.ttl(url) > 0:
+        entry["fetched_at"] = time.time()
+        self._dirty = True
+
+  def remember(self, key, url, headers, body):
+    etag = headers.get("ETag")
+    last_modified = headers.get("Last-Modified")
+    with self._lock:
+      self._stats["misses"] += 1
+      if not self.enabled or (not etag and not last_modified and not self.ttl(url)):
+        return
+      self._load()
+      previous = self.entries.pop(key, None)
+      if previous is not None:
+        self._size -= len(previous["body"])
+        self._dirty = True
+      # A body larger than the whole cache would only evict everything else.
+      if len(body) > self.max_bytes:
+        return
+      self.entries[key] = {"etag": etag, "last_modified": last_modified, "fetched_at": time.time(), "body": body}
+      self._size += len(body)
+      self._dirty = True
+      self._evict()
+
+  def stats(self):
+    with self._lock:
+      return dict(self._stats)
+
+  def flush(self):
+    with self._lock:
+      if not self.enabled or not self._dirty:
+        return
+      entries = dict(self.entries)
+      self._dirty = False
+    if self.store is not None:
+      self.store.save(entries)
+
+
+def request_endpoint(url):
+  path = urllib.parse.urlsplit(url).path
+  base = urllib.parse.urlsplit(GITHUB_API_URL).path
+  if base and path.startswith(base):
+    path = path[len(base):]
+  if path.startswith("/search/"):
+    return "search"
+  if path.endswith("/repos"):
+    return "repositories"
+  if path == "/user" or path.startswith("/users/"):
+    return "profile"
+  return "other"
+
+
+class FileCacheStore:
+  def __init__(self, path):
+    self.path = path
+    self.location = os.path.abspath(path)
+
+  def load(self):
+    try:
+      with open(self.path, "r", encoding="utf-8") as handle:
+        return json.load(handle)
+    except (OSError, ValueError):
+      return {}
+
+  def save(self, entries):
+    directory = os.path.dirname(os.path.abspath(self.path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{self.path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+      json.dump(entries, handle)
+    os.replace(tmp_path, self.path)
+
+
+RESPONSE_CACHE = ConditionalRequestCache()
+
+
+def gh_headers(token):
   headers = {
     "Accept": "application/vnd.github+json",
     "X-GitHub-Api-Version": "2022-11-28",
@@ -36,13 +318,31 @@ def gh_get(url, token):
   }
   if token:
     headers["Authorization"] = f"Bearer {token}"
-
-  req = urllib.request.Request(
-    url,
-    headers=headers,
-  )
-  with urllib.request.urlopen(req, timeout=30) as resp:
-    return json.loads(resp.read().decode("utf-8"))
+  return headers
+
+
+def gh_get(url, token, object_hook=None):
+  headers = gh_headers(token)
+  cache_key = RESPONSE_CACHE.key(url, token)
+  cached = RESPONSE_CACHE.lookup(cache_key)
+  if cached and RESPONSE_CACHE.fresh(cached, url):
+    RESPONSE_CACHE.hit()
+    return json.loads(cached["body"], object_hook=object_hook)
+  if cached:
+    if cached.get("etag"):
+      headers["If-None-Match"] = cached["etag"]
+    if cached.get("last_modified"):
+      headers["If-Modified-Since"] = cached["last_modified"]
+
+  response = HTTP_CLIENT.request("GET", url, headers)
+  if response.status == 304 and cached:
+    RESPONSE_CACHE.revalidated(cache_key, url)
+    return json.loads(cached["body"], object_hook=object_hook)
+  if response.status >= 400:
+    raise urllib.error.HTTPError(url, response.status, response.reason, response.headers, io.BytesIO(response.body))
+  body = response.body.decode("utf-8")
+  RESPONSE_CACHE.remember(cache_key, url, response.headers, body)
+  return json.loads(body, object_hook=object_hook)
 
 
 def resolve_username(profile_or_username, fallback_username):
@@ -62,122 +362,381 @@ def resolve_username(profile_or_username, fallback_username):
   return first_segment.replace("@", "")
 
 
-def collect_repositories(token, username, include_private, orgs, max_repositories):
-  repos = []
-  seen = set()
-
+def repository_sources(username, include_private, orgs):
   if include_private:
-    page = 1
-    while len(repos) < max_repositories and page <= 5:
-      url = (
-        "https://api.github.com/user/repos"
-        f"?sort=updated&per_page=100&page={page}"
-      )
-      chunk = gh_get(url, token)
-      if not chunk:
-        break
-      for repo in chunk:
-        full_name = repo.get("full_name", "")
-        if full_name in seen:
-          continue
-        seen.add(full_name)
-        repos.append({
-          "name": full_name,
-          "url": repo.get("html_url", ""),
-          "updated_at": repo.get("updated_at", ""),
-          "stars": repo.get("stargazers_count", 0),
-          "open_issues": repo.get("open_issues_count", 0),
-          "language": repo.get("language", ""),
-          "visibility": "private" if repo.get("private") else "public",
-        })
-        if len(repos) >= max_repositories:
-          break
-      page += 1
+    sources = [(
+      f"{GITHUB_API_URL}/user/repos"
+      f"?sort=updated&per_page={REPOSITORY_PAGE_SIZE}",
+      MAX_REPOSITORY_PAGES,
+    )]
   else:
-    page = 1
-    while len(repos) < max_repositories and page <= 5:
-      url = (
-        f"https://api.github.com/users/{urllib.parse.quote(username)}/repos"
-        f"?sort=updated&per_page=100&page={page}"
-      )
-      chunk = gh_get(url, token)
-      if not chunk:
-        break
-      for repo in chunk:
-        full_name = repo.get("full_name", "")
-        if full_name in seen:
-          continue
-        seen.add(full_name)
-        repos.append({
-          "name": full_name,
-          "url": repo.get("html_url", ""),
-          "updated_at": repo.get("updated_at", ""),
-          "stars": repo.get("stargazers_count", 0),
-          "open_issues": repo.get("open_issues_count", 0),
-          "language": repo.get("language", ""),
-          "visibility": "private" if repo.get("private") else "public",
-        })
-        if len(repos) >= max_repositories:
-          break
-      page += 1
-
+    sources = [(
+      f"{GITHUB_API_URL}/users/{urllib.parse.quote(username)}/repos"
+      f"?sort=updated&per_page={REPOSITORY_PAGE_SIZE}",
+      MAX_REPOSITORY_PAGES,
+    )]
   for org in orgs:
+    sources.append((
+      f"{GITHUB_API_URL}/orgs/{urllib.parse.quote(org)}/repos"
+      f"?sort=updated&per_page={REPOSITORY_PAGE_SIZE}",
+      MAX_REPOSITORY_PAGES,
+    ))
+  return sources
+
+
+def repository_record(repo):
+  return RepositoryRecord(
+    name=repo.get("full_name", ""),
+    url=repo.get("html_url", ""),
+    updated_at=repo.get("updated_at", ""),
+    stars=repo.get("stargazers_count", 0),
+    open_issues=repo.get("open_issues_count", 0),
+    language=repo.get("language", ""),
+    visibility="private" if repo.get("private") else "public",
+  )
+
+
+def repository_object_hook(obj):
+  # json calls this bottom-up while a page is parsed, so each repository
+  # becomes a record as soon as it is read and its nested owner, license and
+  # permissions objects are dropped instead of living until the page is done.
+  if "full_name" in obj and "stargazers_count" in obj:
+    return repository_record(obj)
+  return None
+
+
+def source_records(index, max_pages, fetch_page):
+  for page in range(1, max_pages + 1):
+    chunk = fetch_page(index, page)
+    yield from chunk
+    if len(chunk) < REPOSITORY_PAGE_SIZE:
+      return
+
+
+def merge_repository_sources(page_limits, fetch_page, max_repositories):
+  # Every source is already sorted by updated_at, so a lazy k-way merge only
+  # asks a source for its next page once all of its current page made the
+  # top-N; sources whose next page cannot rank are never fetched.
+  streams = [source_records(index, max_pages, fetch_page) for index, max_pages in enumerate(page_limits)]
+  repos = []
+  seen = set()
+  for repo in heapq.merge(*streams, key=lambda r: r.updated_at or "", reverse=True):
+    if repo.name in seen:
+      continue
+    seen.add(repo.name)
+    repos.append(repo)
     if len(repos) >= max_repositories:
       break
-    page = 1
-    while len(repos) < max_repositories and page <= 3:
-      url = (
-        f"https://api.github.com/orgs/{urllib.parse.quote(org)}/repos"
-        f"?sort=updated&per_page=100&page={page}"
-      )
-      chunk = gh_get(url, token)
-      if not chunk:
-        break
-      for repo in chunk:
-        full_name = repo.get("full_name", "")
-        if full_name in seen:
-          continue
-        seen.add(full_name)
-        repos.append({
-          "name": full_name,
-          "url": repo.get("html_url", ""),
-          "updated_at": repo.get("updated_at", ""),
-          "stars": repo.get("stargazers_count", 0),
-          "open_issues": repo.get("open_issues_count", 0),
-          "language": repo.get("language", ""),
-          "visibility": "private" if repo.get("private") else "public",
-        })
-        if len(repos) >= max_repositories:
-          break
-      page += 1
-
-  repos.sort(key=lambda r: r.get("updated_at", ""), reverse=True)
-  return repos[:max_repositories]
+  return repos
+
+
+def collect_repositories(token, username, include_private, orgs, max_repositories, executor=None):
+  sources = repository_sources(username, include_private, orgs)
+
+  # First pages are requested for every source up front; later pages are
+  # pulled lazily by the merge, so they stay on demand.
+  first_pages = []
+  if executor is not None:
+    first_pages = [
+      executor.submit(gh_get, f"{base_url}&page=1", token, repository_object_hook) for base_url, _ in sources
+    ]
+
+  def fetch_page(index, page):
+    if page == 1 and first_pages:
+      return first_pages[index].result()
+    return gh_get(f"{sources[index][0]}&page={page}", token, repository_object_hook)
+
+  try:
+    return merge_repository_sources([max_pages for _, max_pages in sources], fetch_page, max_repositories)
+  finally:
+    for future in first_pages:
+      future.cancel()
+
+
+def issue_record(item):
+  return IssueRecord(
+    title=item.get("title", ""),
+    url=item.get("html_url", ""),
+    repo="/".join(item.get("repository_url", "").split("/")[-2:]),
+    updated_at=item.get("updated_at", ""),
+  )
+
+
+def search_object_hook(obj):
+  if "repository_url" in obj and "title" in obj:
+    return issue_record(obj)
+  if "items" in obj:
+    return obj
+  return None
 
 
 def search_issues(token, query, limit):
   q = urllib.parse.quote(query)
-  url = f"https://api.github.com/search/issues?q={q}&sort=updated&order=desc&per_page={limit}"
-  data = gh_get(url, token)
-  items = data.get("items", [])
-  output = []
-  for item in items:
-    output.append({
-      "title": item.get("title", ""),
-      "url": item.get("html_url", ""),
-      "repo": (item.get("repository_url", "").split("/")[-2:] if item.get("repository_url") else ["", ""]),
-      "updated_at": item.get("updated_at", ""),
-    })
-  for row in output:
-    repo_parts = row["repo"]
-    row["repo"] = "/".join(repo_parts) if isinstance(repo_parts, list) else str(repo_parts)
-  return output[:limit]
+  url = f"{GITHUB_API_URL}/search/issues?q={q}&sort=updated&order=desc&per_page={limit}"
+  data = gh_get(url, token, search_object_hook)
+  return data.get("items", [])[:limit]
+
+
+SEARCH_KINDS = ("is:pr", "is:issue")
+MAX_MERGED_SEARCH_PAGES = 2
+# Merged queries GitHub rejected with a 422; their groups go straight to one
+# query per section from then on.
+MERGED_SEARCH_REJECTED = set()
+
+
+def plan_searches(queries):
+  # Queries that differ only by is:pr / is:issue are merged into one search
+  # and split on each item's pull_request field. Returns groups of
+  # (section, query, kind), ordered by their highest-priority section.
+  groups = []
+  mergeable = {}
+  for section, query in queries:
+    terms = query.split()
+    kinds = [term for term in terms if term in SEARCH_KINDS]
+    base = " ".join(term for term in terms if term not in SEARCH_KINDS)
+    kind = kinds[0] if len(kinds) == 1 else None
+    group = mergeable.get(base) if kind else None
+    if group is not None and kind not in [member[2] for member in group]:
+      group.append((section, query, kind))
+      continue
+    group = [(section, query, kind)]
+    groups.append(group)
+    if kind:
+      mergeable.setdefault(base, group)
+  return groups
+
+
+def search_kind_hook(obj):
+  if "repository_url" in obj and "title" in obj:
+    return (issue_record(obj), "is:pr" if "pull_request" in obj else "is:issue")
+  if "items" in obj:
+    return obj
+  return None
+
+
+def search_group(token, group, limit):
+  if len(group) == 1:
+    section, query, _ = group[0]
+    return {section: search_issues(token, query, limit)}
+
+  # Pages sized for every section in the group.
+  base = " ".join(term for term in group[0][1].split() if term not in SEARCH_KINDS)
+  if base in MERGED_SEARCH_REJECTED:
+    return {section: search_issues(token, query, limit) for section, query, _ in group}
+  per_page = min(100, limit * len(group))
+  url = f"{GITHUB_API_URL}/search/issues?q={urllib.parse.quote(base)}&sort=updated&order=desc&per_page={per_page}"
+  try:
+    data = gh_get(url, token, search_kind_hook)
+  except urllib.error.HTTPError as err:
+    # GitHub may reject a search without is:issue or is:pull-request.
+    if err.code != 422:
+      raise
+    MERGED_SEARCH_REJECTED.add(base)
+    return {section: search_issues(token, query, limit) for section, query, _ in group}
+  sections = {kind: section for section, _, kind in group}
+  results = {section: [] for section, _, _ in group}
+  page = 1
+  while True:
+    items = data.get("items", [])
+    for record, kind in items:
+      section = results[sections[kind]]
+      if len(section) < limit:
+        section.append(record)
+    # The pages are in updated order across every kind, so a section can be
+    # short while GitHub has more matches; the next page of the same search
+    # fills it.
+    if (
+      all(len(section) >= limit for section in results.values())
+      or len(items) < per_page or page * per_page >= data.get("total_count", 0)
+      or page == MAX_MERGED_SEARCH_PAGES
+    ):
+      break
+    page += 1
+    data = gh_get(f"{url}&page={page}", token, search_kind_hook)
+
+  # When the other kinds fill the first pages, a section still short after
+  # the last one runs its own query.
+  if page == MAX_MERGED_SEARCH_PAGES and data.get("total_count", 0) > page * per_page:
+    for section, query, _ in group:
+      if len(results[section]) < limit:
+        results[section] = search_issues(token, query, limit)
+  return results
+
+
+GRAPHQL_REPOSITORY_FIELDS = """
+  pageInfo { hasNextPage endCursor }
+  nodes {
+    nameWithOwner
+    url
+    updatedAt
+    stargazerCount
+    isPrivate
+    primaryLanguage { name }
+    issues(states: OPEN) { totalCount }
+    pullRequests(states: OPEN) { totalCount }
+  }
+"""
+
+GRAPHQL_SEARCH_FIELDS = """
+  nodes {
+    ... on Issue { title url updatedAt repository { nameWithOwner } }
+    ... on PullRequest { title url updatedAt repository { nameWithOwner } }
+  }
+"""
+
+GRAPHQL_PROFILE_FIELDS = """
+  login name bio avatarUrl url company location
+  followers { totalCount }
+  following { totalCount }
+  repositories(privacy: PUBLIC, ownerAffiliations: [OWNER]) { totalCount }
+"""
+
+
+def gh_graphql(query, variables, token):
+  headers = gh_headers(token)
+  headers["Content-Type"] = "application/json"
+  url = f"{GITHUB_API_URL}/graphql"
+  body = json.dumps({"query": query, "variables": variables}).encode("utf-8")
+  response = HTTP_CLIENT.request("POST", url, headers, body)
+  if response.status >= 400:
+    raise urllib.error.HTTPError(url, response.status, response.reason, response.headers, io.BytesIO(response.body))
+  payload = json.loads(response.body.decode("utf-8"))
+  if payload.get("errors"):
+    messages = "; ".join(error.get("message", "") for error in payload["errors"])
+    raise ValueError(f"GitHub GraphQL error: {messages}")
+  return payload.get("data") or {}
+
+
+def graphql_repository_sources(include_private, orgs):
+  # (root field, variable it needs, connection arguments, page cap) mirroring
+  # repository_sources so both backends merge the same way.
+  if include_private:
+    sources = [(
+      "viewer",
+      None,
+      "affiliations: [OWNER, COLLABORATOR, ORGANIZATION_MEMBER], "
+      "ownerAffiliations: [OWNER, COLLABORATOR, ORGANIZATION_MEMBER]",
+      MAX_REPOSITORY_PAGES,
+    )]
+  else:
+    sources = [("user(login: $login)", "login", "ownerAffiliations: [OWNER], privacy: PUBLIC", MAX_REPOSITORY_PAGES)]
+  for index in range(len(orgs)):
+    sources.append((f"organization(login: $org{index})", f"org{index}", "", MAX_REPOSITORY_PAGES))
+  return sources
+
+
+def graphql_repository_selection(index, source, after=False):
+  root, _, arguments, _ = source
+  arguments = ", ".join(x for x in (
+    f"first: {REPOSITORY_PAGE_SIZE}",
+    "after: $after" if after else "",
+    "orderBy: {field: UPDATED_AT, direction: DESC}",
+    arguments,
+  ) if x)
+  return f"r{index}: {root} {{ repositories({arguments}) {{ {GRAPHQL_REPOSITORY_FIELDS} }} }}"
+
+
+def graphql_repository_record(node):
+  return RepositoryRecord(
+    name=node.get("nameWithOwner", ""),
+    url=node.get("url", ""),
+    updated_at=node.get("updatedAt", ""),
+    stars=node.get("stargazerCount", 0),
+    open_issues=node["issues"]["totalCount"] + node["pullRequests"]["totalCount"],
+    language=(node.get("primaryLanguage") or {}).get("name"),
+    visibility="private" if node.get("isPrivate") else "public",
+  )
+
+
+def graphql_search_record(node):
+  return IssueRecord(
+    title=node.get("title", ""),
+    url=node.get("url", ""),
+    repo=(node.get("repository") or {}).get("nameWithOwner", ""),
+    updated_at=node.get("updatedAt", ""),
+  )
+
+
+def graphql_profile(node):
+  return {
+    "name": node.get("name"),
+    "bio": node.get("bio"),
+    "avatar_url": node.get("avatarUrl", ""),
+    "html_url": node.get("url", ""),
+    "followers": node["followers"]["totalCount"],
+    "following": node["following"]["totalCount"],
+    "public_repos": node["repositories"]["totalCount"],
+    "company": node.get("company"),
+    "location": node.get("location"),
+  }
+
+
+def collect_dashboard_graphql(token, username, include_private, orgs, max_repositories, max_items):
+  sources = graphql_repository_sources(include_private, orgs)
+  variables = {"login": username}
+  variables.update({f"org{index}": org for index, org in enumerate(orgs)})
+  variables.update({
+    f"q{index}": f"{query.format(username=username)} sort:updated-desc"
+    for index, (_, query) in enumerate(SEARCH_SECTIONS)
+  })
+
+  declarations = ", ".join(f"${name}: String!" for name in variables)
+  selections = [f"profile: user(login: $login) {{ {GRAPHQL_PROFILE_FIELDS} }}"]
+  selections += [graphql_repository_selection(index, source) for index, source in enumerate(sources)]
+  selections += [
+    f"s{index}: search(query: $q{index}, type: ISSUE, first: {max_items}) {{ {GRAPHQL_SEARCH_FIELDS} }}"
+    for index in range(len(SEARCH_SECTIONS))
+  ]
+  data = gh_graphql(f"query({declarations}) {{ {' '.join(selections)} }}", variables, token)
+  if not data.get("profile"):
+    raise ValueError(f"GitHub user not found: {username}")
+
+  connections = {}
+
+  def fetch_page(index, page):
+    if page == 1:
+      connection = data[f"r{index}"]["repositories"]
+    else:
+      page_info = connections[index]["pageInfo"]
+      if not page_info["hasNextPage"]:
+        return []
+      variable = sources[index][1]
+      page_variables = {"after": page_info["endCursor"]}
+      declarations = "$after: String"
+      if variable:
+        page_variables[variable] = variables[variable]
+        declarations += f", ${variable}: String!"
+      selection = graphql_repository_selection(index, sources[index], after=True)
+      connection = gh_graphql(f"query({declarations}) {{ {selection} }}", page_variables, token)[f"r{index}"]["repositories"]
+    connections[index] = connection
+    return [graphql_repository_record(node) for node in connection["nodes"]]
+
+  repos = merge_repository_sources([source[3] for source in sources], fetch_page, max_repositories)
+  searches = {
+    section: [graphql_search_record(node) for node in data[f"s{index}"]["nodes"] if node][:max_items]
+    for index, (section, _) in enumerate(SEARCH_SECTIONS)
+  }
+  return graphql_profile(data["profile"]), repos, searches
+
+
+def dashboard_payload(dashboard, encoding="objects"):
+  if encoding != "columnar":
+    return json.dumps(dashboard)
+  # Columnar form stores each list section once as column names plus row
+  # arrays, so keys are not repeated for every repository and issue.
+  encoded = dict(dashboard)
+  for section in LIST_SECTIONS:
+    rows = dashboard.get(section) or []
+    if rows:
+      columns = list(rows[0])
+      encoded[section] = {"columns": columns, "rows": [[row.get(column) for column in columns] for row in rows]}
+  return json.dumps(encoded, separators=(",", ":"))
 
 
 def aggregate_languages(repos):
   lang_counts = {}
   for repo in repos:
-    language = repo.get("language", "")
+    language = repo.language
     if not language:
       continue
     lang_counts[language] = lang_counts.get(language, 0) + 1
@@ -186,21 +745,37 @@ def aggregate_languages(repos):
   return [{"name": name, "count": count} for name, count in sorted_langs[:6]]
 
 
-def main():
-  query = read_query()
+def fetch_dashboard(query):
   token = (query.get("github_token") or os.getenv("GITHUB_TOKEN") or "").strip()
 
   include_private = bool_from_string(query.get("include_private"), True)
   max_repositories = max(1, min(100, int_from_string(query.get("max_repositories"), 20)))
   max_items = max(1, min(100, int_from_string(query.get("max_items_per_section"), 20)))
+  max_concurrency = max(1, min(32, int_from_string(query.get("max_concurrency"), 8)))
+  fetch_backend = (query.get("fetch_backend") or "rest").strip().lower()
+  payload_encoding = (query.get("payload_encoding") or "objects").strip().lower()
 
   organizations_csv = query.get("organizations_csv", "")
   orgs = [x.strip() for x in organizations_csv.split(",") if x.strip()]
 
+  cache_file = (query.get("http_cache_file") or "").strip()
+  cache_options = {
+    "ttls": {
+      "profile": max(0, int_from_string(query.get("http_cache_ttl_profile"), 3600)),
+      "repositories": max(0, int_from_string(query.get("http_cache_ttl_repos"), 300)),
+      "search": max(0, int_from_string(query.get("http_cache_ttl_search"), 0)),
+    },
+    "max_bytes": max(1, int_from_string(query.get("http_cache_max_mb"), 32)) * 1024 * 1024,
+  }
+  if cache_file:
+    RESPONSE_CACHE.use(FileCacheStore(cache_file), **cache_options)
+  else:
+    RESPONSE_CACHE.use(None, enabled=False)
+
   username = resolve_username(query.get("github_profile", ""), query.get("github_username", ""))
 
   if not username and token:
-    viewer = gh_get("https://api.github.com/user", token)
+    viewer = gh_get(f"{GITHUB_API_URL}/user", token)
     username = viewer.get("login", "")
   if not username:
     raise ValueError("Could not resolve GitHub username. Set github_profile or github_username.")
@@ -208,15 +783,26 @@ def main():
   if not token:
     include_private = False
 
-  profile = gh_get(f"https://api.github.com/users/{urllib.parse.quote(username)}", token)
-
-  repos = collect_repositories(token, username, include_private, orgs, max_repositories)
-  authored_prs = search_issues(token, f"is:pr is:open author:{username}", max_items)
-  review_requested_prs = search_issues(token, f"is:pr is:open review-requested:{username}", max_items)
-  assigned_issues = search_issues(token, f"is:issue is:open assignee:{username}", max_items)
-  authored_issues = search_issues(token, f"is:issue is:open author:{username}", max_items)
-
-  total_stars = sum(int(repo.get("stars", 0)) for repo in repos)
+  # GraphQL needs an authenticated request; anonymous runs stay on REST.
+  if fetch_backend == "graphql" and token:
+    profile, repos, searches = collect_dashboard_graphql(token, username, include_private, orgs, max_repositories, max_items)
+  else:
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+      profile_future = executor.submit(gh_get, f"{GITHUB_API_URL}/users/{urllib.parse.quote(username)}", token)
+      groups = plan_searches([(section, query.format(username=username)) for section, query in SEARCH_SECTIONS])
+      search_futures = [executor.submit(search_group, token, group, max_items) for group in groups]
+      repos = collect_repositories(token, username, include_private, orgs, max_repositories, executor)
+      profile = profile_future.result()
+      searches = {}
+      for future in search_futures:
+        searches.update(future.result())
+
+  authored_prs = searches["authored_prs"]
+  review_requested_prs = searches["review_requested_prs"]
+  assigned_issues = searches["assigned_issues"]
+  authored_issues = searches["authored_issues"]
+
+  total_stars = sum(int(repo.stars or 0) for repo in repos)
   languages = aggregate_languages(repos)
 
   dashboard = {
@@ -241,18 +827,109 @@ def main():
       "repo_stars": total_stars,
     },
     "languages": languages,
-    "recent_repositories": repos,
-    "authored_prs": authored_prs,
-    "review_requested_prs": review_requested_prs,
-    "assigned_issues": assigned_issues,
-    "authored_issues": authored_issues,
+    "recent_repositories": [repo._asdict() for repo in repos],
+    "authored_prs": [item._asdict() for item in authored_prs],
+    "review_requested_prs": [item._asdict() for item in review_requested_prs],
+    "assigned_issues": [item._asdict() for item in assigned_issues],
+    "authored_issues": [item._asdict() for item in authored_issues],
   }
 
-  result = {
-    "dashboard_json": json.dumps(dashboard),
+  RESPONSE_CACHE.flush()
+
+  return {
+    "dashboard_json": dashboard_payload(dashboard, payload_encoding),
     "generated_at": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC"),
+    "http_cache": json.dumps(RESPONSE_CACHE.stats()),
   }
-  print(json.dumps(result))
+
+
+# Query keys that control the snapshot itself rather than what is fetched.
+SNAPSHOT_KEYS = {"snapshot_file", "snapshot_max_age", "snapshot_refresh"}
+SNAPSHOT_LOCK_SECONDS = 600
+
+
+def snapshot_inputs(query):
+  # Identifies what a snapshot was fetched for. The token is hashed so a
+  # snapshot is not reused across tokens without being stored in the file.
+  inputs = {key: value for key, value in query.items() if key not in SNAPSHOT_KEYS and key != "github_token"}
+  inputs["github_token"] = hashlib.sha256((query.get("github_token") or os.getenv("GITHUB_TOKEN") or "").encode("utf-8")).hexdigest()
+  return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def load_snapshot(path, inputs):
+  snapshot = FileCacheStore(path).load()
+  if snapshot.get("inputs") != inputs or "result" not in snapshot:
+    return None
+  return snapshot
+
+
+def save_snapshot(path, inputs, result, previous):
+  # Content-addressed: the result is stored under the sha256 of the
+  # dashboard data, and generated_at only moves when that hash changes, so
+  # an unchanged dashboard renders byte-identical HTML.
+  digest = hashlib.sha256(result["dashboard_json"].encode("utf-8")).hexdigest()
+  if previous is not None and previous["sha256"] == digest:
+    result = {**result, "generated_at": previous["result"]["generated_at"]}
+  FileCacheStore(path).save({"inputs": inputs, "sha256": digest, "fetched_at": time.time(), "result": result})
+  return result
+
+
+def refresh_in_background(path, query):
+  # One detached refresh at a time; Terraform does not wait for it, and the
+  # next plan picks up the new snapshot.
+  lock = f"{path}.lock"
+  try:
+    if time.time() - os.path.getmtime(lock) < SNAPSHOT_LOCK_SECONDS:
+      return False
+    os.remove(lock)
+  except OSError:
+    pass
+  try:
+    os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+  except FileExistsError:
+    return False
+  process = subprocess.Popen(
+    [sys.executable, os.path.abspath(__file__)],
+    stdin=subprocess.PIPE,
+    stdout=subprocess.DEVNULL,
+    stderr=subprocess.DEVNULL,
+    start_new_session=True,
+  )
+  process.stdin.write(json.dumps({**query, "snapshot_refresh": "locked"}).encode("utf-8"))
+  process.stdin.close()
+  return True
+
+
+def snapshot_result(query):
+  path = (query.get("snapshot_file") or "").strip()
+  max_age = max(0, int_from_string(query.get("snapshot_max_age"), 0))
+  refresh = (query.get("snapshot_refresh") or "background").strip().lower()
+  if not path or not max_age:
+    return fetch_dashboard(query)
+
+  inputs = snapshot_inputs(query)
+  snapshot = load_snapshot(path, inputs)
+  if snapshot is not None and refresh not in ("force", "locked"):
+    age = time.time() - snapshot["fetched_at"]
+    if age < max_age:
+      return {**snapshot["result"], "snapshot": "fresh"}
+    if refresh == "background":
+      refresh_in_background(path, query)
+      return {**snapshot["result"], "snapshot": "stale"}
+
+  try:
+    result = save_snapshot(path, inputs, fetch_dashboard(query), snapshot)
+  finally:
+    if refresh == "locked":
+      try:
+        os.remove(f"{path}.lock")
+      except OSError:
+        pass
+  return {**result, "snapshot": "refreshed"}
+
+
+def main():
+  print(json.dumps(snapshot_result(read_query())))
 
 
 if __name__ == "__main__":
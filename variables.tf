@@ -41,6 +41,94 @@ variable "max_items_per_section" {
   default     = 20
 }
 
+variable "max_concurrency" {
+  description = "Maximum number of GitHub API requests issued in parallel during a refresh."
+  type        = number
+  default     = 8
+}
+
+variable "fetch_backend" {
+  description = "GitHub API used to collect dashboard data: rest, or graphql for one batched query (requires github_token)."
+  type        = string
+  default     = "rest"
+
+  validation {
+    condition     = contains(["rest", "graphql"], var.fetch_backend)
+    error_message = "fetch_backend must be rest or graphql."
+  }
+}
+
+variable "payload_encoding" {
+  description = "Encoding of the embedded dashboard JSON: objects, or columnar (column names plus row arrays) for a smaller payload with large sections."
+  type        = string
+  default     = "objects"
+
+  validation {
+    condition     = contains(["objects", "columnar"], var.payload_encoding)
+    error_message = "payload_encoding must be objects or columnar."
+  }
+}
+
+variable "http_cache_file" {
+  description = "Local file used to cache GitHub ETag responses between plan/apply runs. Set to empty string to disable."
+  type        = string
+  default     = ".github-http-cache.json"
+}
+
+variable "http_cache_ttl_seconds" {
+  description = "Seconds a cached GitHub response is reused without a request, per endpoint class. Applies to the Terraform fetcher and the Lambda; 0 always revalidates."
+  type = object({
+    profile = optional(number, 3600)
+    repos   = optional(number, 300)
+    search  = optional(number, 0)
+  })
+  default = {}
+
+  validation {
+    condition     = alltrue([for ttl in values(var.http_cache_ttl_seconds) : ttl >= 0])
+    error_message = "http_cache_ttl_seconds values must be 0 or more."
+  }
+}
+
+variable "http_cache_max_mb" {
+  description = "Size limit for cached response bodies, in MB; the least recently used entries are evicted beyond it."
+  type        = number
+  default     = 32
+
+  validation {
+    condition     = var.http_cache_max_mb >= 1
+    error_message = "http_cache_max_mb must be at least 1."
+  }
+}
+
+variable "dashboard_snapshot_file" {
+  description = "Local snapshot of the fetched dashboard, reused by plan/apply while it is younger than dashboard_snapshot_max_age_seconds."
+  type        = string
+  default     = ".github-dashboard-snapshot.json"
+}
+
+variable "dashboard_snapshot_max_age_seconds" {
+  description = "Seconds the dashboard snapshot is used without contacting GitHub. 0 disables snapshots and fetches on every plan."
+  type        = number
+  default     = 0
+
+  validation {
+    condition     = var.dashboard_snapshot_max_age_seconds >= 0
+    error_message = "dashboard_snapshot_max_age_seconds must not be negative."
+  }
+}
+
+variable "dashboard_snapshot_refresh" {
+  description = "What happens once the snapshot is older than its max age: background (use it and refresh it in a detached process for the next run), sync (refresh before continuing), or force (refresh even when it is fresh)."
+  type        = string
+  default     = "background"
+
+  validation {
+    condition     = contains(["background", "sync", "force"], var.dashboard_snapshot_refresh)
+    error_message = "dashboard_snapshot_refresh must be one of background, sync, force."
+  }
+}
+
 variable "output_file" {
   description = "Path where rendered dashboard HTML will be written."
   type        = string
@@ -77,6 +165,158 @@ variable "lambda_schedule_expression" {
   default     = "rate(6 hours)"
 }
 
+variable "lambda_batch_users" {
+  description = "Optional GitHub usernames refreshed together by the Lambda. Each user is published to <username>/index.html; org listings and connections are shared."
+  type        = list(string)
+  default     = []
+}
+
+variable "lambda_http_cache_backend" {
+  description = "Where the Lambda keeps its GitHub ETag cache: memory (warm containers only), s3 (persisted under _state/ in the bucket), or none."
+  type        = string
+  default     = "memory"
+
+  validation {
+    condition     = contains(["memory", "s3", "none"], var.lambda_http_cache_backend)
+    error_message = "lambda_http_cache_backend must be one of memory, s3, none."
+  }
+}
+
+variable "github_webhook_secret" {
+  description = "Secret shared with a GitHub webhook (pull_request, issues, push, repository events). When set, a webhook Lambda with a function URL patches the affected dashboard sections and the schedule becomes a reconciliation run."
+  type        = string
+  default     = ""
+  sensitive   = true
+}
+
+variable "lambda_webhook_debounce_seconds" {
+  description = "Webhook events arriving within this many seconds of each other are coalesced into one refresh."
+  type        = number
+  default     = 30
+
+  validation {
+    condition     = var.lambda_webhook_debounce_seconds >= 0 && var.lambda_webhook_debounce_seconds <= 60
+    error_message = "lambda_webhook_debounce_seconds must be between 0 and 60."
+  }
+}
+
+variable "lambda_reconcile_schedule_expression" {
+  description = "Full refresh schedule used instead of lambda_schedule_expression when github_webhook_secret is set."
+  type        = string
+  default     = "rate(1 day)"
+}
+
+variable "lambda_search_sync" {
+  description = "Incremental PR/issue searches: off, memory (snapshot kept by warm containers), or s3 (snapshot persisted under _state/ in the bucket). Later runs only ask for items updated since the snapshot."
+  type        = string
+  default     = "off"
+
+  validation {
+    condition     = contains(["off", "memory", "s3"], var.lambda_search_sync)
+    error_message = "lambda_search_sync must be one of off, memory, s3."
+  }
+}
+
+variable "lambda_search_verify_seconds" {
+  description = "With lambda_search_sync enabled, re-run the full searches once the snapshot is this old, dropping items that no longer match."
+  type        = number
+  default     = 21600
+}
+
+variable "lambda_repository_enrichment" {
+  description = "Per-repository language bytes, CI status, open PRs and last commit: off, memory (results kept by warm containers), or s3 (persisted under _state/ in the bucket). Only repositories that changed since the last run are fetched again."
+  type        = string
+  default     = "off"
+
+  validation {
+    condition     = contains(["off", "memory", "s3"], var.lambda_repository_enrichment)
+    error_message = "lambda_repository_enrichment must be one of off, memory, s3."
+  }
+}
+
+variable "lambda_trend_history" {
+  description = "Trend history for followers, stars, open PR/issue counts and language mix: off, or s3 (append-only records and daily/weekly rollups under _state/trends/ in the bucket). Shown as sparklines on the Lambda-published page."
+  type        = string
+  default     = "off"
+
+  validation {
+    condition     = contains(["off", "s3"], var.lambda_trend_history)
+    error_message = "lambda_trend_history must be one of off, s3."
+  }
+}
+
+variable "lambda_crawl_workers" {
+  description = "Parallel workers for a full crawl of every repository in var.organizations (org totals and top repositories by stars). Each worker is an asynchronous invocation of the refresh Lambda. 0 disables the crawl."
+  type        = number
+  default     = 0
+
+  validation {
+    condition     = var.lambda_crawl_workers >= 0 && var.lambda_crawl_workers <= 100
+    error_message = "lambda_crawl_workers must be between 0 and 100."
+  }
+}
+
+variable "lambda_section_timeout_seconds" {
+  description = "Seconds each dashboard section (profile, repositories, each search) may take before the Lambda publishes it from the previous dashboard, marked stale."
+  type        = number
+  default     = 60
+
+  validation {
+    condition     = var.lambda_section_timeout_seconds >= 1
+    error_message = "lambda_section_timeout_seconds must be at least 1."
+  }
+}
+
+variable "lambda_output_layout" {
+  description = "Lambda output: split (small HTML shell, content-hashed CSS/JS under assets/, dashboard.json) inline (single self-contained index.html) or static (index.html prerendered by the Lambda, no script)."
+  type        = string
+  default     = "split"
+
+  validation {
+    condition     = contains(["split", "inline", "static"], var.lambda_output_layout)
+    error_message = "lambda_output_layout must be one of split, inline, static."
+  }
+}
+
+variable "lambda_output_compression" {
+  description = "Content-Encoding for objects written by the Lambda: gzip, br (needs the brotli package and HTTPS delivery, falls back to gzip), or none."
+  type        = string
+  default     = "gzip"
+
+  validation {
+    condition     = contains(["gzip", "br", "none"], var.lambda_output_compression)
+    error_message = "lambda_output_compression must be one of gzip, br, none."
+  }
+}
+
+variable "lambda_output_max_age" {
+  description = "Cache-Control max-age in seconds for index.html and dashboard.json written by the Lambda. Hashed assets are cached for a year."
+  type        = number
+  default     = 300
+}
+
+variable "lambda_s3_client" {
+  description = "S3 client used by the Lambda: boto3, or sigv4 (signed requests over the pooled HTTP client, skips importing boto3)."
+  type        = string
+  default     = "boto3"
+
+  validation {
+    condition     = contains(["boto3", "sigv4"], var.lambda_s3_client)
+    error_message = "lambda_s3_client must be one of boto3, sigv4."
+  }
+}
+
+variable "lambda_metrics_mode" {
+  description = "Per-stage timing and GitHub request metrics from the Lambda: off, or emf (CloudWatch Embedded Metric Format log lines)."
+  type        = string
+  default     = "off"
+
+  validation {
+    condition     = contains(["off", "emf"], var.lambda_metrics_mode)
+    error_message = "lambda_metrics_mode must be one of off, emf."
+  }
+}
+
 variable "lambda_log_retention_days" {
   description = "CloudWatch Logs retention for dashboard Lambda."
   type        = number